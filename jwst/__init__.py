@@ -1,46 +1,82 @@
+from __future__ import absolute_import
+
+import importlib
+import sys
+import types
+
 from .version import *
-from . import ami
-from . import assign_wcs
-from . import associations
-from . import background
-from . import combine_1d
-from . import coron
-from . import csv_tools
-from . import cube_build
-from . import dark_current
-from . import datamodels
-from . import dq_init
-from . import emission
-from . import extract_1d
-from . import extract_2d
-from . import fits_generator
-from . import flatfield
-from . import fringe
-from . import imprint
-from . import ipc
-from . import jump
-from . import jwpsf
-from . import lastframe
-from . import linearity
-from . import nircam_mosaic
-from . import outlier_detection
-from . import persistence
-from . import photom
-from . import pipeline
-from . import ramp_fitting
-from . import refpix
-from . import resample
-from . import reset
-from . import rscd
-from . import saturation
-from . import skymatch
-from . import source_catalog
-from . import stpipe
-from . import straylight
-from . import superbias
-# Requires non-standard modules and enviroment settings
-#from . import timeconversion
-from . import transforms
-from . import tweakreg
-from . import tweakreg_catalog
-from . import wfs_combine
+
+# The subpackages are imported the first time they are used, as
+# attributes of this package, so that importing one step or tool does
+# not import all of the others and their dependencies.
+_SUBPACKAGES = [
+    'ami',
+    'assign_wcs',
+    'associations',
+    'background',
+    'combine_1d',
+    'coron',
+    'csv_tools',
+    'cube_build',
+    'dark_current',
+    'datamodels',
+    'dq_init',
+    'emission',
+    'extract_1d',
+    'extract_2d',
+    'fits_generator',
+    'flatfield',
+    'fringe',
+    'imprint',
+    'ipc',
+    'jump',
+    'jwpsf',
+    'lastframe',
+    'linearity',
+    'nircam_mosaic',
+    'outlier_detection',
+    'persistence',
+    'photom',
+    'pipeline',
+    'ramp_fitting',
+    'refpix',
+    'resample',
+    'reset',
+    'rscd',
+    'saturation',
+    'skymatch',
+    'source_catalog',
+    'stpipe',
+    'straylight',
+    'superbias',
+    # Requires non-standard modules and enviroment settings
+    #'timeconversion',
+    'transforms',
+    'tweakreg',
+    'tweakreg_catalog',
+    'wfs_combine',
+]
+
+
+class _LazyPackage(types.ModuleType):
+    """
+    The jwst package, importing its subpackages on first access.
+    """
+    def __getattr__(self, name):
+        if name in _SUBPACKAGES:
+            # The import sets the attribute, so this is only called once
+            return importlib.import_module('.' + name, self.__name__)
+        raise AttributeError(
+            "module {0!r} has no attribute {1!r}".format(self.__name__, name))
+
+    def __dir__(self):
+        return sorted(set(self.__dict__) | set(_SUBPACKAGES))
+
+
+# Replace this module by a _LazyPackage with the same contents.  The
+# original module is kept referenced, as its globals are those of
+# _LazyPackage.
+_module = sys.modules[__name__]
+_lazy_module = _LazyPackage(__name__, __doc__)
+_lazy_module.__dict__.update(_module.__dict__)
+sys.modules[__name__] = _lazy_module
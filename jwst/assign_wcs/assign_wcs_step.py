@@ -5,7 +5,6 @@ from __future__ import (absolute_import, unicode_literals, division,
 from jwst.stpipe import Step, cmdline
 from jwst import datamodels
 import logging
-from .assign_wcs import load_wcs
 
 log = logging.getLogger(__name__)
 log.setLevel(logging.DEBUG)
@@ -43,6 +42,8 @@ class AssignWcsStep(Step):
                             'ifufore', 'ifuslicer']
 
     def process(self, input):
+        from .assign_wcs import load_wcs
+
         reference_file_names = {}
 
         with models.open(input) as input_model:
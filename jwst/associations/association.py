@@ -333,12 +333,27 @@ def meets_conditions(value, conditions):
     if isinstance(conditions, six.string_types):
         conditions = [conditions]
     for condition in conditions:
-        match = re.match(condition, value, flags=re.IGNORECASE)
+        match = _compile_condition(condition).match(value)
         if match:
             return True
     return False
 
 
+# Compiled condition regexes. Every association fixes its own constraint
+# values, so there are far more of them than the `re` module caches.
+_compiled_conditions = {}
+
+
+def _compile_condition(condition):
+    """Return the compiled, case-insensitive regex for a condition"""
+    try:
+        return _compiled_conditions[condition]
+    except KeyError:
+        compiled = re.compile(condition, flags=re.IGNORECASE)
+        _compiled_conditions[condition] = compiled
+        return compiled
+
+
 def libpath(filepath):
     '''Return the full path to the module library.'''
 
@@ -1,8 +1,11 @@
 import logging
+import re
 
+from astropy.extern import six
 from astropy.table import Table
 
 from jwst.associations.association import (AssociationError,
+                                                 getattr_from_list,
                                                  make_timestamp)
 
 # Configure logging
@@ -30,34 +33,211 @@ def generate(pool, rules):
              do not belong to any association.
     """
     asns = []
+    index = AssociationIndex()
     orphaned = Table(dtype=pool.dtype)
     timestamp = make_timestamp()
     logger.debug('Starting...')
     for member in pool:
-        logger.debug('Working member="{}"'.format(member))
+        logger.debug('Working member="%s"', member)
         member_asns = set()
         is_a_member = False
-        for asn in asns:
+        for asn in index.candidates(member):
             try:
                 asn.add(member)
                 member_asns.add(type(asn))
                 is_a_member = True
-                logger.debug('Matched association "{}"'.format(asn))
+                logger.debug('Matched association "%s"', asn)
             except AssociationError as error:
-                logger.debug(
-                    'Did not match association "{}"'.format(asn)
-                )
-                logger.debug('error="{}"'.format(error))
+                logger.debug('Did not match association "%s"', asn)
+                logger.debug('error="%s"', error)
                 continue
+            finally:
+                index.update(asn)
         try:
-            asns.extend(rules.match(member, timestamp, member_asns))
+            new_asns = rules.match(member, timestamp, member_asns)
+            asns.extend(new_asns)
+            for asn in new_asns:
+                index.add(asn)
             is_a_member = True
-            logger.debug(
-                'Member created new association "{}"'.format(asns[-1])
-            )
+            logger.debug('Member created new association "%s"', asns[-1])
         except AssociationError as error:
             logger.debug('Did not match any rule.')
-            logger.debug('error="{}"'.format(error))
+            logger.debug('error="%s"', error)
         if not is_a_member:
             orphaned.add_row(member)
     return asns, orphaned
+
+
+class AssociationIndex(object):
+    """Index of associations by their fixed constraint values
+
+    A member can only be added to an association if, for every constraint
+    whose value is a literal taken from an earlier member, the member's
+    value starts with that literal (constraints are matched
+    case-insensitively from the start of the value). The index hashes
+    associations by these literals so that `candidates` only returns
+    the associations a member may belong to, in the order they were added.
+
+    An association is left out of the candidates only when trying to add
+    the member would fail before modifying the association, so that
+    `generate` produces exactly the same associations as trying every
+    association. Associations that still have constraints to set are
+    always candidates.
+    """
+
+    def __init__(self):
+        self._order = {}
+        self._entries = {}
+        self._unindexed = set()
+
+        # {signature: nested dicts of literals, ending in sets of
+        #  associations}
+        self._groups = {}
+
+    def add(self, asn):
+        """Add a new association to the index"""
+        self._order[asn] = len(self._order)
+        self._insert(asn)
+
+    def update(self, asn):
+        """Re-index an association after a member was tried against it"""
+        self._remove(asn)
+        self._insert(asn)
+
+    def candidates(self, member):
+        """Associations the member may be added to, in order added"""
+        found = set(self._unindexed)
+        for signature, tree in six.iteritems(self._groups):
+            self._find(member, signature, tree, found)
+        return sorted(found, key=self._order.__getitem__)
+
+    def _insert(self, asn):
+        entry = _index_entry(asn)
+        self._entries[asn] = entry
+        if entry is None:
+            self._unindexed.add(asn)
+            return
+        signature, literals = entry
+        node = self._groups.setdefault(signature, {})
+        for literal in literals[:-1]:
+            node = node.setdefault(literal, {})
+        node.setdefault(literals[-1], set()).add(asn)
+
+    def _remove(self, asn):
+        entry = self._entries.pop(asn)
+        if entry is None:
+            self._unindexed.discard(asn)
+            return
+        signature, literals = entry
+        nodes = [self._groups[signature]]
+        for literal in literals[:-1]:
+            nodes.append(nodes[-1][literal])
+        nodes[-1][literals[-1]].discard(asn)
+        for node, literal in reversed(list(zip(nodes, literals))):
+            if node[literal]:
+                break
+            del node[literal]
+        if not self._groups[signature]:
+            del self._groups[signature]
+
+    @staticmethod
+    def _find(member, signature, tree, found):
+        inputs, optional_inputs = signature
+
+        # A constraint that is not required modifies the association when
+        # the member does not have it, so the association has to be tried.
+        for attributes in optional_inputs:
+            try:
+                getattr_from_list(member, attributes)
+            except KeyError:
+                _collect(tree, len(inputs), found)
+                return
+
+        prefixes = []
+        for attributes in inputs:
+            try:
+                value = getattr_from_list(member, attributes)[1]
+            except KeyError:
+                # A required constraint is missing: no match possible.
+                return
+            prefixes.append(_prefixes(value))
+
+        _search(tree, prefixes, found)
+
+
+def _index_entry(asn):
+    """Return the (signature, literals) index entry of an association
+
+    The signature is made of the inputs of the constraints whose values
+    are literals, and the inputs of all the constraints that are not
+    required. Returns None if any constraint has yet to be set, or no
+    constraint value is a literal.
+    """
+    inputs = []
+    optional_inputs = []
+    literals = []
+    for conditions in asn.constraints.values():
+        if conditions['value'] is None or \
+           conditions.get('force_unique', asn.DEFAULT_FORCE_UNIQUE):
+            return None
+        attributes = tuple(conditions['inputs'])
+        if not conditions.get('required', asn.DEFAULT_REQUIRE_CONSTRAINT):
+            optional_inputs.append(attributes)
+        literal = _literal(conditions['value'])
+        if literal is not None:
+            inputs.append(attributes)
+            literals.append(literal.lower())
+    if not literals:
+        return None
+    return (tuple(inputs), tuple(optional_inputs)), tuple(literals)
+
+
+_ESCAPED = re.compile(r'\\(.)', flags=re.DOTALL)
+
+
+def _literal(regex):
+    """Return the string a regex matches literally, or None
+
+    Only ASCII literals are returned so that case-insensitive matching
+    reduces to comparing lower-cased strings.
+    """
+    if not isinstance(regex, six.string_types):
+        return None
+    literal = _ESCAPED.sub(r'\1', regex)
+    if re.escape(literal) != regex or not _is_ascii(literal):
+        return None
+    return literal
+
+
+def _is_ascii(value):
+    return all(ord(char) < 128 for char in value)
+
+
+def _prefixes(value):
+    """Lower-cased prefixes of a member value, or None to match any literal"""
+    if not isinstance(value, six.string_types) or not _is_ascii(value):
+        return None
+    value = value.lower()
+    return [value[:n] for n in range(len(value) + 1)]
+
+
+def _search(node, prefixes, found):
+    """Collect associations whose literals are prefixes of the values"""
+    if not prefixes:
+        found.update(node)
+        return
+    if prefixes[0] is None:
+        children = node.values()
+    else:
+        children = [node[prefix] for prefix in prefixes[0] if prefix in node]
+    for child in children:
+        _search(child, prefixes[1:], found)
+
+
+def _collect(node, depth, found):
+    """Collect all associations below a node of the given depth"""
+    if depth == 0:
+        found.update(node)
+        return
+    for child in node.values():
+        _collect(child, depth - 1, found)
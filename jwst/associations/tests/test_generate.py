@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+from collections import OrderedDict
+
+import numpy as np
+
+from astropy.extern import six
+from astropy.table import MaskedColumn, Table
+
+from jwst.associations.association import (Association,
+                                           AssociationError,
+                                           AssociationRegistry,
+                                           make_timestamp)
+from jwst.associations.generate import generate
+
+
+class _TestAsn(Association):
+    """Association recording the ids of its members"""
+
+    def _init_hook(self, member):
+        self.data['members'] = []
+
+    def _add(self, member):
+        self.data['members'].append(int(member['id']))
+
+
+class Asn_Target(_TestAsn):
+    """Literal constraints, set from the first member"""
+
+    def __init__(self, member, timestamp=None):
+        self.add_constraints({
+            'instrument': {'value': 'nircam', 'inputs': ['instrument']},
+            'program': {'value': None, 'inputs': ['program']},
+            'target': {'value': None, 'inputs': ['target']},
+        })
+        super(Asn_Target, self).__init__(member, timestamp)
+
+
+class Asn_Optional(_TestAsn):
+    """A constraint that members do not need to have"""
+
+    def __init__(self, member, timestamp=None):
+        self.add_constraints({
+            'instrument': {'value': 'nircam', 'inputs': ['instrument']},
+            'program': {'value': None, 'inputs': ['program']},
+            'optional': {'value': None, 'inputs': ['optional'],
+                         'required': False},
+        })
+        super(Asn_Optional, self).__init__(member, timestamp)
+
+
+class Asn_Unique(_TestAsn):
+    """A regex constraint, made unique by the first member"""
+
+    def __init__(self, member, timestamp=None):
+        self.add_constraints({
+            'instrument': {'value': 'nircam', 'inputs': ['instrument']},
+            'filter': {'value': 'f1.*|f2.*', 'inputs': ['filter'],
+                       'force_unique': True},
+            'target': {'value': None, 'inputs': ['target']},
+        })
+        super(Asn_Unique, self).__init__(member, timestamp)
+
+
+class _Rules(OrderedDict):
+    """The test rules, matched as by an AssociationRegistry"""
+    match = six.get_unbound_function(AssociationRegistry.match)
+
+
+RULES = _Rules([('Asn_Target', Asn_Target),
+                ('Asn_Optional', Asn_Optional),
+                ('Asn_Unique', Asn_Unique)])
+
+# Values which are prefixes of each other, differ in case or are not
+# ASCII; None is a missing value.  The LATIN SMALL LETTER LONG S of
+# 'M\u017f1' matches 'ms1' case-insensitively, although it is not
+# lower-cased to 's'.
+POOL_VALUES = OrderedDict([
+    ('instrument', ['nircam', 'NIRCAM', 'miri']),
+    ('program', ['00001', '00002', '0000', '000012']),
+    ('target', ['M31', 'm31', 'M31b', 'Ñebula', 'ñebula', 'NGC 1',
+                'ms1', 'M\u017f1']),
+    ('filter', ['F150W', 'f150w', 'F150W2', 'F200W', 'F444W']),
+    ('optional', ['a', 'A', 'ab', 'é', None]),
+])
+
+
+def make_pool(nmembers, seed):
+    rng = np.random.RandomState(seed)
+    pool = Table(masked=True)
+    pool['id'] = MaskedColumn(np.arange(nmembers))
+    instruments = None
+    for name, choices in POOL_VALUES.items():
+        values = [choices[i] for i in rng.randint(len(choices), size=nmembers)]
+        if name == 'instrument':
+            instruments = values
+        # Only members that can be associated have missing values, so
+        # that the orphans have none.
+        mask = [value is None and instrument != 'miri'
+                for value, instrument in zip(values, instruments)]
+        pool[name] = MaskedColumn([value or 'x' for value in values],
+                                  mask=mask)
+    return pool
+
+
+def generate_exhaustively(pool, rules):
+    """`generate`, trying every member against every association"""
+    asns = []
+    orphaned = Table(dtype=pool.dtype)
+    timestamp = make_timestamp()
+    for member in pool:
+        member_asns = set()
+        is_a_member = False
+        for asn in asns:
+            try:
+                asn.add(member)
+                member_asns.add(type(asn))
+                is_a_member = True
+            except AssociationError:
+                continue
+        try:
+            asns.extend(rules.match(member, timestamp, member_asns))
+            is_a_member = True
+        except AssociationError:
+            pass
+        if not is_a_member:
+            orphaned.add_row(member)
+    return asns, orphaned
+
+
+def summarize(asns, orphaned):
+    return (
+        [(type(asn).__name__, asn.data['members'],
+          sorted((name, conditions['value'])
+                 for name, conditions in asn.constraints.items()))
+         for asn in asns],
+        list(orphaned['id'])
+    )
+
+
+def test_generate_matches_exhaustive():
+    all_asns = []
+    all_orphans = []
+    for seed in range(5):
+        pool = make_pool(150, seed)
+        expected = summarize(*generate_exhaustively(pool, RULES))
+        result = summarize(*generate(pool, RULES))
+        assert result == expected
+        all_asns.extend(expected[0])
+        all_orphans.extend(expected[1])
+
+    # The pools exercise every kind of constraint
+    assert len(all_orphans) > 0
+    assert any(len(members) > 1 for _, members, _ in all_asns)
+    constraint_values = set(value for _, _, constraints in all_asns
+                            for _, value in constraints)
+    assert 'Constraint not present and ignored' in constraint_values
+    assert any('ebula' in value for value in constraint_values)
+    assert any(value.startswith('F') for value in constraint_values)
@@ -147,125 +147,151 @@ def MakePointCloudMIRI_DistortionFile(self,x,y,file_no,c1_offset,c2_offset,chann
 
 
 def FindROI(self,Cube,spaxel,PointCloud):
+    """
+    Short Summary
+    -------------
+    Map the point cloud to the spaxels within the region of interest of
+    each point, and store the point cloud indexes and weights of the
+    matches of each spaxel.
+
+    Parameters
+    ----------
+    Cube: holds meta data of cube
+    spaxel: SpaxelArrays of the cube
+    PointCloud: pixel point cloud
+
+    Returns
+    -------
+    no return - the point cloud matches of spaxel are set
+
+    """
 
-    nxc = len(Cube.xcoord)
-    nzc = len(Cube.zcoord)
-    nyc = len(Cube.ycoord)
+    indptr, ipointcloud, weight = FindROISparse(self,Cube,PointCloud)
+    spaxel.SetPointCloudMatches(indptr,ipointcloud,weight)
+
+#_______________________________________________________________________
+def FindROISparse(self,Cube,PointCloud,chunk_size=50000):
+    """
+    Short Summary
+    -------------
+    Map the point cloud to the spaxels within the region of interest
+    (self.radius_x, self.radius_y, self.radius_z) of each point using
+    array operations.
+
+    The points are binned on the grid of spaxel centers along each axis,
+    and only the neighboring spaxels of the bin are tested. The distances
+    and weights of all the point/spaxel pairs of chunk_size points at a
+    time are then computed at once.
+
+    Parameters
+    ----------
+    Cube: holds meta data of cube
+    PointCloud: pixel point cloud
+    chunk_size: number of points matched at a time, bounds the memory used
+
+    Returns
+    -------
+    indptr, ipointcloud, weight: the matches in compressed sparse row form.
+    The point cloud indexes and weights of the points matched to spaxel
+    icube are ipointcloud[indptr[icube]:indptr[icube+1]] and
+    weight[indptr[icube]:indptr[icube+1]], in point cloud order.
+
+    """
 
     nplane  = Cube.naxis1 * Cube.naxis2
+    nspaxel = nplane * Cube.naxis3
     lower_limit = 0.0001
 
-    iprint = 0 
-    nn = len(PointCloud[0])
-#    print('number of elements in PT',nn)
-    for ipt  in range(0, nn-1):
-
-#        if(iprint == 0):
-#            print('On pt member',ipt,'out of ',nn)
-        ifile = int(PointCloud[7,ipt])
-
-        a = Cube.a_wave[ifile]
-        c = Cube.c_wave[ifile]
-        wa = Cube.a_weight[ifile]
-        wc = Cube.c_weight[ifile]
-        wave = PointCloud[2,ipt]
-        weights = FindNormalizationWeights(wave,a,c,wa,wc)
-
-        weight_alpha = weights[0]
-        weight_beta  = weights[1]
-        weight_wave = weights[2]
-
-
-        coord1 = PointCloud[0,ipt]
-        coord2 = PointCloud[1,ipt]
-        alpha = PointCloud[3,ipt]
-        beta = PointCloud[4,ipt]
-        x = PointCloud[8,ipt]
-        y = PointCloud[9,ipt]
-        
-        if(self.coord_system =='alpha-beta'):
-            coord1 = alpha
-            coord2 = beta
-# Map this point cloud to spaxel (distance from spaxel center = ROI) 
-# use the vector of cube centers in each dimension to speed things up
-        # both coordinates are in arc seconds
-        indexz = np.asarray(np.where(abs(Cube.zcoord - wave) <= self.radius_z))
-        indexx = np.asarray(np.where(abs(Cube.xcoord - coord1) <= self.radius_x))
-        indexy = np.asarray(np.where(abs(Cube.ycoord - coord2) <= self.radius_y))
-
-
-        # transform Cube Spaxel to alpha,beta system of Point Cloud 
-        # use inverse transfrom of V2,V3 back to local alpha,beta, lam 
-        # convert v2,v3 from arc seconds to arc min first
-
-
-        zloc = Cube.zcoord[indexz[0]]
-        xloc = Cube.xcoord[indexx[0]]
-        yloc = Cube.ycoord[indexy[0]]
-
-
-        v2ab_transform = Cube.transform[ifile]         
-
-        if(self.coord_system =='alpha-beta'):
-            distance1 = abs(xloc-alpha)
-            distance2 = abs(yloc-beta)
-
-        if(self.coord_system =='v2-v3'):
-            distance1 = abs(xloc-coord1)
-            distance2 = abs(yloc-coord2)
-
-        distance3 = abs(zloc-wave)
-        distance12 = distance1*distance1
-        distance22 = distance2*distance2
-        distance32 = distance3*distance3
-
-        iz = 0
-        for zz  in indexz[0]:
-            istart = zz * nplane
-            iy = 0 
-            for yy in indexy[0]:
-                ix = 0 
-                for xx in indexx[0]:
-
-#                    if(self.coord_system=='v2-v3'):
-#                        xloc60 = xloc[ix]/60.0
-#                        yloc60 = yloc[iy]/60.0
-#                        alpha_spaxel,beta_spaxel,wave_spaxel = v2ab_transform(xloc60,yloc60,zloc[iz])
-#                        alpha_distance = abs(alpha-alpha_spaxel)
-#                        beta_distance = abs(beta-beta_spaxel)
-#                        wave_distance  = abs(wave-wave_spaxel)
-
-#                        xn = alpha_distance/weight_alpha
-#                        yn = beta_distance/weight_beta
-#                        wn = wave_distance/weight_wave
-#                        weight_distance = xn*xn + yn*yn + wn*wn
-                        
-
-                    weight_distance = distance12[ix] + distance22[iy] + distance32[iz]
-
-                    if(weight_distance < lower_limit): weight_distance = lower_limit
-                    weight_distance = 1.0/weight_distance
-
-
-                    cube_index = istart + yy*Cube.naxis1 + xx
-                    spaxel[cube_index].ipointcloud.append(ipt)
-                    spaxel[cube_index].pointcloud_weight.append(weight_distance )
-
-                    #if(zz == 100 and xx == 7 and yy == 10): 
-                    #    print('Match',ipt,cube_index) 
-                    #    print('Pt point',coord1,coord2,wave)
-                    #    print('Pt a-b-l',alpha,beta)
-                    #    print('x y',x+1,y+1)
-                    #    print(xloc[ix],xloc[ix]-coord1)
-                    #    print(yloc[iy],yloc[iy]-coord2)
-                    #    print(zloc[iz],zloc[iz]-wave)
-
-                    ix = ix + 1
-                    iprint = iprint + 1
-#                    if(iprint > 10000):
-#                        iprint = 0
-                iy = iy + 1
-            iz = iz + 1
+    if(self.coord_system =='alpha-beta'):
+        coord1 = PointCloud[3]
+        coord2 = PointCloud[4]
+    else:
+        coord1 = PointCloud[0]
+        coord2 = PointCloud[1]
+    wave = PointCloud[2]
+
+    nn = PointCloud.shape[1]
+    cube_indexes = list()
+    point_indexes = list()
+    weights = list()
+    for ipt_start in range(0, nn, chunk_size):
+        ipt = np.arange(ipt_start, min(ipt_start + chunk_size, nn))
+
+        indexx, distance12 = FindAxisNeighbors(Cube.xcoord, coord1[ipt], self.radius_x)
+        indexy, distance22 = FindAxisNeighbors(Cube.ycoord, coord2[ipt], self.radius_y)
+        indexz, distance32 = FindAxisNeighbors(Cube.zcoord, wave[ipt], self.radius_z)
+
+        # all combinations of the neighbors: axes are (point, z, y, x)
+        match = ((indexz >= 0)[:,:,None,None] & (indexy >= 0)[:,None,:,None] &
+                 (indexx >= 0)[:,None,None,:])
+
+        weight_distance = (distance12[:,None,None,:] + distance22[:,None,:,None] +
+                           distance32[:,:,None,None])[match]
+        weight_distance[weight_distance < lower_limit] = lower_limit
+        weight_distance = 1.0/weight_distance
+
+        cube_index = (indexz[:,:,None,None] * nplane + indexy[:,None,:,None] * Cube.naxis1 +
+                      indexx[:,None,None,:])[match]
+        point_index = np.broadcast_to(ipt[:,None,None,None], match.shape)[match]
+
+        cube_indexes.append(cube_index)
+        point_indexes.append(point_index)
+        weights.append(weight_distance)
+
+    if nn > 0:
+        cube_index = np.concatenate(cube_indexes)
+        point_index = np.concatenate(point_indexes)
+        weight = np.concatenate(weights)
+    else:
+        cube_index = np.zeros(0, dtype=np.intp)
+        point_index = np.zeros(0, dtype=np.intp)
+        weight = np.zeros(0)
+
+    # sort the matches by spaxel, keeping the points in order
+    order = np.argsort(cube_index, kind='mergesort')
+    indptr = np.zeros(nspaxel + 1, dtype=np.intp)
+    np.cumsum(np.bincount(cube_index, minlength=nspaxel), out=indptr[1:])
+
+    return indptr, point_index[order], weight[order]
+
+#_______________________________________________________________________
+def FindAxisNeighbors(centers, values, radius):
+    """
+    Short Summary
+    -------------
+    Find the spaxel centers along one axis of the cube that are within
+    radius of each value.
+
+    Parameters
+    ----------
+    centers: sorted spaxel centers along the axis
+    values: coordinates of the points along the axis
+    radius: region of interest along the axis
+
+    Returns
+    -------
+    index, distance2: arrays of shape (len(values), n) holding the index of
+    the matched spaxel centers (-1 if there is no match) and the squared
+    distance of the point to them
+
+    """
+    ncenters = len(centers)
+    # bin the values on the grid of centers, with one bin of margin on each
+    # side so that the exact distance test below decides the edge cases
+    start = np.searchsorted(centers, values - radius, side='left') - 1
+    end = np.searchsorted(centers, values + radius, side='right') + 1
+    start = np.clip(start, 0, ncenters)
+    end = np.clip(end, 0, ncenters)
+    nmax = max(int((end - start).max()), 1) if len(values) > 0 else 1
+
+    index = start[:,None] + np.arange(nmax)
+    inside = index < ncenters
+    index[~inside] = 0
+
+    distance = abs(centers[index] - values[:,None])
+    match = inside & (distance <= radius)
+    index[~match] = -1
+    return index, distance*distance
 
 #_______________________________________________________________________
 
@@ -369,7 +369,7 @@ def SpaxelOverlap(self, x,y,sliceno,start_slice,input_model,transform,beta_width
     transform: wcs transform to transform x,y to alpha,beta, lambda
     beta_width: width of slice
     Cube: class holding basic information on cube
-    spaxel: list of spaxels holding information on each cube pixel.
+    spaxel: SpaxelArrays holding information on each cube pixel.
 
     Returns
     -------
@@ -495,9 +495,7 @@ def SpaxelOverlap(self, x,y,sliceno,start_slice,input_model,transform,beta_width
                     if(AreaOverlap > 0.0):
 
                         AreaRatio = AreaOverlap/Area
-                        spaxel[cube_index].pixel_overlap.append(AreaRatio)
-                        spaxel[cube_index].pixel_flux.append(pixel_flux[ipixel])
-                        spaxel[cube_index].pixel_error.append(pixel_error[ipixel])
+                        spaxel.AddOverlap(cube_index,AreaRatio,pixel_flux[ipixel],pixel_error[ipixel])
 
 
 #                        if(xx== 7 and yy == 10 and zz == 100):
@@ -508,41 +506,33 @@ def SpaxelOverlap(self, x,y,sliceno,start_slice,input_model,transform,beta_width
 #                            print(' Overlaping Spaxel',cube_index,xx,yy,zz)
 #                            print('Spaxel Area', AreaOverlap,AreaRatio*100.0)
 #________________________________________________________________________________
-def SpaxelFlux(radius_y,i,Cube,spaxel):
+def SpaxelFlux(radius_y,Cube,spaxel):
 
     """
     Short Summary
     -------------
-    based on the overlapping detector pixels and area of overlap find the flux of the spaxel
+    based on the overlapping detector pixels and area of overlap find the flux of the spaxels
 
     Parameters
     ----------
     radius_y: radius of interest in beta dimension
-    i: index of spaxel
     Cube: class holding basic information of Cube
-    spaxel: cube pixel
+    spaxel: SpaxelArrays of the cube
 
     Returns
     -------
-    weighted flux of spaxel
+    no return - the area weighted flux of the spaxels is set
 
     """
-    debug = 0 
-    num = len(spaxel[i].pixel_overlap)
-
-    #print(' For spaxel i # overlaps',num)
-    flux = 0
-    FinalWeight = 0.0
-    FinalFlux  = 0.0
-
-    for j in range (num):
-        FinalFlux = FinalFlux + spaxel[i].pixel_flux[j]*spaxel[i].pixel_overlap[j] 
-        FinalWeight = FinalWeight + spaxel[i].pixel_overlap[j] 
-    if(num > 0):
-        FinalFlux = FinalFlux/FinalWeight
-        spaxel[i].flux = FinalFlux
-        if(i == -debug):
-            print('Flux',FinalFlux,i)
-    else:
-        spaxel[i].flux = 0.0
-
+    nspaxel = len(spaxel)
+    cube_index = np.asarray(spaxel.overlap_index, dtype=np.intp)
+    overlap = np.asarray(spaxel.pixel_overlap, dtype=np.float64)
+    flux = np.asarray(spaxel.pixel_flux, dtype=np.float64)
+
+    FinalFlux = np.bincount(cube_index, weights=flux*overlap, minlength=nspaxel)
+    FinalWeight = np.bincount(cube_index, weights=overlap, minlength=nspaxel)
+    num = np.bincount(cube_index, minlength=nspaxel)
+
+    spaxel.flux = np.zeros(nspaxel)
+    index = num > 0
+    spaxel.flux[index] = FinalFlux[index]/FinalWeight[index]
@@ -1,5 +1,5 @@
 # Cube Class
-# Spaxel Class
+# Spaxel arrays Class
 
 import sys
 import numpy as np
@@ -156,25 +156,62 @@ class CubeInfo(object):
 
         
 ##################################################################################
-class Spaxel(object):
-
-    __slots__ = ['xcenter','ycenter','zcenter','flux','error','pixel_flux','pixel_error','pixel_overlap',\
-                     'pixel_beta','ipointcloud','pointcloud_weight']
-
-    def __init__(self,xcenter,ycenter,zcenter):
-        self.xcenter = xcenter    # set in cube_build_step
-        self.ycenter = ycenter    # set in cube_build_step
-        self.zcenter = zcenter    # set in cube build step
-        self.flux = 0
-        self.error = 0
-
-        self.ipointcloud = list()         # appended to in CubeCloud.MakePointCloud
-        self.pointcloud_weight = list()   # appended to in CubeCloud.MakePointCloud
-
+class SpaxelArrays(object):
+    """
+    Spaxels of the cube held in flat arrays in cube order (the x index
+    varying fastest, then y, then z): spaxel icube is at
+    z * naxis1 * naxis2 + y * naxis1 + x.
+
+    flux: flux of each spaxel
+    npoints: number of point cloud members matched to each spaxel
+
+    Matches of the point cloud to the spaxels (set in CubeCloud.FindROI)
+    are held in compressed sparse row form: the point cloud indexes and
+    weights of spaxel icube are ipointcloud[indptr[icube]:indptr[icube+1]]
+    and pointcloud_weight[indptr[icube]:indptr[icube+1]].
+
+    Overlaps of detector pixels with the spaxels (appended to in
+    CubeOverlap.SpaxelOverlap) are held in parallel lists of the spaxel
+    index, overlap ratio, pixel flux and pixel error of each overlap.
+    """
+
+    def __init__(self,naxis1,naxis2,naxis3):
+        self.naxis1 = naxis1
+        self.naxis2 = naxis2
+        self.naxis3 = naxis3
+        self.nspaxel = naxis1 * naxis2 * naxis3
+
+        self.flux = np.zeros(self.nspaxel)
+        self.npoints = np.zeros(self.nspaxel, dtype=np.intp)
+
+        self.indptr = np.zeros(self.nspaxel + 1, dtype=np.intp)
+        self.ipointcloud = np.zeros(0, dtype=np.intp)
+        self.pointcloud_weight = np.zeros(0)
+
+        self.overlap_index = list()
+        self.pixel_overlap = list()
         self.pixel_flux = list()
         self.pixel_error = list()
-        self.pixel_overlap = list()
-        self.pixel_beta = list()
+
+    def __len__(self):
+        return self.nspaxel
+
+    def SetPointCloudMatches(self,indptr,ipointcloud,pointcloud_weight):
+        self.indptr = indptr
+        self.ipointcloud = ipointcloud
+        self.pointcloud_weight = pointcloud_weight
+        self.npoints = np.diff(indptr)
+
+    def AddOverlap(self,cube_index,overlap,flux,error):
+        self.overlap_index.append(cube_index)
+        self.pixel_overlap.append(overlap)
+        self.pixel_flux.append(flux)
+        self.pixel_error.append(error)
+
+    def CubeArray(self,values):
+        """ Reshape a flat array of spaxel values to the (naxis3, naxis2, naxis1) cube
+        """
+        return np.reshape(values, (self.naxis3, self.naxis2, self.naxis1))
 
 
 
@@ -560,7 +560,7 @@ def MapDetectorToCube(self,this_channel,this_subchannel,Cube,spaxel,PixelCloud,M
     ----------
     Input - list of files to make cube from self.FileMap
     Cube - contains the basic header information of Cube
-    spaxel: List of Spaxels
+    spaxel: SpaxelArrays of the cube
 
     Returns
     -------
@@ -686,7 +686,7 @@ def FindCubeFlux(self,Cube,spaxel,PixelCloud):
     Parameter
     ----------
     Cube - contains the basic header information of Cube
-    spaxel: List of Spaxels
+    spaxel: SpaxelArrays of the cube
     PixelCloud - pixel point cloud, only filled in if doing 3-D interpolation
 
     Returns
@@ -697,62 +697,25 @@ def FindCubeFlux(self,Cube,spaxel,PixelCloud):
     """
 
     if self.interpolation == 'area':
-        nspaxel = len(spaxel)
+        CubeOverlap.SpaxelFlux(self.radius_y,Cube,spaxel)
 
-        for i in range(nspaxel):
-            s = len(spaxel[i].pixel_overlap)
-            if(s > 0):
-                CubeOverlap.SpaxelFlux(self.radius_y,i,Cube,spaxel)
-                
     elif self.interpolation =='pointcloud' :
 
-        icube = 0 
         t0 = time.time()
-        iz = 0
-
-        for z in Cube.zcoord:
-            iy = 0
-            for y in Cube.ycoord:
-                ix = 0 
-                for x in Cube.xcoord:
-                    nlen = len(spaxel[icube].ipointcloud)
-                    if(nlen > 0): 
-
-                        pointcloud_index = spaxel[icube].ipointcloud
-                        weightpt = spaxel[icube].pointcloud_weight
-                        pixelflux = PixelCloud[5,pointcloud_index]
-
-                        weight = 0
-                        value = 0 
-                        numpts = len(pixelflux) 
-
-                        for j in range(numpts):
-                            #weightpt[j] = 1
-                            weight  = weight + weightpt[j]
-                            value = value + weightpt[j]*pixelflux[j]
-
-
-                            if(icube == -52757):
-                                print('Checking ',ix,iy,iz)
-                                print('icube',icube)
-                                print('pointcloud',pointcloud_index[j])
-                                print('flux',pixelflux[j])
-                                print('w',weightpt[j])
-                                    
-                            
-
-                        if(weight !=0):
-                            value = value/weight
-                            spaxel[icube].flux=value
-                            if(icube == -52757):
-                                print('Final Flux',value*weight,weight,value)
-
-
-                    icube = icube+1 
-                    ix = ix + 1
-                iy = iy + 1
-            iz = iz + 1 
-                        
+        nspaxel = len(spaxel)
+
+        # spaxel index of each point cloud match, the matches being sorted
+        # by spaxel (and by point cloud index for each spaxel)
+        cube_index = np.repeat(np.arange(nspaxel), spaxel.npoints)
+        weightpt = spaxel.pointcloud_weight
+        pixelflux = PixelCloud[5,spaxel.ipointcloud]
+
+        weight = np.bincount(cube_index, weights=weightpt, minlength=nspaxel)
+        value = np.bincount(cube_index, weights=weightpt*pixelflux, minlength=nspaxel)
+
+        index = weight != 0
+        spaxel.flux[index] = value[index]/weight[index]
+
         t1 = time.time()
         log.info ("Time to interpolate at spaxel values = %.1f.s" % (t1-t0,))
 
@@ -816,7 +779,7 @@ def WriteCube(self,Cube,spaxel):
     Parameters
     ----------
     Cube: holds meta data of cube
-    spaxel: list of spaxels in cube
+    spaxel: SpaxelArrays of the cube
     
 
     Returns
@@ -832,13 +795,8 @@ def WriteCube(self,Cube,spaxel):
     dq_cube = np.zeros((Cube.naxis3,Cube.naxis2,Cube.naxis1))
     err_cube = np.zeros((Cube.naxis3,Cube.naxis2,Cube.naxis1))
 
-    icube = 0 
-    for z in range(Cube.naxis3):
-        for y in range(Cube.naxis2):
-            for x in range(Cube.naxis1):
-                data[z,y,x] = spaxel[icube].flux
-                idata[z,y,x] = len(spaxel[icube].ipointcloud)
-                icube = icube +1
+    data[:] = spaxel.CubeArray(spaxel.flux)
+    idata[:] = spaxel.CubeArray(spaxel.npoints)
 
 
 
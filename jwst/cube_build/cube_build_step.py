@@ -185,20 +185,8 @@ class CubeBuildStep (Step):
                    self.log.info( 'Region of interest %f %f %f',self.radius_x,self.radius_y,self.radius_z)
                    self.log.info( 'Power parameters for weighting %5.1f %5.1f %5.1f',self.power_x, self.power_y,self.power_z)
 
-            # now you have the size of cube - create an instance for each spaxel
-            # create an empty spaxel list - this will become a list of Spaxel classses
-            spaxel = []
-
-            # set up center of the corner cube spaxel
-            t0 = time.time()
-            for z in range(Cube.naxis3):
-                for y in range(Cube.naxis2):
-                    for x in range(Cube.naxis1):
-                        spaxel.append(cube.Spaxel(Cube.xcoord[x],Cube.ycoord[y],Cube.zcoord[z]))
-
-                        
-            t1 = time.time()
-            print ("Time to create list of spaxel classes = %.1f.s" % (t1-t0,))
+            # now you have the size of cube - create the arrays holding the spaxels
+            spaxel = cube.SpaxelArrays(Cube.naxis1,Cube.naxis2,Cube.naxis3)
 
 
             # create an empty Pixel Cloud array of 8 columns
@@ -0,0 +1,116 @@
+from __future__ import absolute_import, division
+
+import numpy as np
+from numpy.testing import assert_allclose, assert_array_equal
+
+from jwst.cube_build import CubeCloud
+
+
+class Namespace(object):
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def make_cube(naxis1=7, naxis2=6, naxis3=5):
+    return Namespace(naxis1=naxis1, naxis2=naxis2, naxis3=naxis3,
+                     xcoord=-1.5 + 0.5 * np.arange(naxis1),
+                     ycoord=-1.25 + 0.5 * np.arange(naxis2),
+                     zcoord=5.0 + 0.25 * np.arange(naxis3))
+
+
+def make_point_cloud(cube, npoints=200, seed=3):
+    """A point cloud spread over and beyond the cube, with some points on
+    the grid of spaxel centers so that distances equal to the radius of
+    interest occur.  The last point is inside the cube."""
+    rng = np.random.RandomState(seed)
+    cloud = np.zeros((10, npoints))
+    for axis, coord in ((0, cube.xcoord), (1, cube.ycoord),
+                        (2, cube.zcoord)):
+        step = coord[1] - coord[0]
+        cloud[axis] = rng.uniform(coord[0] - 2 * step, coord[-1] + 2 * step,
+                                  npoints)
+        on_grid = rng.randint(0, 4, npoints) == 0
+        cloud[axis, on_grid] = rng.choice(coord, on_grid.sum())
+        cloud[axis, -1] = coord[len(coord) // 2]
+    cloud[3:5] = cloud[0:2] + 0.125
+    return cloud
+
+
+def find_roi_loop(roi, cube, point_cloud):
+    """The former point by point matching of FindROI, returning the point
+    cloud indexes and weights of each spaxel."""
+    nplane = cube.naxis1 * cube.naxis2
+    nspaxel = nplane * cube.naxis3
+    lower_limit = 0.0001
+    ipointcloud = [[] for icube in range(nspaxel)]
+    weights = [[] for icube in range(nspaxel)]
+
+    nn = len(point_cloud[0])
+    for ipt in range(0, nn - 1):
+        if roi.coord_system == 'alpha-beta':
+            coord1, coord2 = point_cloud[3, ipt], point_cloud[4, ipt]
+        else:
+            coord1, coord2 = point_cloud[0, ipt], point_cloud[1, ipt]
+        wave = point_cloud[2, ipt]
+        indexz = np.where(abs(cube.zcoord - wave) <= roi.radius_z)[0]
+        indexx = np.where(abs(cube.xcoord - coord1) <= roi.radius_x)[0]
+        indexy = np.where(abs(cube.ycoord - coord2) <= roi.radius_y)[0]
+        distance12 = (cube.xcoord[indexx] - coord1)**2
+        distance22 = (cube.ycoord[indexy] - coord2)**2
+        distance32 = (cube.zcoord[indexz] - wave)**2
+        for iz, zz in enumerate(indexz):
+            for iy, yy in enumerate(indexy):
+                for ix, xx in enumerate(indexx):
+                    weight_distance = (distance12[ix] + distance22[iy] +
+                                       distance32[iz])
+                    if weight_distance < lower_limit:
+                        weight_distance = lower_limit
+                    cube_index = zz * nplane + yy * cube.naxis1 + xx
+                    ipointcloud[cube_index].append(ipt)
+                    weights[cube_index].append(1.0 / weight_distance)
+    return ipointcloud, weights
+
+
+def check_find_roi_sparse(coord_system, chunk_size):
+    cube = make_cube()
+    point_cloud = make_point_cloud(cube)
+    nn = point_cloud.shape[1]
+    roi = Namespace(coord_system=coord_system, radius_x=0.5, radius_y=0.75,
+                    radius_z=0.25)
+
+    indptr, ipointcloud, weight = CubeCloud.FindROISparse(
+        roi, cube, point_cloud, chunk_size=chunk_size)
+    expected_points, expected_weights = find_roi_loop(roi, cube, point_cloud)
+
+    assert len(indptr) == len(expected_points) + 1
+    assert indptr[-1] == len(ipointcloud) == len(weight)
+    nlast = 0
+    for icube in range(len(expected_points)):
+        points = ipointcloud[indptr[icube]:indptr[icube + 1]]
+        weights = weight[indptr[icube]:indptr[icube + 1]]
+        # The loop skipped the last point of the cloud, which is now
+        # matched too
+        is_last = points == nn - 1
+        nlast += is_last.sum()
+        assert_array_equal(points[~is_last], expected_points[icube])
+        assert_allclose(weights[~is_last], expected_weights[icube],
+                        rtol=1e-12)
+    assert nlast > 0
+
+
+def test_find_roi_sparse():
+    for coord_system in ('v2-v3', 'alpha-beta'):
+        for chunk_size in (50000, 7):
+            check_find_roi_sparse(coord_system, chunk_size)
+
+
+def test_find_roi_sparse_empty():
+    cube = make_cube()
+    roi = Namespace(coord_system='v2-v3', radius_x=0.5, radius_y=0.5,
+                    radius_z=0.25)
+    nspaxel = cube.naxis1 * cube.naxis2 * cube.naxis3
+
+    indptr, ipointcloud, weight = CubeCloud.FindROISparse(
+        roi, cube, np.zeros((10, 0)))
+    assert_array_equal(indptr, np.zeros(nspaxel + 1))
+    assert len(ipointcloud) == len(weight) == 0
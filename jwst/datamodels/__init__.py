@@ -29,11 +29,13 @@
 
 from __future__ import absolute_import, unicode_literals, division, print_function
 
+import sys
+
 import numpy as np
 from os.path import basename
 from astropy.extern import six
 
-from .model_base import DataModel
+from .model_base import DataModel, clear_schema_cache, schema_cache_info
 from .amilg import AmiLgModel
 from .asn import AsnModel
 from .combinedspec import CombinedSpecModel
@@ -77,7 +79,8 @@ from .util import fits_header_name
 
 
 __all__ = [
-    'open',
+    'open', 'model_class_for_hdulist', 'clear_schema_cache',
+    'schema_cache_info',
     'DataModel', 'AmiLgModel', 'AsnModel', 'ContrastModel',
     'CubeModel', 'CubeFlatModel', 'DarkModel', 'DrizParsModel',
     'NircamDrizParsModel', 'MiriImgDrizParsModel',
@@ -92,7 +95,7 @@ __all__ = [
     'StrayLightModel']
 
 
-def open(init=None, extensions=None):
+def open(init=None, extensions=None, lazy_load=False):
     """
     Creates a Model from a number of different types
 
@@ -121,6 +124,10 @@ def open(init=None, extensions=None):
         A list of extensions to the ASDF to support when reading
         and writing ASDF files.
 
+    lazy_load : bool
+        If True, the arrays of a FITS file are only read when they are
+        first accessed (see `DataModel`).
+
    Results
     -------
 
@@ -147,42 +154,85 @@ def open(init=None, extensions=None):
         for item in init:
             if not isinstance(item, int):
                 raise ValueError("shape must be a tuple of ints")
-        shape = init
+        new_class = _model_class_for_shape(init)
     elif isinstance(init, np.ndarray):
-        shape = init.shape
-    else:
-        if isinstance(init, (six.text_type, bytes)) or hasattr(init, "read"):
-            hdulist = fits.open(init)
-        elif isinstance(init, fits.HDUList):
-            hdulist = init
+        new_class = _model_class_for_shape(init.shape)
+    elif isinstance(init, fits.HDUList):
+        new_class = model_class_for_hdulist(init)
+    elif isinstance(init, (six.text_type, bytes)) or hasattr(init, "read"):
+        # The file is opened once, to choose the model class from its
+        # headers and to read the model from it
+        if lazy_load:
+            hdulist = fits.open(init, memmap=True)
         else:
-            raise TypeError(
-                "init must be None, shape tuple, file path, "
-                "readable file object, or astropy.io.fits.HDUList")
+            hdulist = fits.open(init)
+        try:
+            new_class = model_class_for_hdulist(hdulist)
+            model = new_class(hdulist, extensions=extensions,
+                              lazy_load=lazy_load)
+            if isinstance(init, (six.text_type, bytes)):
+                if isinstance(init, bytes):
+                    init = init.decode(sys.getfilesystemencoding())
+                model.meta.filename = basename(init)
+        except:
+            hdulist.close()
+            raise
+        model._files_to_close.append(hdulist)
+        return model
+    else:
+        raise TypeError(
+            "init must be None, shape tuple, file path, "
+            "readable file object, or astropy.io.fits.HDUList")
+
+    return new_class(init, extensions=extensions, lazy_load=lazy_load)
+
+
+def model_class_for_hdulist(hdulist):
+    """
+    Returns the model class that `open` uses for a FITS file, chosen from
+    the shape of its SCI extension and the presence of a REFOUT
+    extension.  Only the headers are read, not the arrays.
+
+    Parameters
+    ----------
+    hdulist : astropy.io.fits.HDUList
 
-        shape = ()
+    Returns
+    -------
+    model_class : DataModel subclass
+    """
+    shape = ()
+    try:
+        hdu = hdulist[fits_header_name('SCI')]
+    except KeyError:
+        pass
+    else:
+        if hasattr(hdu, 'shape'):
+            header = hdu.header
+            naxis = header.get('NAXIS', 0)
+            shape = tuple(header.get('NAXIS{0}'.format(i), 0)
+                          for i in range(naxis, 0, -1))
+
+    if len(shape) == 4:
         try:
-            hdu = hdulist[fits_header_name('SCI')]
+            hdulist[fits_header_name('REFOUT')]
         except KeyError:
             pass
         else:
-            if hasattr(hdu, 'shape'):
-                shape = hdu.shape
+            from . import miri_ramp
+            return miri_ramp.MIRIRampModel
+    return _model_class_for_shape(shape)
 
+
+def _model_class_for_shape(shape):
     # Here, we try to be clever about which type to
     # return, otherwise, just return a new instance of the
     # requested class
     if len(shape) == 0:
         new_class = DataModel
     elif len(shape) == 4:
-        try:
-            refouthdu = hdulist[fits_header_name('REFOUT')]
-        except KeyError:
-            from . import ramp
-            new_class = ramp.RampModel
-        else:
-            from . import miri_ramp
-            new_class = miri_ramp.MIRIRampModel
+        from . import ramp
+        new_class = ramp.RampModel
     elif len(shape) == 3:
         from . import cube
         new_class = cube.CubeModel
@@ -191,8 +241,7 @@ def open(init=None, extensions=None):
         new_class = image.ImageModel
     else:
         raise ValueError("Don't have a model class to match the shape")
-
-    return new_class(init, extensions=extensions)
+    return new_class
 
 
 def test( verbose=False ) :
@@ -441,7 +441,7 @@ def _fits_keyword_loader(hdulist, fits_keyword, schema, hdu_index, known_keyword
     return val
 
 
-def _fits_array_loader(hdulist, schema, hdu_index, known_datas):
+def _fits_array_loader(hdulist, schema, hdu_index, known_datas, lazy=False):
     hdu_name = _get_hdu_name(schema)
     _assert_non_primary_hdu(hdu_name)
     try:
@@ -451,8 +451,19 @@ def _fits_array_loader(hdulist, schema, hdu_index, known_datas):
 
     known_datas.add(hdu)
 
+    if lazy:
+        return properties.LazyArray(lambda: _load_fits_array(hdu, schema))
+    return _load_fits_array(hdu, schema)
+
+
+def _load_fits_array(hdu, schema):
     data = hdu.data
     data = properties._cast(data, schema)
+    temp_schema = {
+        '$schema':
+        'http://stsci.edu/schemas/asdf-schema/0.1.0/asdf-schema'}
+    temp_schema.update(schema)
+    asdf_schema.validate(data, schema=temp_schema)
     return data
 
 
@@ -467,7 +478,7 @@ def _schema_has_fits_hdu(schema):
 
 
 def _load_from_schema(hdulist, schema, tree, validate=True,
-                      pass_invalid_values=False):
+                      pass_invalid_values=False, lazy=False):
     known_keywords = {}
     known_datas = set()
 
@@ -500,13 +511,8 @@ def _load_from_schema(hdulist, schema, tree, validate=True,
         elif 'fits_hdu' in schema and (
                 'max_ndim' in schema or 'ndim' in schema or 'datatype' in schema):
             result = _fits_array_loader(
-                hdulist, schema, ctx.get('hdu_index'), known_datas)
+                hdulist, schema, ctx.get('hdu_index'), known_datas, lazy)
             if result is not None:
-                temp_schema = {
-                    '$schema':
-                    'http://stsci.edu/schemas/asdf-schema/0.1.0/asdf-schema'}
-                temp_schema.update(schema)
-                asdf_schema.validate(result, schema=temp_schema)
                 properties.put_value(path, result, tree)
 
         if schema.get('type') == 'array':
@@ -523,7 +529,7 @@ def _load_from_schema(hdulist, schema, tree, validate=True,
     return known_keywords, known_datas
 
 
-def _load_extra_fits(hdulist, known_keywords, known_datas, tree):
+def _load_extra_fits(hdulist, known_keywords, known_datas, tree, lazy=False):
     # Handle _extra_fits
     for hdu in hdulist:
         known = known_keywords.get(hdu, set())
@@ -539,7 +545,13 @@ def _load_extra_fits(hdulist, known_keywords, known_datas, tree):
                 ['extra_fits', hdu.name, 'header'], cards, tree)
 
         if hdu not in known_datas:
-            if hdu.data is not None:
+            if lazy:
+                # Look at the header rather than reading the data
+                if hdu.header.get('NAXIS', 0) > 0:
+                    properties.put_value(
+                        ['extra_fits', hdu.name, 'data'],
+                        properties.LazyArray(lambda hdu=hdu: hdu.data), tree)
+            elif hdu.data is not None:
                 properties.put_value(
                     ['extra_fits', hdu.name, 'data'], hdu.data, tree)
 
@@ -561,13 +573,24 @@ def _load_history(hdulist, tree):
 
 
 def from_fits(hdulist, schema, extensions=None, validate=True,
-              pass_invalid_values=False):
+              pass_invalid_values=False, lazy=False):
+    """
+    Read a model's tree from a FITS file.
+
+    If ``lazy`` is `True`, the arrays are not read when the file is
+    opened.  They are put in the tree as `properties.LazyArray`
+    placeholders, and read, cast and validated the first time they are
+    accessed, so opening a file only to read its metadata just reads
+    the headers.  The arrays can only be read while ``hdulist`` is
+    open.
+    """
     ff = fits_embed.AsdfInFits.open(hdulist, extensions=extensions)
 
     known_keywords, known_datas = _load_from_schema(
         hdulist, schema, ff.tree, validate,
-        pass_invalid_values=pass_invalid_values)
-    _load_extra_fits(hdulist, known_keywords, known_datas, ff.tree)
+        pass_invalid_values=pass_invalid_values, lazy=lazy)
+    _load_extra_fits(hdulist, known_keywords, known_datas, ff.tree,
+                     lazy=lazy)
     _load_history(hdulist, ff.tree)
 
     return ff
@@ -4,6 +4,7 @@ Data model class heirarchy
 """
 from __future__ import absolute_import, unicode_literals, division, print_function
 
+import contextlib
 import copy
 import datetime
 import inspect
@@ -32,14 +33,122 @@ from gwcs.extension import GWCSExtension
 jwst_extensions = [GWCSExtension(), JWSTExtension()]
 
 
+# Process-wide cache of resolved and flattened schemas, keyed by the schema
+# path and the set of extension types.  The schemas are shared by all of
+# the models that use them, so they must not be modified in place.
+_schema_cache = {}
+_schema_cache_stats = {'hits': 0, 'misses': 0}
+
+
+def _schema_cache_key(schema_path, extensions):
+    return (schema_path,
+            frozenset(type(extension) for extension in extensions))
+
+
+def get_cached_schema(schema_path, extensions):
+    """
+    Returns the resolved and flattened schema at the given path,
+    loading it on first use and caching it for the rest of the process.
+
+    Parameters
+    ----------
+    schema_path : str
+        The path to the schema file.
+
+    extensions : list of AsdfExtension
+        The extensions in effect for the model using the schema.
+
+    Returns
+    -------
+    schema : schema tree
+        The flattened schema.  This is shared with other models and
+        must not be modified.
+    """
+    key = _schema_cache_key(schema_path, extensions)
+    try:
+        schema = _schema_cache[key]
+    except KeyError:
+        _schema_cache_stats['misses'] += 1
+        schema = asdf_schema.load_schema(
+            schema_path, resolve_references=True)
+        schema = mschema.flatten_combiners(schema)
+        _schema_cache[key] = schema
+    else:
+        _schema_cache_stats['hits'] += 1
+    return schema
+
+
+def is_cached_schema(schema):
+    """
+    Returns `True` if the given schema tree is one of the cached
+    (already flattened) schemas.
+    """
+    return any(schema is cached for cached in six.itervalues(_schema_cache))
+
+
+def clear_schema_cache(schema_path=None):
+    """
+    Invalidates cached schemas, so they will be reloaded from disk the
+    next time a model needs them.
+
+    Parameters
+    ----------
+    schema_path : str, optional
+        Only invalidate the schemas loaded from this path.  If not
+        provided, the whole cache is cleared and the hit and miss counts
+        are reset.
+    """
+    if schema_path is None:
+        _schema_cache.clear()
+        _schema_cache_stats['hits'] = 0
+        _schema_cache_stats['misses'] = 0
+    else:
+        for key in list(_schema_cache):
+            if key[0] == schema_path:
+                del _schema_cache[key]
+
+
+def schema_cache_info():
+    """
+    Returns a dictionary with the number of cache ``hits`` and
+    ``misses`` since the cache was last cleared, and the number of
+    schemas currently cached (``size``).
+    """
+    info = dict(_schema_cache_stats)
+    info['size'] = len(_schema_cache)
+    return info
+
+
+def _iteritems(tree, path=[]):
+    """
+    Iterates over the leaves of a model tree as (dotted key, value) pairs.
+    """
+    if isinstance(tree, dict):
+        for key, val in six.iteritems(tree):
+            for x in _iteritems(val, path + [key]):
+                yield x
+    elif isinstance(tree, (list, tuple)):
+        for i, val in enumerate(tree):
+            for x in _iteritems(val, path + [i]):
+                yield x
+    elif tree is not None:
+        yield ('.'.join(six.text_type(x) for x in path), tree)
+
+
 class DataModel(properties.ObjectNode):
     """
     Base class of all of the data models.
     """
     schema_url = "core.schema.yaml"
 
+    # Depth of nested deferred_validation blocks
+    _validation_deferred = 0
+
+    # Set by transfer(): the tree is handed over instead of copied
+    _transferred = False
+
     def __init__(self, init=None, schema=None, extensions=None,
-                 pass_invalid_values=False):
+                 pass_invalid_values=False, lazy_load=False):
         """
         Parameters
         ----------
@@ -71,17 +180,15 @@ class DataModel(properties.ObjectNode):
         
         pass_invalid_values: If True, values that do not validate the schema can
             be read and written, but with a warning message
+
+        lazy_load: If True, the arrays of a FITS file are memory mapped and
+            only read, cast and validated when they are first accessed, so
+            opening a file to read its metadata only reads the headers.  The
+            arrays must be accessed before the model is closed.
         """
         filename = os.path.abspath(inspect.getfile(self.__class__))
         base_url = os.path.join(
             os.path.dirname(filename), 'schemas', '')
-        
-        if schema is None:
-            schema_path = os.path.join(base_url, self.schema_url)
-            schema = asdf_schema.load_schema(
-                schema_path, resolve_references=True)
-
-        self._schema = mschema.flatten_combiners(schema)
 
         if extensions is not None:
             extensions.extend(jwst_extensions)
@@ -89,6 +196,15 @@ class DataModel(properties.ObjectNode):
             extensions = jwst_extensions[:]
         self._extensions = extensions
 
+        if schema is None:
+            schema_path = os.path.join(base_url, self.schema_url)
+            self._schema = get_cached_schema(schema_path, extensions)
+        elif is_cached_schema(schema):
+            # e.g. from copy(); it is already flattened
+            self._schema = schema
+        else:
+            self._schema = mschema.flatten_combiners(schema)
+
         if "PASS_INVALID_VALUES" in os.environ:
             pass_invalid_values = os.environ["PASS_INVALID_VALUES"]
             try:
@@ -111,7 +227,14 @@ class DataModel(properties.ObjectNode):
             shape = init.shape
             is_array = True
         elif isinstance(init, self.__class__):
-            instance = copy.deepcopy(init._instance)
+            if init._transferred:
+                # The caller gave up init, so take over its tree, and
+                # the transfer with it
+                init._transferred = False
+                instance = properties.load_lazy(init._instance)
+                self._transferred = True
+            else:
+                instance = copy.deepcopy(properties.load_lazy(init._instance))
             self._schema = init._schema
             self._shape = init._shape
             self._asdf = AsdfFile(instance, extensions=self._extensions)
@@ -136,12 +259,16 @@ class DataModel(properties.ObjectNode):
             asdf = fits_support.from_fits(init, self._schema,
                                           extensions=self._extensions,
                                           validate=False,
-                                          pass_invalid_values=self._pass_invalid_values)
+                                          pass_invalid_values=self._pass_invalid_values,
+                                          lazy=lazy_load)
         elif isinstance(init, six.string_types):
             if isinstance(init, bytes):
                 init = init.decode(sys.getfilesystemencoding())
             try:
-                hdulist = fits.open(init)
+                if lazy_load:
+                    hdulist = fits.open(init, memmap=True)
+                else:
+                    hdulist = fits.open(init)
             except IOError:
                 try:
                     asdf = AsdfFile.open(init, extensions=self._extensions)
@@ -153,7 +280,8 @@ class DataModel(properties.ObjectNode):
                 asdf = fits_support.from_fits(hdulist, self._schema,
                                               extensions=self._extensions,
                                               validate=False,
-                                              pass_invalid_values=self._pass_invalid_values)
+                                              pass_invalid_values=self._pass_invalid_values,
+                                              lazy=lazy_load)
                 self._files_to_close.append(hdulist)
 
         self._shape = shape
@@ -193,10 +321,70 @@ class DataModel(properties.ObjectNode):
             if fd is not None:
                 fd.close()
 
+    def validate(self):
+        """
+        Validate the whole model against its schema.
+
+        Assignments to the model only validate the assigned values, so
+        this is mostly useful after changes made inside
+        `deferred_validation`, or made to the tree directly.
+
+        Raises
+        ------
+        jsonschema.ValidationError
+        """
+        properties.validate_tree(self._instance, self._schema, self)
+
+    @contextlib.contextmanager
+    def deferred_validation(self):
+        """
+        Context manager that turns off the validation of the assignments
+        to the model, and validates the whole model once at the end of
+        the block instead, or before saving it within the block.  This
+        makes many assignments in a row cheaper, but an invalid value is
+        only reported at the end and is not reverted.
+
+        Example
+        -------
+        ::
+
+            with model.deferred_validation():
+                model.meta.exposure.start_time = start_time
+                model.meta.exposure.end_time = end_time
+        """
+        self._validation_deferred += 1
+        try:
+            yield self
+        finally:
+            self._validation_deferred -= 1
+        if not self._validation_deferred and not self._pass_invalid_values:
+            self.validate()
+
+    def transfer(self):
+        """
+        Give up this model to the code it is passed to, e.g. a step of a
+        pipeline.  The next call to `copy`, or to the model class with
+        this model as ``init`` (as in `jwst.datamodels.open`), hands over
+        the model instead of copying it, so that its arrays are modified
+        in place.  The caller must not use the model afterwards.
+
+        Returns
+        -------
+        model : DataModel
+            This model.
+        """
+        self._transferred = True
+        return self
+
     def copy(self):
         """
-        Returns a deep copy of this model.
+        Returns a deep copy of this model, or the model itself if it was
+        given up with `transfer`.
         """
+        properties.load_lazy(self._instance)
+        if self._transferred:
+            self._transferred = False
+            return self
         result = self.__class__(
             init=copy.deepcopy(self._instance), schema=self._schema, extensions=self._extensions)
         result._shape = self._shape
@@ -243,6 +431,9 @@ class DataModel(properties.ObjectNode):
         ----------
         path : string
         """
+        if self._validation_deferred and not self._pass_invalid_values:
+            self.validate()
+
         base, ext = os.path.splitext(path)
         if isinstance(ext, bytes):
             ext = ext.decode(sys.getfilesystemencoding())
@@ -292,6 +483,7 @@ class DataModel(properties.ObjectNode):
         """
         self.on_save(init)
 
+        properties.load_lazy(self._instance)
         AsdfFile(self._instance, extensions=self._extensions).write_to(init, *args, **kwargs)
 
     @classmethod
@@ -330,6 +522,7 @@ class DataModel(properties.ObjectNode):
         """
         self.on_save(init)
 
+        properties.load_lazy(self._instance)
         with fits_support.to_fits(self._instance, self._schema,
                                   extensions=self._extensions) as ff:
             ff.write_to(init, *args, **kwargs)
@@ -494,19 +687,7 @@ class DataModel(properties.ObjectNode):
 
             ( "meta.observation.date": "2012-04-22T03:22:05.432" )
         """
-        def recurse(tree, path=[]):
-            if isinstance(tree, dict):
-                for key, val in six.iteritems(tree):
-                    for x in recurse(val, path + [key]):
-                        yield x
-            elif isinstance(tree, (list, tuple)):
-                for i, val in enumerate(tree):
-                    for x in recurse(val, path + [i]):
-                        yield x
-            elif tree is not None:
-                yield ('.'.join(six.text_type(x) for x in path), tree)
-
-        for x in recurse(self._instance):
+        for x in _iteritems(properties.load_lazy(self._instance)):
             yield x
 
     if six.PY3:
@@ -686,8 +867,11 @@ class DataModel(properties.ObjectNode):
         if include_arrays:
             return dict((key, convert_val(val)) for (key, val) in self.iteritems())
         else:
-            return dict((key, convert_val(val)) for (key, val) in self.iteritems()
-                        if not isinstance(val, np.ndarray))
+            # Arrays that have not been loaded yet are left on disk
+            return dict((key, convert_val(val))
+                        for (key, val) in _iteritems(self._instance)
+                        if not isinstance(val, (np.ndarray,
+                                                properties.LazyArray)))
 
     @property
     def schema(self):
@@ -741,6 +925,7 @@ class DataModel(properties.ObjectNode):
             this system.
         """
         extensions = self._asdf._extensions
+        properties.load_lazy(self._instance)
         ff = fits_support.to_fits(self._instance, self._schema,
                                   extensions=extensions)
         hdu = fits_support.get_hdu(ff._hdulist, hdu_name)
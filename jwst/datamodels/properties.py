@@ -22,7 +22,74 @@ from asdf import tagged
 from . import util
 
 
-__all__ = ['ObjectNode', 'ListNode']
+__all__ = ['ObjectNode', 'ListNode', 'LazyArray']
+
+
+class LazyArray(object):
+    """
+    A placeholder in a model's tree for an array that has not been read
+    yet.  ``loader`` is called, with no arguments, to read (and cast and
+    validate) the array.  The placeholder is replaced in the tree by the
+    array the first time the attribute is accessed.
+    """
+    def __init__(self, loader):
+        self._loader = loader
+
+    def load(self):
+        return self._loader()
+
+
+def load_lazy(tree):
+    """
+    Replace all of the `LazyArray` placeholders in tree with the arrays
+    they stand for.  This is needed before working with the whole
+    tree, e.g. to copy or save it.
+    """
+    if isinstance(tree, dict):
+        items = six.iteritems(tree)
+    elif isinstance(tree, list):
+        items = enumerate(tree)
+    else:
+        return tree
+
+    for key, val in list(items):
+        if isinstance(val, LazyArray):
+            tree[key] = val.load()
+        else:
+            load_lazy(val)
+    return tree
+
+
+def _without_lazy(tree):
+    """
+    Returns tree without the `LazyArray` placeholders that it contains,
+    copying only the dicts and lists that are changed.  These arrays
+    are validated when they are loaded instead.
+    """
+    if isinstance(tree, dict):
+        result = tree
+        for key, val in six.iteritems(tree):
+            if isinstance(val, LazyArray):
+                new_val = None
+            else:
+                new_val = _without_lazy(val)
+            if new_val is not val:
+                if result is tree:
+                    result = copy.copy(tree)
+                if new_val is None:
+                    del result[key]
+                else:
+                    result[key] = new_val
+        return result
+    elif isinstance(tree, list):
+        new_items = [_without_lazy(val) for val in tree
+                     if not isinstance(val, LazyArray)]
+        if (len(new_items) == len(tree) and
+                all(a is b for a, b in zip(new_items, tree))):
+            return tree
+        return new_items
+    return tree
+
 
 def _cast(val, schema):
     val = _unmake_node(val)
@@ -139,6 +206,40 @@ def _get_schema_for_index(schema, i):
         return items
 
 
+def _get_schema_for_assignment(schema, attr, subschema):
+    """
+    Returns the schema of an object holding only property `attr`, made of
+    the property's `subschema` and the keywords of the object `schema`
+    that constrain which properties it may have.
+    """
+    result = {}
+    if subschema != {}:
+        result['properties'] = {attr: subschema}
+    for keyword in ['additionalProperties', 'patternProperties']:
+        if keyword in schema:
+            result[keyword] = schema[keyword]
+    return result
+
+
+def validate_tree(tree, tree_schema, ctx):
+    """
+    Validate a tree, or part of a model's tree, against a schema.  The
+    `LazyArray` placeholders of the tree are not validated.
+
+    Parameters
+    ----------
+    tree : JSON object tree
+
+    tree_schema : schema tree
+
+    ctx : DataModel
+        The model that the tree belongs to.
+    """
+    instance = yamlutil.custom_tree_to_tagged_tree(
+        _without_lazy(tree), ctx._asdf)
+    schema.validate(instance, schema=tree_schema)
+
+
 class Node(object):
     def __init__(self, instance, schema, ctx):
         self._instance = instance
@@ -147,10 +248,18 @@ class Node(object):
         self._ctx = ctx
 
     def _validate(self):
-        instance = yamlutil.custom_tree_to_tagged_tree(
-            self._instance, self._ctx._asdf)
-        schema.validate(
-            instance, schema=self._schema)
+        # The whole model is validated at the end of
+        # DataModel.deferred_validation instead
+        if not self._ctx._validation_deferred:
+            validate_tree(self._instance, self._schema, self._ctx)
+
+    def _validate_property(self, attr, val, subschema):
+        # Only the assigned value is validated, not the rest of the node
+        if not self._ctx._validation_deferred:
+            validate_tree(
+                {attr: val},
+                _get_schema_for_assignment(self._schema, attr, subschema),
+                self._ctx)
 
 
 class ObjectNode(Node):
@@ -179,6 +288,9 @@ class ObjectNode(Node):
             val = _make_default(attr, schema, self._ctx)
             self._instance[attr] = val
 
+        if isinstance(val, LazyArray):
+            val = self._instance[attr] = val.load()
+
         return _make_node(val, schema, self._ctx)
 
     def __setattr__(self, attr, val):
@@ -192,7 +304,7 @@ class ObjectNode(Node):
             old_val = self._instance.get(attr, None)
             self._instance[attr] = val
             try:
-                self._validate()
+                self._validate_property(attr, val, schema)
             except jsonschema.ValidationError:
                 # Revert the transaction
                 if not self._ctx._pass_invalid_values:
@@ -204,8 +316,6 @@ class ObjectNode(Node):
                         self._instance[attr] = old_val
                     raise
 
-
-
     def __delattr__(self, attr):
         if attr.startswith('_'):
             del self.__dict__[attr]
@@ -252,7 +362,10 @@ class ListNode(Node):
 
     def __getitem__(self, i):
         schema = _get_schema_for_index(self._schema, i)
-        return _make_node(self._instance[i], schema, self._ctx)
+        val = self._instance[i]
+        if isinstance(val, LazyArray):
+            val = self._instance[i] = val.load()
+        return _make_node(val, schema, self._ctx)
 
     def __setitem__(self, i, val):
         schema = _get_schema_for_index(self._schema, i)
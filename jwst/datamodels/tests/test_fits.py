@@ -211,6 +211,34 @@ def test_casting():
         assert np.sum(dm.data) > sum
 
 
+def test_lazy_load():
+    from ..properties import LazyArray
+
+    with ImageModel(data=np.arange(12, dtype=np.float32).reshape((3, 4)),
+                    dq=np.ones((3, 4), dtype=np.uint32)) as dm:
+        dm.meta.instrument.name = 'NIRCAM'
+        dm.save(TMP_FITS)
+
+    with ImageModel(TMP_FITS, lazy_load=True) as dm:
+        # ImageModel.__init__ accesses dq and err, but not data
+        assert isinstance(dm._instance['data'], LazyArray)
+        assert dm.meta.instrument.name == 'NIRCAM'
+        dm.meta.instrument.name = 'MIRI'
+        assert isinstance(dm._instance['data'], LazyArray)
+
+        assert_array_equal(dm.data, np.arange(12).reshape((3, 4)))
+        assert dm.data.dtype == np.float32
+        assert not isinstance(dm._instance['data'], LazyArray)
+        assert_array_equal(dm.dq, 1)
+
+    with open(TMP_FITS, lazy_load=True) as dm:
+        dm2 = dm.copy()
+        dm2.save(TMP_FITS2)
+
+    with ImageModel(TMP_FITS2) as dm:
+        assert_array_equal(dm.data, np.arange(12).reshape((3, 4)))
+
+
 # def test_comments():
 #     with RampModel(FITS_FILE) as dm:
 #         assert 'COMMENT' in (x[0] for x in dm._extra_fits.PRIMARY)
@@ -21,6 +21,7 @@ from numpy.testing.decorators import knownfailureif
 from numpy.testing import assert_array_equal
 
 from .. import DataModel, ImageModel, RampModel, MultiSlitModel, open
+from .. import model_class_for_hdulist
 from .. import schema
 
 
@@ -148,6 +149,20 @@ def test_open():
 
     with open(FITS_FILE) as dm:
         assert isinstance(dm, RampModel)
+        assert dm.meta.filename == os.path.basename(FITS_FILE)
+        assert len(dm._files_to_close) == 1
+
+
+def test_model_class_for_hdulist():
+    from astropy.io import fits
+
+    with fits.open(FITS_FILE) as hdulist:
+        assert model_class_for_hdulist(hdulist) is RampModel
+
+    hdulist = fits.HDUList([fits.PrimaryHDU()])
+    assert model_class_for_hdulist(hdulist) is DataModel
+    hdulist.append(fits.ImageHDU(np.zeros((5, 5)), name='SCI'))
+    assert model_class_for_hdulist(hdulist) is ImageModel
 
 
 def test_copy():
@@ -167,6 +182,22 @@ def test_copy():
             assert dm.meta.observation.obs_id is None
 
 
+def test_transfer():
+    with ImageModel((50, 50)) as dm:
+        with open(dm.transfer()) as dm2:
+            assert dm2.data is dm.data
+
+            # Only the first copy hands the model over
+            dm3 = dm2.copy()
+            assert dm3 is dm2
+            with dm3.copy() as dm4:
+                dm4.data[0, 0] = 42
+                assert dm.data[0, 0] == 0
+
+        with open(dm) as dm5:
+            assert dm5.data is not dm.data
+
+
 def test_section():
     with RampModel((5, 35, 40, 32)) as dm:
         section = dm.get_section('data')[3:4, 1:3]
@@ -16,6 +16,7 @@ from numpy.testing import assert_array_equal, assert_array_almost_equal
 import jsonschema
 
 from .. import DataModel, ImageModel, RampModel, MaskModel, MultiSlitModel, AsnModel
+from .. import clear_schema_cache, schema_cache_info
 
 from asdf import schema as mschema
 
@@ -551,3 +552,60 @@ def test_multislit_move_from_fits():
 def test_multislit_garbage():
     m = MultiSlitModel()
     m.slits.append('junk')
+
+
+def test_schema_cache():
+    clear_schema_cache()
+    assert schema_cache_info() == {'hits': 0, 'misses': 0, 'size': 0}
+
+    with ImageModel((10, 10)) as dm:
+        misses = schema_cache_info()['misses']
+        assert misses > 0
+
+        with ImageModel((10, 10)) as dm2:
+            info = schema_cache_info()
+            assert info['misses'] == misses
+            assert info['hits'] > 0
+            assert dm2._schema is dm._schema
+
+        with dm.copy() as dm3:
+            assert dm3._schema is dm._schema
+
+        schema_path = os.path.join(
+            os.path.dirname(os.path.dirname(__file__)), 'schemas',
+            ImageModel.schema_url)
+        clear_schema_cache(os.path.abspath(schema_path))
+        with ImageModel((10, 10)) as dm4:
+            assert schema_cache_info()['misses'] == misses + 1
+            assert dm4._schema is not dm._schema
+
+
+def test_deferred_validation():
+    with ImageModel((10, 10)) as dm:
+        with dm.deferred_validation():
+            dm.meta.instrument.name = 'FOO'
+            assert dm.meta.instrument.name == 'FOO'
+            dm.meta.instrument.name = 'MIRI'
+        assert dm.meta.instrument.name == 'MIRI'
+
+        try:
+            with dm.deferred_validation():
+                dm.meta.date = 'Not an acceptable date'
+        except jsonschema.ValidationError:
+            pass
+        else:
+            assert False
+
+
+@raises(jsonschema.ValidationError)
+def test_deferred_validation_save():
+    with ImageModel((10, 10)) as dm:
+        with dm.deferred_validation():
+            dm.meta.instrument.name = 'FOO'
+            dm.save(TMP_FITS)
+
+
+@raises(jsonschema.ValidationError)
+def test_additional_properties():
+    with ImageModel((10, 10)) as dm:
+        dm.meta.subarray.foo = 'bar'
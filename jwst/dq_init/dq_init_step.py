@@ -16,7 +16,7 @@ class DQInitStep(Step):
 
     def process(self, input):
 
-        with models.open(input) as input_model:
+        with datamodels.open(input) as input_model:
 
             # Retreive the mask reference file name
             self.mask_filename = self.get_reference_file(input_model, 'mask')
@@ -30,13 +30,10 @@ class DQInitStep(Step):
                 result.meta.cal_step.dq_init = 'SKIPPED'
                 return result
 
-            # Load the reference file
-            mask_model = models.MaskModel(self.mask_filename)
-
-            # Apply the step
-            result = dq_initialization.correct_model(input_model, mask_model)
-
-            # Close the reference file
-            mask_model.close()
+            # Load the reference file and apply the step
+            with self.open_reference_model(self.mask_filename,
+                                           datamodels.MaskModel) as mask_model:
+                result = dq_initialization.correct_model(input_model,
+                                                         mask_model)
 
         return result
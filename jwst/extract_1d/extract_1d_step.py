@@ -3,7 +3,6 @@
 import os
 from jwst.stpipe import Step
 from jwst import datamodels
-from . import extract
 
 class Extract1dStep(Step):
     """
@@ -21,6 +20,7 @@ class Extract1dStep(Step):
     reference_file_types = ['extract1d']
 
     def process(self, input):
+        from . import extract
 
         # Open the input and figure out what type of model it is
         input_model = models.open(input)
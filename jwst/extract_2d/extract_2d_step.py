@@ -2,7 +2,6 @@
 
 from jwst.stpipe import Step
 from jwst import datamodels
-from . import extract_2d
 
 class Extract2dStep(Step):
     """
@@ -14,6 +13,7 @@ class Extract2dStep(Step):
     """
 
     def process(self, input_file):
+        from . import extract_2d
 
         with models.open(input_file) as dm:
 
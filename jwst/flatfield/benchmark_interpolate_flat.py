@@ -0,0 +1,119 @@
+#! /usr/bin/env python
+#
+# benchmark_interpolate_flat.py - time flat_field.interpolate_flat on a
+#     full-frame synthetic NIRSpec-like 3-D flat field.
+#
+# The synthetic flat has `nz` wavelength planes.  Every pixel has its own
+# number of measured wavelengths; the planes beyond it are flagged with
+# NO_FLAT_FIELD (as in the reference files).  Optionally, a fraction of the
+# other planes is flagged at random too, so that the planes have to be
+# compressed.  The wavelengths of the 2-D image are drawn over the full
+# range of the flat, including some values out of range.  Both wavelength
+# directions are timed, and the interpolated flat is checked against
+# numpy.interp at a sample of pixels.
+#
+# linux usage example:
+#  ./benchmark_interpolate_flat.py 2048 20 0.1
+#  ... which runs a 2048 x 2048 flat with 20 planes, 10% of which are
+#  flagged at random.  The defaults are 2048, 10 and 0.
+
+from __future__ import division, print_function
+
+import sys
+import time
+import numpy as np
+
+from jwst.datamodels import dqflags
+from jwst.flatfield import flat_field
+
+NO_FLAT_FIELD = dqflags.pixel['NO_FLAT_FIELD']
+NSAMPLE = 1000  # number of pixels checked against numpy.interp
+
+
+def make_flat(size, nz, fraction_flagged, direction, seed=0):
+    """
+    Create a synthetic 3-D flat field and the 2-D wavelengths to
+    interpolate it at.
+
+    Returns
+    -------
+    flat_val, flat_dq, flat_wl, wl : numpy.ndarray
+        The flat field values, data quality and wavelengths, of shape
+        ``(nz, size, size)``, and the wavelengths of shape ``(size, size)``.
+    """
+    rng = np.random.RandomState(seed)
+    shape = (nz, size, size)
+
+    planes = np.linspace(1., 5., nz).reshape((nz, 1, 1))
+    if direction < 0:
+        planes = planes[::-1]
+    flat_wl = (planes + rng.uniform(-0.01, 0.01, (1, size, size))).astype(
+        np.float32)
+    flat_val = rng.uniform(0.9, 1.1, shape).astype(np.float32)
+    flat_dq = np.zeros(shape, dtype=np.uint32)
+
+    num_k = rng.randint(nz // 2, nz + 1, (size, size))
+    flat_dq[np.arange(nz).reshape((nz, 1, 1)) >= num_k] |= NO_FLAT_FIELD
+    if fraction_flagged > 0:
+        flat_dq[rng.uniform(size=shape) < fraction_flagged] |= NO_FLAT_FIELD
+
+    wl = rng.uniform(0.9, 5.1, (size, size))
+    return flat_val, flat_dq, flat_wl, wl
+
+
+def check_sample(flat_val, flat_dq, flat_wl, wl, flat_2d, direction):
+    """
+    Return the maximum difference between `flat_2d` and numpy.interp of the
+    planes which are not flagged, at a sample of pixels with wavelengths
+    within the range of the flat.
+    """
+    rng = np.random.RandomState(1)
+    max_diff = 0.
+    for j, i in rng.randint(0, wl.shape[0], (NSAMPLE, 2)):
+        good = (flat_dq[:, j, i] & NO_FLAT_FIELD) == 0
+        xp = flat_wl[good, j, i][::direction]
+        fp = flat_val[good, j, i][::direction]
+        if len(xp) < 2 or not xp[0] <= wl[j, i] <= xp[-1]:
+            continue
+        expected = np.interp(wl[j, i], xp, fp)
+        max_diff = max(max_diff, abs(flat_2d[j, i] - expected))
+    return max_diff
+
+
+def benchmark(size, nz, fraction_flagged):
+    """
+    Time interpolate_flat in both wavelength directions and print the
+    times and the differences with numpy.interp.
+    """
+    for direction in (1, -1):
+        flat_val, flat_dq, flat_wl, wl = make_flat(size, nz, fraction_flagged,
+                                                   direction)
+
+        tstart = time.time()
+        flat_2d, flat_dq_2d = flat_field.interpolate_flat(flat_val, flat_dq,
+                                                          flat_wl, wl,
+                                                          direction)
+        elapsed = time.time() - tstart
+
+        max_diff = check_sample(flat_val, flat_dq, flat_wl, wl, flat_2d,
+                                direction)
+        print('%d x %d x %d flat, direction %+d:  %8.3f s  '
+              'max difference with numpy.interp: %.3g' %
+              (nz, size, size, direction, elapsed, max_diff))
+
+
+if __name__ == "__main__":
+    """Get the size of the flat and run the benchmark.
+    """
+    usage = "usage:  ./benchmark_interpolate_flat.py [size [nz [fraction]]]"
+
+    args = sys.argv[1:]
+    if len(args) > 3:
+        print(usage)
+        sys.exit(1)
+
+    size = int(args[0]) if len(args) > 0 else 2048
+    nz = int(args[1]) if len(args) > 1 else 10
+    fraction_flagged = float(args[2]) if len(args) > 2 else 0.
+
+    benchmark(size, nz, fraction_flagged)
@@ -484,44 +484,92 @@ def interpolate_flat(flat_val, flat_dq, flat_wl, wl, direction):
     # be as many as flat_wl.shape[0], but the actual number may be smaller;
     # call it num_k.  num_k can vary from pixel to pixel within flat_wl.
     temp = np.bitwise_and(flat_dq, dqflags.pixel['NO_FLAT_FIELD'])
-    not_flagged = np.logical_not(temp.astype(np.bool))
-    num_k = not_flagged.sum(axis=0, dtype=np.intp)
+    flagged = temp.astype(bool)
+    num_k = nz - flagged.sum(axis=0, dtype=np.intp)
     max_num_k = num_k.max()
 
+    # If no pixel has any good data, there is nothing to interpolate.
+    if max_num_k == 0:
+        return (np.ones((ysize, xsize), dtype=flat_val.dtype),
+                np.full((ysize, xsize), dqflags.pixel['NO_FLAT_FIELD'],
+                        dtype=flat_dq.dtype))
+
     # Maximum index for the first axis; this can vary from pixel to pixel.
     k_max = num_k - 1
     k_max = np.where(k_max < 0, 0, k_max)       # k_max must not be negative
-    k_max_max = k_max.max()                     # for the range of a loop
 
     # Arrays for the flat field, wavelengths, and data quality array,
-    # but compressed (see below) along the first axis to remove all values
-    # that are flagged with NO_FLAT_FIELD in the data quality array.
-    compr_val = np.ones((max_num_k, ysize, xsize), dtype=flat_val.dtype)
-    compr_wl = np.zeros((max_num_k, ysize, xsize), dtype=flat_wl.dtype)
-    compr_dq = np.zeros((max_num_k, ysize, xsize), dtype=flat_dq.dtype)
-
-    for j in range(ysize):
-        for i in range(xsize):
-            compr_val[0:num_k[j,i], j, i] = np.compress(not_flagged[:, j, i],
-                                                        flat_val[:, j, i],
-                                                        axis=0)
-            compr_wl[0:num_k[j,i], j, i] = np.compress(not_flagged[:, j, i],
-                                                       flat_wl[:, j, i],
-                                                       axis=0)
-            compr_dq[0:num_k[j,i], j, i] = np.compress(not_flagged[:, j, i],
-                                                       flat_dq[:, j, i],
-                                                       axis=0)
+    # but compressed along the first axis to remove all values that are
+    # flagged with NO_FLAT_FIELD in the data quality array.  Only the pixels
+    # with a flagged plane ahead of a plane which is not flagged need to
+    # be compressed (usually the flagged planes are the last ones).  For
+    # these, a stable sort of the flags moves the planes which are not
+    # flagged to the front, keeping them in order.  The planes beyond num_k
+    # are then reset.
+    compr_val = flat_val[0:max_num_k].copy()
+    compr_wl = flat_wl[0:max_num_k].copy()
+    compr_dq = flat_dq[0:max_num_k].copy()
+
+    # (a flagged plane is ahead of one which is not flagged if and only if
+    # some flagged plane is directly followed by one which is not)
+    moved = np.logical_and(flagged[:-1],
+                           np.logical_not(flagged[1:])).any(axis=0)
+    if moved.any():
+        (jmoved, imoved) = np.nonzero(moved)
+        order = np.argsort(flagged[:, jmoved, imoved].view(np.int8),
+                           axis=0, kind='mergesort')
+        order = order[0:max_num_k]
+        compr_val[:, jmoved, imoved] = np.take_along_axis(
+                flat_val[:, jmoved, imoved], order, axis=0)
+        compr_wl[:, jmoved, imoved] = np.take_along_axis(
+                flat_wl[:, jmoved, imoved], order, axis=0)
+        compr_dq[:, jmoved, imoved] = np.take_along_axis(
+                flat_dq[:, jmoved, imoved], order, axis=0)
+        del order, jmoved, imoved
+    del moved
+
+    unused = (np.arange(max_num_k, dtype=np.intp).reshape((max_num_k, 1, 1))
+              >= num_k)
+    compr_val[unused] = 1
+    compr_wl[unused] = 0
+    compr_dq[unused] = 0
+    del unused
 
     # If there's no good data at a pixel, flag that pixel with NO_FLAT_FIELD.
     # The input probably was already flagged, but if num_k is zero, that
-    # flag would have been lost by calling np.compress() just above.
+    # flag would have been lost by the compression just above.
     compr_dq[0, :, :] = np.where(num_k == 0,
                                  dqflags.pixel['NO_FLAT_FIELD'],
                                  compr_dq[0, :, :])
 
-    # The initial value of -1 is a flag to indicate that elements have not
-    # been assigned valid values yet.
-    k = np.zeros(wl.shape, dtype=np.intp) - 1
+    # With at most one good wavelength at each pixel, there is no interval
+    # to interpolate in, so use that plane, as for a single-plane flat.
+    if max_num_k == 1:
+        return (compr_val[0], compr_dq[0])
+
+    # Look for the correct interval for linear interpolation, i.e. the
+    # last k such that compr_wl[k] <= wl (or >=, depending on `direction`),
+    # with a binary search of the valid wavelengths of every pixel at once.
+    # Multiplying by `direction` makes the wavelengths increasing.
+    sign_wl = direction * wl
+    k_low = np.zeros(wl.shape, dtype=np.intp)
+    k_high = k_max.copy()
+    while np.any(k_low < k_high):
+        k_mid = (k_low + k_high + 1) // 2
+        below = (direction * compr_wl[k_mid, iypixel, ixpixel] <= sign_wl)
+        k_low = np.where(below, k_mid, k_low)
+        k_high = np.where(below, k_high, k_mid - 1)
+    del k_high, k_mid, below
+
+    # The value of -1 flags elements for which no interval was found.
+    k_next = np.minimum(k_low + 1, k_max)
+    found = np.logical_and(
+                k_low < k_max,
+                np.logical_and(
+                    direction * compr_wl[k_low, iypixel, ixpixel] <= sign_wl,
+                    sign_wl < direction * compr_wl[k_next, iypixel, ixpixel]))
+    k = np.where(found, k_low, -1)
+    del k_low, k_next, found, sign_wl
 
     # Truncate the index for wavelengths that are outside the range of
     # flat_wl.  Near the end of this function we'll flag these pixels
@@ -539,22 +587,6 @@ def interpolate_flat(flat_val, flat_dq, flat_wl, wl, direction):
         k[:, :] = np.where(wl <= compr_wl[k_max, iypixel, ixpixel],
                            k_max - 1, k)
 
-    # Look for the correct interval for linear interpolation.
-    for k_test in range(k_max_max):
-        if direction > 0:
-            test1 = np.logical_and(wl >= compr_wl[k_test, :, :],
-                                   wl <  compr_wl[k_test+1, :, :])
-        else:
-            test1 = np.logical_and(wl <= compr_wl[k_test, :, :],
-                                   wl >  compr_wl[k_test+1, :, :])
-        # If an element of k is not -1, it has already been assigned, and
-        # I don't want to clobber it.
-        test2 = np.logical_and(k == -1, test1)
-        k[:, :] = np.where(test2, k_test, k)
-        if np.all(k >= 0):
-            break
-    del test1, test2
-
     # At this point, all elements of k should have been assigned a value,
     # but check to be sure.
     if np.any(k == -1):
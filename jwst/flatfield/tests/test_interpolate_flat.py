@@ -0,0 +1,65 @@
+from __future__ import absolute_import, division
+
+import numpy as np
+from numpy.testing import assert_allclose, assert_array_equal
+
+from jwst.datamodels import dqflags
+from jwst.flatfield import flat_field
+
+NO_FLAT_FIELD = dqflags.pixel['NO_FLAT_FIELD']
+
+
+def make_flat(nz=4, ysize=3, xsize=5, seed=0):
+    """A flat with increasing wavelengths and no flagged planes."""
+    rng = np.random.RandomState(seed)
+    shape = (nz, ysize, xsize)
+    flat_val = rng.uniform(0.5, 1.5, shape).astype(np.float32)
+    flat_dq = np.zeros(shape, dtype=np.uint32)
+    flat_wl = (1. + np.arange(nz, dtype=np.float32).reshape((nz, 1, 1)) +
+               np.zeros(shape, dtype=np.float32))
+    return flat_val, flat_dq, flat_wl
+
+
+def test_interpolate_flat():
+    flat_val, flat_dq, flat_wl = make_flat()
+    wl = np.full(flat_val.shape[1:], 2.25, dtype=np.float32)
+
+    flat_2d, flat_dq_2d = flat_field.interpolate_flat(flat_val, flat_dq,
+                                                      flat_wl, wl, 1)
+    assert_allclose(flat_2d, 0.75 * flat_val[1] + 0.25 * flat_val[2],
+                    rtol=1e-6)
+    assert_array_equal(flat_dq_2d, 0)
+
+
+def test_interpolate_flat_one_good_plane():
+    flat_val, flat_dq, flat_wl = make_flat()
+    nz, ysize, xsize = flat_val.shape
+    # Leave a single plane unflagged, not always the first one, and no
+    # good plane at all at one pixel
+    flat_dq[:] = NO_FLAT_FIELD
+    good = np.arange(ysize * xsize).reshape((ysize, xsize)) % nz
+    iypixel, ixpixel = np.indices((ysize, xsize))
+    flat_dq[good, iypixel, ixpixel] = dqflags.pixel['UNRELIABLE_FLAT']
+    flat_dq[:, 0, 0] = NO_FLAT_FIELD
+    wl = np.full((ysize, xsize), 2.5, dtype=np.float32)
+
+    flat_2d, flat_dq_2d = flat_field.interpolate_flat(flat_val, flat_dq,
+                                                      flat_wl, wl, 1)
+    expected = flat_val[good, iypixel, ixpixel]
+    expected[0, 0] = 1.
+    expected_dq = flat_dq[good, iypixel, ixpixel]
+    expected_dq[0, 0] = NO_FLAT_FIELD
+    assert_array_equal(flat_2d, expected)
+    assert_array_equal(flat_dq_2d, expected_dq)
+
+
+def test_interpolate_flat_no_good_plane():
+    flat_val, flat_dq, flat_wl = make_flat()
+    flat_dq[:] = NO_FLAT_FIELD
+    wl = np.full(flat_val.shape[1:], 2.5, dtype=np.float32)
+
+    flat_2d, flat_dq_2d = flat_field.interpolate_flat(flat_val, flat_dq,
+                                                      flat_wl, wl, 1)
+    assert flat_2d.shape == wl.shape
+    assert_array_equal(flat_2d, 1.)
+    assert_array_equal(flat_dq_2d, NO_FLAT_FIELD)
@@ -30,7 +30,9 @@ def detect_jumps (input_model, gain_model, readnoise_model,
     each pixel is passed to the detection methods.
     """
 
-    # Load the data arrays that we need from the input model
+    # Load the data arrays that we need from the input model.  The output
+    # model may share the arrays with the input (see DataModel.transfer),
+    # so the SCI and ERR arrays are converted to electrons in new arrays.
     output_model = input_model.copy()
     data = input_model.data
     err  = input_model.err
@@ -61,8 +63,8 @@ def detect_jumps (input_model, gain_model, readnoise_model,
         readnoise_2d = readnoise_model.data[ystart-1:ystop,xstart-1:xstop]
 
     # Apply gain to the SCI and ERR arrays so they're in units of electrons
-    data *= gain_2d
-    err  *= gain_2d
+    data = (data * gain_2d).astype(data.dtype, copy=False)
+    err  = (err * gain_2d).astype(err.dtype, copy=False)
 
     # Apply the 2-point difference method as a first pass
     log.info('Executing two-point difference method')
@@ -0,0 +1,66 @@
+from __future__ import absolute_import, division
+
+import numpy as np
+from numpy.testing import assert_array_equal
+
+from jwst.datamodels import dqflags
+from jwst.jump import twopoint_difference as twopt
+
+
+def make_ramps(nints=2, ngroups=8, nrows=30, ncols=40, seed=1):
+    rng = np.random.RandomState(seed)
+    data = rng.poisson(20, (nints, ngroups, nrows, ncols)).cumsum(axis=1)
+    data = data.astype(np.float32)
+
+    # Add jumps, several per pixel in some cases
+    hits = rng.uniform(size=data.shape) < 0.08
+    jumps = hits * rng.randint(50, 500, size=data.shape)
+    data += np.cumsum(jumps, axis=1).astype(np.float32)
+
+    gdq = np.zeros(data.shape, dtype=np.uint8)
+    gdq[rng.uniform(size=data.shape) < 0.03] = dqflags.group['SATURATED']
+
+    read_noise = np.full((nrows, ncols), 5.5, dtype=np.float32)
+    read_noise[::7, ::5] = 0.
+
+    return data, gdq, read_noise
+
+
+def run_find_CRs(data, gdq, read_noise, vectorized):
+    data = data.copy()
+    gdq = gdq.copy()
+    median_slopes = twopt.find_CRs(data, gdq, read_noise, 4.0,
+                                   vectorized=vectorized)
+    return gdq, median_slopes
+
+
+def test_vectorized_matches_loop():
+    data, gdq, read_noise = make_ramps()
+    gdq_loop, slopes_loop = run_find_CRs(data, gdq, read_noise, False)
+    gdq_vec, slopes_vec = run_find_CRs(data, gdq, read_noise, True)
+
+    assert np.any(gdq_loop & dqflags.group['JUMP_DET'])
+    assert_array_equal(gdq_vec, gdq_loop)
+    assert_array_equal(slopes_vec, slopes_loop)
+
+
+def test_vectorized_matches_loop_with_ties():
+    # Quantized data gives many tied deviations from the median
+    data, gdq, read_noise = make_ramps(ngroups=5, seed=2)
+    data = np.round(data / 10.) * 10.
+    gdq_loop, slopes_loop = run_find_CRs(data, gdq, read_noise, False)
+    gdq_vec, slopes_vec = run_find_CRs(data, gdq, read_noise, True)
+
+    assert_array_equal(gdq_vec, gdq_loop)
+    assert_array_equal(slopes_vec, slopes_loop)
+
+
+def test_masked_median():
+    rng = np.random.RandomState(3)
+    values = rng.normal(size=(50, 7)).astype(np.float32)
+    mask = rng.uniform(size=values.shape) < 0.7
+    mask[:, 0] = True
+
+    meds = twopt._masked_median(values, mask)
+    for row in range(values.shape[0]):
+        assert meds[row] == np.median(values[row][mask[row]])
@@ -0,0 +1,75 @@
+from __future__ import absolute_import, division
+
+import numpy as np
+from numpy.testing import assert_array_equal
+
+from jwst.datamodels import dqflags
+from jwst.jump import yintercept as yint
+
+
+def make_ramps(nints=2, ngroups=9, nrows=10, ncols=12, seed=1):
+    rng = np.random.RandomState(seed)
+    group_time = 10.6
+    times = np.array([(k+1)*group_time for k in range(ngroups)])
+
+    read_noise = rng.uniform(3., 15., (nrows, ncols)).astype(np.float32)
+    shape = (nints, ngroups, nrows, ncols)
+    data = rng.normal(size=shape) * read_noise
+    data += np.cumsum(rng.poisson(0.3, shape), axis=1)
+
+    # Add jumps and some existing CR and SAT flags
+    hits = rng.uniform(size=shape) < 0.1
+    data += np.cumsum(hits * rng.uniform(20., 200., shape), axis=1)
+    data = data.astype(np.float32)
+
+    gdq = np.zeros(shape, dtype=np.uint8)
+    gdq[rng.uniform(size=shape) < 0.05] = dqflags.group['JUMP_DET']
+    gdq[:, -1][rng.uniform(size=(nints, nrows, ncols)) < 0.1] |= \
+        dqflags.group['SATURATED']
+
+    median_slopes = rng.uniform(0., 2., (nints, nrows, ncols))
+    median_slopes = median_slopes.astype(np.float32)
+
+    return data, gdq, times, read_noise, median_slopes
+
+
+def test_batched_matches_per_pixel():
+    data, gdq, times, read_noise, median_slopes = make_ramps()
+
+    gdq_pixel = gdq.copy()
+    yint.find_CRs(data, data, gdq_pixel, times, read_noise, 4.0, 1.0,
+                  median_slopes, vectorized=False)
+    gdq_batch = gdq.copy()
+    yint.find_CRs(data, data, gdq_batch, times, read_noise, 4.0, 1.0,
+                  median_slopes, vectorized=True)
+
+    assert np.any(gdq_pixel != gdq)
+    assert_array_equal(gdq_batch, gdq_pixel)
+
+
+def test_semiramp_nodes():
+    jump = dqflags.group['JUMP_DET']
+    sat = dqflags.group['SATURATED']
+    dqs = np.array([[0, 0, 0, 0, 0, 0],
+                    [0, 0, jump, 0, 0, sat],
+                    [jump, 0, 0, jump, sat, jump]], dtype=np.uint8)
+
+    pix, starts, ends = yint.semiramp_nodes(dqs)
+
+    assert_array_equal(pix, [0, 1, 1, 2, 2])
+    assert_array_equal(starts, [0, 0, 2, 0, 3])
+    assert_array_equal(ends, [6, 2, 5, 3, 4])
+
+
+def test_fit_line_batched():
+    rng = np.random.RandomState(2)
+    xx = np.arange(1., 7.) * 10.6
+    yy = rng.normal(size=(5, 6)) * 5. + xx * 0.5
+    read_noise = np.full(5, 5.)
+
+    mm, mm_err, bb, bb_err = yint.fit_line_batched(xx, yy, read_noise,
+                                                   random=True)
+    for i in range(len(yy)):
+        expected = yint.fit_line(xx, yy[i], read_noise[i], random=True)
+        np.testing.assert_allclose([mm[i], mm_err[i], bb[i], bb_err[i]],
+                                   expected, rtol=1e-8)
@@ -4,9 +4,11 @@ Two-Point Difference method for finding outliers in a 3-d ramp data cube.
 The scheme used in this variation of the method uses numpy array methods
 to compute first-differences and find the max outlier in each pixel while
 still working in the full 3-d data array. This makes detection of the first
-outlier very fast. We then iterate pixel-by-pixel over only those pixels
-that are already known to contain an outlier, to look for any additional
-outliers and set the appropriate DQ mask for all outliers in the pixel.
+outlier very fast. We then iterate over only those pixels that are already
+known to contain an outlier, to look for any additional outliers and set the
+appropriate DQ mask for all outliers in the pixel. By default each round of
+that iteration is done on all of those pixels at once with array operations;
+the original pixel-by-pixel loop is kept as an alternative.
 
 This is MUCH faster than doing all the work on a pixel-by-pixel basis.
 '''
@@ -20,7 +22,7 @@ log.setLevel(logging.DEBUG)
 
 HUGE_NUM = np.finfo(np.float32).max
 
-def find_CRs (data, gdq, read_noise, rej_threshold):
+def find_CRs (data, gdq, read_noise, rej_threshold, vectorized=True):
 
     """
     Find CRs/Jumps in each integration within the input data array.
@@ -28,6 +30,11 @@ def find_CRs (data, gdq, read_noise, rej_threshold):
     The input data array is assumed to be in units of electrons, i.e. already
     multiplied by the gain. We also assume that the read noise is in units of
     electrons.
+
+    If `vectorized` is True, the search for additional outliers in pixels
+    that already contain one is done on all of those pixels at once with
+    array operations; otherwise the original pixel-by-pixel loop is used.
+    Both give identical results.
     """
 
     # Get data characteristics
@@ -93,65 +100,159 @@ def find_CRs (data, gdq, read_noise, rej_threshold):
         r1, c1 = np.where (ratio[r,c,max_index] > rej_threshold)
         log.debug('Twopt found %d pixels with at least one CR' % (len(r1)))
 
-        # Loop over pixels that have an outlier, checking to see if they have
-        # more than 1 outlier
-        for j in range(len(r1)):
+        # Look for additional outliers in the pixels that have at least one,
+        # and set the CR flags in the input DQ array for those pixels
+        if vectorized:
+            cr_mask, meds = _find_more_crs_vectorized (first_diffs[r1, c1],
+                                   read_noise_2[r1, c1], max_index[r1, c1],
+                                   rej_threshold)
+        else:
+            cr_mask, meds = _find_more_crs_loop (first_diffs[r1, c1],
+                                   read_noise_2[r1, c1], max_index[r1, c1],
+                                   rej_threshold)
+
+        idq = gdq[integration]
+        idq[1:, r1, c1] = np.bitwise_or (idq[1:, r1, c1],
+                          dqflags.group['JUMP_DET']*np.invert(cr_mask.T))
+
+        # Save the CR-cleaned median slopes for these pixels
+        median_slopes[integration, r1, c1] = meds
+
+    # Next integration
 
-            # Row/col indexes of current pixel with an outlier
-            row, col = r1[j], c1[j]
+    return median_slopes
 
-            # Copy first_diff group values to an array with a mask
-            masked_diffs = first_diffs[row, col]
-            rn2 = read_noise_2[row, col]
 
-            # Create a saturation mask based on NaN's in the first_diffs
-            sat_mask = np.isfinite (masked_diffs)
+def _find_more_crs_loop (diffs, rn2, max_index, rej_threshold):
 
-            # Create a CR mask and initialize with the max outlier
-            cr_mask = np.ones (masked_diffs.shape, dtype=bool)
-            cr_mask[max_index[row, col]] = 0
+    """
+    Iteratively search for additional outliers in each pixel, one pixel at
+    a time.
+
+    `diffs` holds the first differences for each pixel that is already known
+    to contain an outlier, with shape (npix, ngroups-1), `rn2` the squared
+    read noise and `max_index` the index of the known outlier for each pixel.
+    Returns the CR mask (False where an outlier was found) and the CR-cleaned
+    median first difference for each pixel.
+    """
 
-            # Now iteratively search for and reject additional outliers
-            iter = 1
-            while iter:
+    cr_masks = np.ones (diffs.shape, dtype=bool)
+    meds = np.zeros (diffs.shape[0], dtype=np.float32)
 
-                # Recompute the masked median, noise, and ratios for this pixel
-                med = np.median (masked_diffs[cr_mask*sat_mask])
-                poisson_noise = np.sqrt (np.abs(med))
-                sigma = np.sqrt (poisson_noise*poisson_noise + 2*rn2)
-                ratio = np.abs (masked_diffs - med) / sigma
+    for j in range(diffs.shape[0]):
 
-                # Get a list of group indexes sorted from largest to smallest
-                # deviation from the median
-                sortindx = np.argsort (ratio)[::-1]
+        # Copy first_diff group values to an array with a mask
+        masked_diffs = diffs[j]
 
-                # Check through the list to see if any qualify as an outlier
-                for i in sortindx:
+        # Create a saturation mask based on NaN's in the first_diffs
+        sat_mask = np.isfinite (masked_diffs)
 
-                    # If already masked, continue to next index
-                    if not cr_mask[i]*sat_mask[i]:
-                        continue
+        # Create a CR mask and initialize with the max outlier
+        cr_mask = cr_masks[j]
+        cr_mask[max_index[j]] = 0
 
-                    # If above threshold, set a CR mask and iterate on this pixel
-                    elif ratio[i] > rej_threshold:
-                        cr_mask[i] = 0
-                        iter = 1
-                        break
+        # Now iteratively search for and reject additional outliers
+        iter = 1
+        while iter:
 
-                    # If not above threshold, we're done with this pixel
-                    else:
-                        iter = 0
-                        break
+            # Recompute the masked median, noise, and ratios for this pixel
+            med = np.median (masked_diffs[cr_mask*sat_mask])
+            poisson_noise = np.sqrt (np.abs(med))
+            sigma = np.sqrt (poisson_noise*poisson_noise + 2*rn2[j])
+            ratio = np.abs (masked_diffs - med) / sigma
 
-            # Set CR flags in input DQ array for this pixel
-            gdq[integration, 1:, row, col] = np.bitwise_or \
-                              (gdq[integration, 1:, row, col],
-                               dqflags.group['JUMP_DET']*np.invert(cr_mask))
+            # Get a list of group indexes sorted from largest to smallest
+            # deviation from the median
+            sortindx = np.argsort (ratio)[::-1]
 
-            # Save the CR-cleaned median slope for this pixel
-            median_slopes[integration, row, col] = med
+            # Check through the list to see if any qualify as an outlier
+            iter = 0
+            for i in sortindx:
 
-        # Next pixel with an outlier
-    # Next integration
+                # If already masked, continue to next index
+                if not cr_mask[i]*sat_mask[i]:
+                    continue
 
-    return median_slopes
+                # If above threshold, set a CR mask and iterate on this pixel
+                elif ratio[i] > rej_threshold:
+                    cr_mask[i] = 0
+                    iter = 1
+                    break
+
+                # If not above threshold, we're done with this pixel
+                else:
+                    break
+
+        meds[j] = med
+
+    return cr_masks, meds
+
+
+def _find_more_crs_vectorized (diffs, rn2, max_index, rej_threshold):
+
+    """
+    Iteratively search for additional outliers in all pixels at once.
+
+    This does the same work as `_find_more_crs_loop`, but each round of
+    re-computing the median, noise, and ratios is done on all pixels that
+    are still being iterated on, using array operations over the group axis.
+    """
+
+    npix = diffs.shape[0]
+    sat_mask = np.isfinite (diffs)
+
+    # Create a CR mask and initialize with the max outlier
+    cr_mask = np.ones (diffs.shape, dtype=bool)
+    cr_mask[np.arange(npix), max_index] = False
+
+    meds = np.zeros (npix, dtype=np.float32)
+
+    # Indexes of the pixels that are still being iterated on
+    todo = np.arange (npix)
+    while todo.size > 0:
+
+        pix = np.arange (todo.size)
+        pdiffs = diffs[todo]
+        good = cr_mask[todo] & sat_mask[todo]
+
+        # Recompute the masked median, noise, and ratios for these pixels
+        med = _masked_median (pdiffs, good)
+        poisson_noise = np.sqrt (np.abs(med))
+        sigma = np.sqrt (poisson_noise*poisson_noise + 2*rn2[todo])
+        ratio = np.abs (pdiffs - med[:,np.newaxis]) / sigma[:,np.newaxis]
+
+        # Get group indexes sorted from largest to smallest deviation from
+        # the median, and pick the first one in that order that isn't
+        # already masked
+        sortindx = np.argsort (ratio, axis=1)[:,::-1]
+        first = np.argmax (good[pix[:,np.newaxis], sortindx], axis=1)
+        cand = sortindx[pix, first]
+
+        # If above threshold, set a CR mask and iterate on the pixel;
+        # otherwise we're done with it
+        reject = good[pix, cand] & (ratio[pix, cand] > rej_threshold)
+        cr_mask[todo[reject], cand[reject]] = False
+
+        done = np.logical_not (reject)
+        meds[todo[done]] = med[done]
+        todo = todo[reject]
+
+    return cr_mask, meds
+
+
+def _masked_median (values, mask):
+
+    """
+    Compute the median along the last axis of a 2-d array, using only the
+    values where `mask` is True. Gives the same results as calling
+    np.median on the unmasked values of each row.
+    """
+
+    nvalid = mask.sum (axis=1)
+    svalues = np.sort (np.where (mask, values, np.nan), axis=1)
+
+    rows = np.arange (values.shape[0])
+    lo = svalues[rows, np.maximum ((nvalid - 1) // 2, 0)]
+    hi = svalues[rows, nvalid // 2]
+
+    return np.where (nvalid % 2 == 1, lo, (lo + hi) / 2)
@@ -54,7 +54,21 @@ class PixelRamp(object):
                 self.num_semiramps += 1
 
 
-def find_CRs (data, err, gdq, times, read_noise, rejection_threshold, signal_threshold, median_slopes):
+def find_CRs (data, err, gdq, times, read_noise, rejection_threshold, signal_threshold, median_slopes, vectorized=True):
+
+    """
+    Find CRs/jumps with the y-intercept method in all pixels whose median
+    slope is below the signal threshold, setting JUMP_DET flags in `gdq`.
+
+    If `vectorized` is True the pixels are processed in batches with array
+    operations (see `find_CRs_batched`), otherwise a PixelRamp object is
+    built and fit for each pixel in turn.
+    """
+
+    if vectorized:
+        find_CRs_batched (data, gdq, times, read_noise, rejection_threshold,
+                          signal_threshold, median_slopes)
+        return
 
     # Get the attributes of the input data array
     (nints, ngroups, nrows, ncols) = data.shape
@@ -369,3 +383,250 @@ def fit_line (xx, yy, readnoise, random=False):
 
     return mm, mm_err, bb, bb_err
 
+
+
+def find_CRs_batched (data, gdq, times, read_noise, rejection_threshold,
+                      signal_threshold, median_slopes, max_batch=100000):
+    """
+    Batched version of the y-intercept method.
+
+    All pixels in the read noise regime are gathered up front and split
+    into semi-ramps based on their existing SAT and CR flags. Semi-ramps
+    that share the same start and end groups are then fit together, using
+    array operations for the weighted line fits and y-intercept comparisons.
+    Each semi-ramp in which a new CR is found is split in two at the CR and
+    the pieces are fed back in, until no new CRs are found. CR flags are
+    set in `gdq` in bulk. No more than `max_batch` semi-ramps are fit at
+    once, to limit memory use.
+    """
+
+    # Get the attributes of the input data array
+    (nints, ngroups, nrows, ncols) = data.shape
+    group_time = times[1] - times[0]
+    jump_flag = dqflags.group['JUMP_DET']
+
+    # Loop over multiple integrations
+    for integration in range(nints):
+
+        # Find the pixels that are in the read noise regime
+        rows, cols = np.where (median_slopes[integration] < signal_threshold)
+        if len(rows) == 0:
+            continue
+
+        counts = data[integration][:, rows, cols].T
+        dqs = gdq[integration][:, rows, cols].T
+        rnoise = read_noise[rows, cols]
+
+        # Set up the initial semi-ramps for each pixel
+        pix, starts, ends = semiramp_nodes (dqs)
+
+        # Iterate until no new CRs have been detected
+        while len(pix) > 0:
+
+            # Semi-ramps too short to work with are good as they are
+            long_enough = (ends - starts) >= 3
+            pix, starts, ends = pix[long_enough], starts[long_enough], \
+                                ends[long_enough]
+
+            new_pix, new_starts, new_ends = [], [], []
+
+            # Process the semi-ramps in groups that share the same layout
+            layouts = np.unique (starts * (ngroups+1) + ends)
+            for layout in layouts:
+                start, end = divmod (int(layout), ngroups+1)
+                sel = np.where ((starts == start) & (ends == end))[0]
+
+                for b in range(0, len(sel), max_batch):
+                    bpix = pix[sel[b:b+max_batch]]
+
+                    ratio = yint_ratios (times[start:end],
+                                         counts[bpix, start:end],
+                                         rnoise[bpix], group_time)
+
+                    # Check for an outlier that is above rejection threshold
+                    candidate = ratio.argmax (axis=1)
+                    cr = ratio[np.arange(len(bpix)), candidate] > \
+                         rejection_threshold
+                    if not np.any (cr):
+                        continue
+
+                    # Flag the outliers and break these semi-ramps into
+                    # two pieces
+                    crpix = bpix[cr]
+                    group = start + candidate[cr] + 1
+                    gdq[integration, group, rows[crpix], cols[crpix]] |= \
+                        jump_flag
+
+                    new_pix.extend ([crpix, crpix])
+                    new_starts.extend ([np.full (len(crpix), start), group])
+                    new_ends.extend ([group, np.full (len(crpix), end)])
+
+            if len(new_pix) == 0:
+                break
+            pix = np.concatenate (new_pix)
+            starts = np.concatenate (new_starts)
+            ends = np.concatenate (new_ends)
+
+    return
+
+
+def semiramp_nodes (dqs):
+    """
+    Split pixel ramps into semi-ramps based on existing CR and SAT flags,
+    in the same way as PixelRamp.
+
+    `dqs` holds the group DQ flags for each pixel, with shape
+    (npix, ngroups). Returns the pixel index, start group and end group
+    of each semi-ramp.
+    """
+
+    npix, ngroups = dqs.shape
+
+    # The valid range of each ramp ends at the first saturated group
+    sat = np.bitwise_and (dqs, dqflags.group['SATURATED']) != 0
+    sat_end = np.where (sat.any(axis=1), sat.argmax(axis=1), ngroups)
+
+    # Semi-ramps are bounded by the start of the ramp, any CR flags before
+    # the first saturated group, and the end of the valid range
+    groups = np.arange (ngroups+1)
+    bounds = np.zeros ((npix, ngroups+1), dtype=bool)
+    bounds[:, :ngroups] = np.bitwise_and (dqs, dqflags.group['JUMP_DET']) != 0
+    bounds &= groups < sat_end[:, np.newaxis]
+    bounds[:, 0] = True
+    bounds[np.arange(npix), sat_end] = True
+
+    bpix, bgroup = np.nonzero (bounds)
+    same = bpix[:-1] == bpix[1:]
+
+    return bpix[:-1][same], bgroup[:-1][same], bgroup[1:][same]
+
+
+def yint_ratios (times, counts, read_noise, group_time):
+    """
+    Compute the scaled differences in adjacent y-intercepts for each
+    interval of a set of semi-ramps that share the same layout.
+
+    `counts` has shape (nramps, ngroups) and `read_noise` shape (nramps,).
+    This gives the same ratios as `yint` does for a single semi-ramp.
+    """
+
+    with np.errstate (divide='ignore', invalid='ignore'):
+
+        slopes, slope_errs, yints, yint_errs = \
+            fit_semiramp_batched (times, counts, read_noise)
+
+        # As in yint, the expected uncertainty used for all intervals
+        # is the one computed for the last interval of the semi-ramp
+        weight = 1. / (slope_errs[:, -1]*slope_errs[:, -1])
+        avg_slope = np.sum (slopes[:, -1]*weight, axis=1) / \
+                    np.sum (weight, axis=1)
+        pnoise = np.sqrt (np.abs(avg_slope)*group_time)
+        yerr_exp = np.sqrt (pnoise*pnoise +
+                            yint_errs[:, -1, 0]*yint_errs[:, -1, 0] +
+                            yint_errs[:, -1, 1]*yint_errs[:, -1, 1])
+
+        # Scale the differences in adjacent y-intercepts by the expected
+        # uncertainties
+        ydiff = np.abs (yints[:, :, 1] - yints[:, :, 0])
+        ratio = ydiff / yerr_exp[:, np.newaxis]
+
+    return ratio
+
+
+def fit_semiramp_batched (times, counts, readnoise):
+    """
+    Batched version of fit_semiramp, for a set of semi-ramps that share
+    the same times. Results have shape (nramps, ngroups-1, 2).
+    """
+
+    nramps, groups = counts.shape
+    slopes     = np.empty((nramps, groups-1, 2))
+    slope_errs = np.empty((nramps, groups-1, 2))
+    yints      = np.empty((nramps, groups-1, 2))
+    yint_errs  = np.empty((nramps, groups-1, 2))
+
+    # Left-hand side of the first sample pair and right-hand side of the
+    # last sample pair are just the counts in those samples
+    slopes[:, 0, 0], slope_errs[:, 0, 0] = 0., 999999.
+    yints[:, 0, 0], yint_errs[:, 0, 0] = counts[:, 0], readnoise
+    slopes[:, groups-2, 1], slope_errs[:, groups-2, 1] = 0., 999999.
+    yints[:, groups-2, 1], yint_errs[:, groups-2, 1] = \
+        counts[:, groups-1], readnoise
+
+    # Right-hand side of the first sample pair, extrapolated back one group
+    (slopes[:, 0, 1], slope_errs[:, 0, 1], yints[:, 0, 1],
+        yint_errs[:, 0, 1]) = fit_line_batched (times[1:]-times[0],
+                                                counts[:, 1:], readnoise,
+                                                random=True)
+
+    for group in range(1, groups-1):
+
+        # Left-hand side of each sample pair, extrapolated forward one group
+        (slopes[:, group, 0], slope_errs[:, group, 0], yints[:, group, 0],
+            yint_errs[:, group, 0]) = \
+            fit_line_batched (times[:group+1]-times[group+1],
+                              counts[:, :group+1], readnoise, random=True)
+
+        # Right-hand side of each sample pair, starting at the next sample
+        if group < groups-2:
+            (slopes[:, group, 1], slope_errs[:, group, 1],
+                yints[:, group, 1], yint_errs[:, group, 1]) = \
+                fit_line_batched (times[group+1:]-times[group+1],
+                                  counts[:, group+1:], readnoise, random=True)
+
+    return slopes, slope_errs, yints, yint_errs
+
+
+def fit_line_batched (xx, yy, readnoise, random=False):
+    """
+    Batched version of fit_line, fitting a 1st-order polynomial to each
+    row of `yy` against the common x values `xx`.
+
+    The covariance matrix of the readouts for each ramp is
+    pn2 * min(i,j)+1 + readnoise**2 * I. The min(i,j)+1 matrix is the same
+    for all ramps, so it is diagonalized once and each covariance matrix is
+    inverted through the shared eigenvectors, which turns the weighted fits
+    for all ramps into a few array reductions.
+    """
+
+    nn = len(xx)
+    readnoise = np.asarray (readnoise, dtype=np.float64)
+
+    # Initial slope estimate, from which Poisson noise is estimated
+    slope, yint = np.polyfit (xx, yy.T, 1)
+    photon_noise = np.sqrt (np.abs(slope) * (xx[1]-xx[0]))
+    pn2 = photon_noise*photon_noise
+
+    if nn < 3:
+        return slope, np.sqrt(pn2/2.), yint, readnoise.copy()
+
+    # Shared eigen-decomposition of the photon noise correlation matrix
+    index = np.arange (nn)
+    lam, QQ = np.linalg.eigh (np.minimum.outer(index, index) + 1.)
+
+    # Design matrix and data rotated into the eigenvector basis
+    AA = np.column_stack ((np.ones(nn), xx))
+    At = np.dot (QQ.T, AA)
+    Yt = np.dot (yy, QQ)
+
+    # Inverse of the covariance matrix in the eigenvector basis
+    ww = 1. / (pn2[:, np.newaxis]*lam + (readnoise*readnoise)[:, np.newaxis])
+
+    # Compute intercept and slope by solving the normal equations
+    p00 = np.dot (ww, At[:, 0]*At[:, 0])
+    p01 = np.dot (ww, At[:, 0]*At[:, 1])
+    p11 = np.dot (ww, At[:, 1]*At[:, 1])
+    q0 = np.dot (ww*Yt, At[:, 0])
+    q1 = np.dot (ww*Yt, At[:, 1])
+    det = p00*p11 - p01*p01
+    bb = (p11*q0 - p01*q1) / det
+    mm = (p00*q1 - p01*q0) / det
+
+    # Calculate uncertainties on slope and intercept
+    mm_err = np.sqrt (p00 / det)
+    if random:
+        bb_err = np.abs(readnoise) * sqrt (np.linalg.inv(np.dot(AA.T, AA))[0, 0])
+    else:
+        bb_err = np.sqrt (p11 / det)
+
+    return mm, mm_err, bb, bb_err
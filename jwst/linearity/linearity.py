@@ -170,7 +170,8 @@ def correct_for_NaN( lin_coeffs, input ):
     Returns
     -------
     lin_coeffs: 3D array
-        updated array of correction coefficients in reference file
+        updated copy of the array of correction coefficients in reference
+        file, or the array itself if no coefficients were updated
     """
     
     wh_nan = np.where( np.isnan( lin_coeffs ))
@@ -181,8 +182,10 @@ def correct_for_NaN( lin_coeffs, input ):
                          dtype=np.uint32 )
 
     # If there are NaNs as the correction coefficients, update those
-    # coefficients so that those SCI values will be unchanged.
+    # coefficients so that those SCI values will be unchanged. The
+    # coefficients are copied first, as the reference model is read-only.
     if len(wh_nan[0]) > 0:
+        lin_coeffs = lin_coeffs.copy()
         ben_cor = ben_coeffs( lin_coeffs ) # get benign coefficients
         num_nan = len(wh_nan[0])
 
@@ -221,7 +224,8 @@ def correct_for_flag( lin_coeffs, lin_dq ):
     Returns
     -------
     lin_coeffs: 3D array
-        updated array of correction coefficients in reference file
+        updated copy of the array of correction coefficients in reference
+        file, or the array itself if no coefficients were updated
     """
 
     wh_flag = np.bitwise_and( lin_dq, dqflags.pixel['NO_LIN_CORR'] )
@@ -231,8 +235,10 @@ def correct_for_flag( lin_coeffs, lin_dq ):
     yf, xf = wh_lin[0], wh_lin[1]
     
     # If there are pixels flagged as 'NO_LIN_CORR', update the corresponding
-    #     coefficients so that those SCI values will be unchanged.
+    #     coefficients so that those SCI values will be unchanged. The
+    #     coefficients are copied first, as the reference model is read-only.
     if (num_flag > 0):
+        lin_coeffs = lin_coeffs.copy()
         ben_cor = ben_coeffs( lin_coeffs ) # get benign coefficients
      
         for ii in range( num_flag ):
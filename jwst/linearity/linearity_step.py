@@ -14,7 +14,7 @@ class LinearityStep(Step):
     def process(self, input):
 
         # Open the input data model
-        with models.open(input) as input_model:
+        with datamodels.open(input) as input_model:
 
             # Get the name of the linearity reference file to use
             self.lin_name = self.get_reference_file(input_model, 'linearity')
@@ -28,15 +28,15 @@ class LinearityStep(Step):
                 result.meta.cal_step.linearity = 'SKIPPED'
                 return result
 
-            # Open the linearity reference file data model
-            lin_model = models.LinearityModel(self.lin_name)
+            # Open the linearity reference file data model and do the
+            # linearity correction
+            with self.open_reference_model(self.lin_name,
+                                           datamodels.LinearityModel) \
+                    as lin_model:
+                result = linearity.do_correction(input_model, lin_model)
 
-            # Do the linearity correction
-            result = linearity.do_correction(input_model, lin_model)
-
-            # Close the reference file and update the step status
-            lin_model.close()
-            result.meta.cal_step.linearity = 'COMPLETE' 
+            # Update the step status
+            result.meta.cal_step.linearity = 'COMPLETE'
   
         return result
 
@@ -9,6 +9,7 @@ Create a blotted images that match the inputs from the combined median image.
 import numpy as np
 
 from jwst.resample import gwcs_blot
+from jwst.resample import resample_utils
 from jwst import datamodels
 
 
@@ -16,13 +17,30 @@ def do_blot(median_model, input_models, **pars):
     # start by interpreting input parameters
     interp = pars.get('interp','poly5')
     sinscl = pars.get('sinscl',1.0)
+    pixmap_stepsize = pars.get('pixmap_stepsize', 1)
+    pixmap_tolerance = pars.get('pixmap_tolerance',
+                                resample_utils.PIXMAP_TOLERANCE)
+    pixmap_cache = pars.get('pixmap_cache', False)
+    nproc = pars.get('nproc', 1)
     
     # Initialize output product
     blot_models = models.ModelContainer()
 
     do_blot = gwcs_blot.GWCSBlot(median_model)
-            
-    for input_img in input_models:
+
+    input_models = list(input_models)
+    pixmap = None
+    for n, input_img in enumerate(input_models):
+        if nproc > 1:
+            if n % nproc == 0:
+                # Compute the pixel maps to the next nproc inputs in parallel
+                pixmaps = resample_utils.calc_gwcs_pixmaps(
+                    [(median_model.meta.wcs, img.meta.wcs)
+                     for img in input_models[n:n + nproc]],
+                    stepsize=pixmap_stepsize, tolerance=pixmap_tolerance,
+                    use_cache=pixmap_cache, nproc=nproc)
+            pixmap = pixmaps[n % nproc]
+
         blot_model = input_img.copy()
         blot_root = '_'.join(input_img.meta.filename.replace('.fits','').split('_')[:-1])
         blot_model.meta.filename = '{}_blot.fits'.format(blot_root)
@@ -32,7 +50,11 @@ def do_blot(median_model, input_models, **pars):
         blot_model.dq = None
         # apply blot to re-create input_img.data from median image
         blot_model.data = do_blot.extract_image(input_img.meta.wcs,
-                                        interp=interp,sinscl=sinscl)
+                                        interp=interp,sinscl=sinscl,
+                                        pixmap_stepsize=pixmap_stepsize,
+                                        pixmap_tolerance=pixmap_tolerance,
+                                        pixmap_cache=pixmap_cache,
+                                        pixmap=pixmap)
         blot_models.append(blot_model)
     return blot_models
     
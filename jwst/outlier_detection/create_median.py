@@ -5,8 +5,14 @@ NOTE: This version is simplified from astrodrizzle's version in the
         following ways:
         - type of combination: fixed to 'median'
         - 'minmed' not implemented as an option
-        - does not use buffers to try to minimize memory usage
-        
+
+The median can be computed over the full stack of drizzled images at once,
+or in horizontal strips of rows whose size is set by a memory budget
+(`buffer_size`, in MB) so that only one strip of each image needs to be
+in memory at a time.  The input arrays may then be memory-mapped.  Since
+the median of each pixel only depends on the values of that pixel in the
+stack, both ways give identical results.
+
 :Authors: Warren Hack
 
 :License:
@@ -41,35 +47,95 @@ def do_median(drizzle_groups_sci, drizzle_groups_wht, **pars):
     if low_threshold is not None: low_threshold = float(low_threshold)
 
     
+    buffer_size = pars.get('buffer_size', None)
+
+    # The weight thresholds are computed over the full weight images
+    weight_thresholds = [_weight_threshold(weight_arr, maskpt)
+                         for weight_arr in drizzle_groups_wht]
+
+    combine_pars = dict(nlow=nlow, nhigh=nhigh,
+                        upper=high_threshold, lower=low_threshold)
+
+    nrows = _strip_rows(drizzle_groups_sci, buffer_size)
+    if nrows is None:
+        return _combine(drizzle_groups_sci, drizzle_groups_wht,
+                        weight_thresholds, **combine_pars)
+
+    shape = drizzle_groups_sci[0].shape
+    median_array = None
+    for row in range(0, shape[0], nrows):
+        strip = slice(row, min(row + nrows, shape[0]))
+        median_strip = _combine([sci[strip] for sci in drizzle_groups_sci],
+                                [wht[strip] for wht in drizzle_groups_wht],
+                                weight_thresholds, **combine_pars)
+        if median_array is None:
+            median_array = np.empty(shape, dtype=median_strip.dtype)
+        median_array[strip] = median_strip
+
+    return median_array
+
+
+def _weight_threshold(weight_arr, maskpt):
+    """
+    Return the weight below which pixels are masked: `maskpt` times the
+    mean of the positive weights of the full image.
+    """
+    try:
+        tmp_mean_value = ImageStats(weight_arr, lower=1e-8,
+            fields="mean", nclip=0).mean
+    except ValueError:
+        tmp_mean_value = 0.0
+    return tmp_mean_value * maskpt
+
+
+def _strip_rows(drizzle_groups_sci, buffer_size):
+    """
+    Return the number of rows of the strips to combine at a time so that
+    the strips of all the images and their masks fit in `buffer_size` MB,
+    or None to combine the full images at once.
+    """
+    if not buffer_size or buffer_size <= 0:
+        return None
+    shape = drizzle_groups_sci[0].shape
+    if len(shape) < 2:
+        return None
+
+    # Each pixel of a strip is held as the science value, the weight
+    # value and the mask value for every image, plus the median output.
+    row_pixels = int(np.prod(shape[1:]))
+    itemsize = max(np.dtype(sci.dtype).itemsize for sci in drizzle_groups_sci)
+    row_bytes = row_pixels * (len(drizzle_groups_sci) * (2 * itemsize + 1) +
+                              itemsize)
+    nrows = max(1, int(buffer_size * 1024 * 1024) // row_bytes)
+    if nrows >= shape[0]:
+        return None
+    return nrows
+
+
+def _combine(sci_list, wht_list, weight_thresholds, **combine_pars):
+    """
+    Median combine the science arrays, masking the pixels whose weights
+    are below the thresholds.
+    """
     _weight_mask_list = []
-    
-    for weight_arr in drizzle_groups_wht:
+
+    for weight_arr, _wht_mean in zip(wht_list, weight_thresholds):
+        weight_arr = np.asarray(weight_arr)
         # Initialize an output mask array to ones
         # This array will be reused for every output weight image
         _weight_mask = np.zeros(weight_arr.shape,dtype=np.uint8)
-        try:
-            tmp_mean_value = ImageStats(weight_arr, lower=1e-8,
-                fields="mean", nclip=0).mean
-        except ValueError:
-            tmp_mean_value = 0.0
-        _wht_mean = tmp_mean_value * maskpt
         # 0 means good, 1 means bad here...
         np.putmask(_weight_mask, np.less(weight_arr,_wht_mean), 1)
-        #_weight_mask.info()
         _weight_mask_list.append(_weight_mask)
 
     # Create the combined array object using the numcombine task
-    result = numcombine.numCombine(drizzle_groups_sci,
+    result = numcombine.numCombine([np.asarray(sci) for sci in sci_list],
                             numarrayMaskList=_weight_mask_list,
                             combinationType="median",
-                            nlow=nlow,
-                            nhigh=nhigh,
-                            upper=high_threshold,
-                            lower=low_threshold
+                            **combine_pars
                         )
     median_array = result.combArrObj
-    
+
     del _weight_mask_list
-    
+
     return median_array
-    
@@ -1,10 +1,14 @@
+import os
+import shutil
+import tempfile
 import time
 import numpy as np
 from collections import OrderedDict
 
+from astropy.io import fits
+
 from jwst import datamodels
-from jwst import assign_wcs
-from jwst import resample
+from jwst.resample import resample
 
 from . import flag_cr
 from . import blot_median
@@ -43,7 +47,8 @@ class OutlierDetection(object):
                         'hthresh':None, 'lthresh':None,
                         'nsigma': '4 3', 'maskpt':0.7,
                     'grow': 1, 'ctegrow':0, 'snr': "4.0 3.0", 
-                        'scale': "0.5 0.4", 'backg': 0
+                        'scale': "0.5 0.4", 'backg': 0,
+                    'buffer_size': None
                 }
 
     def __init__(self, input_models, ref_filename=None, to_file=False, **pars):
@@ -119,26 +124,50 @@ class OutlierDetection(object):
         pars = self.outlierpars
         
         # Start by creating resampled/mosaic images for each group of exposures
-        sdriz = resample.resample.ResampleData(self.input_models, single=True, **pars)
+        sdriz = resample.ResampleData(self.input_models, single=True, **pars)
         sdriz.do_drizzle(**pars)
         drizzled_models = sdriz.output_models
+        del sdriz
         if self.to_file:
             log.info("Saving resampled grouped exposures to disk...")
             drizzled_models.save(None)
 
+        # With a memory budget, the drizzled mosaics are written out, to be
+        # read back memory-mapped for the median, so that only the strips
+        # being combined are in memory
+        drizzled_files = None
+        tmp_dir = None
+        if pars.get('buffer_size'):
+            if self.to_file:
+                drizzled_dir = os.getcwd()
+            else:
+                drizzled_dir = tmp_dir = tempfile.mkdtemp()
+                drizzled_models.save(None, path=tmp_dir)
+            drizzled_files = [os.path.join(drizzled_dir, i.meta.filename)
+                              for i in drizzled_models]
+
         # Initialize intermediate products used in the outlier detection
-        median_model = models.ImageModel(init=drizzled_models[0].data.shape)
+        median_model = datamodels.ImageModel(init=drizzled_models[0].data.shape)
         median_model.meta = drizzled_models[0].meta # provide median with initial metadata
         base_filename = self.input_models[0].meta.filename
         median_filename = '_'.join(base_filename.split('_')[:2]+['median.fits'])
         median_model.meta.filename = median_filename
 
         # Perform median combination on set of drizzled mosaics
-        drizzle_groups_sci = [i.data for i in drizzled_models]
-        drizzle_groups_wht = [i.wht for i in drizzled_models]
-        median_model.data = create_median.do_median(drizzle_groups_sci,
-                                        drizzle_groups_wht,
-                                        **pars)
+        if drizzled_files is not None:
+            del drizzled_models
+            try:
+                median_model.data = _median_from_files(drizzled_files, **pars)
+            finally:
+                if tmp_dir is not None:
+                    shutil.rmtree(tmp_dir)
+        else:
+            drizzle_groups_sci = [i.data for i in drizzled_models]
+            drizzle_groups_wht = [i.wht for i in drizzled_models]
+            median_model.data = create_median.do_median(drizzle_groups_sci,
+                                            drizzle_groups_wht,
+                                            **pars)
+            del drizzle_groups_sci, drizzle_groups_wht, drizzled_models
         if self.to_file:
             log.info("Writing out MEDIAN image to: {}".format(median_model.meta.filename))
             median_model.save(median_model.meta.filename)
@@ -157,3 +186,18 @@ class OutlierDetection(object):
 
         # clean-up (just to be explicit about being finished with these results)
         del median_model, blot_models
+
+
+def _median_from_files(filenames, **pars):
+    """
+    Median combine the drizzled mosaics saved in `filenames`, reading their
+    SCI and WHT arrays memory-mapped.
+    """
+    hdulists = [fits.open(filename, memmap=True) for filename in filenames]
+    try:
+        return create_median.do_median(
+            [hdulist['SCI'].data for hdulist in hdulists],
+            [hdulist['WHT'].data for hdulist in hdulists], **pars)
+    finally:
+        for hdulist in hdulists:
+            hdulist.close()
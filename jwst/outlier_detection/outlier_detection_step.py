@@ -2,7 +2,6 @@
 
 from jwst.stpipe import Step, cmdline
 from jwst import datamodels
-from . import outlier_detection
 
 
 class OutlierDetectionStep(Step):
@@ -34,10 +33,16 @@ class OutlierDetectionStep(Step):
         snr = string(default='4.0 3.0')
         scale = string(default='0.5 0.4')
         backg = float(default=0.0)        
+        buffer_size = float(default=0.0) # Memory budget in MB for the median; 0 for no limit
+        pixmap_stepsize = integer(min=1, default=1) # Grid spacing of interpolated pixel maps
+        pixmap_tolerance = float(default=0.01) # Max error of interpolated pixel maps
+        pixmap_cache = boolean(default=False) # Keep pixel maps in memory (up to 1 GB) for reuse
+        nproc = integer(min=1, default=1) # Number of processes drizzling groups or computing pixel maps
     """
     reference_file_types=['gain','readnoise'] # No ref file for Build6...
 
     def process(self, input, to_file=False):
+        from . import outlier_detection
 
         self.input_models = models.open(input)
 
@@ -48,7 +53,12 @@ class OutlierDetectionStep(Step):
         # Call the resampling routine
         self.step = outlier_detection.OutlierDetection(self.input_models,
                                 to_file=to_file,
-                                ref_filename = self.ref_filename)
+                                ref_filename = self.ref_filename,
+                                buffer_size=self.buffer_size,
+                                pixmap_stepsize=self.pixmap_stepsize,
+                                pixmap_tolerance=self.pixmap_tolerance,
+                                pixmap_cache=self.pixmap_cache,
+                                nproc=self.nproc)
         self.step.do_detection()
 
         return self.input_models
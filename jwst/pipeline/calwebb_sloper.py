@@ -61,28 +61,32 @@ class SloperPipeline(Pipeline):
         # open the input
         input = models.open(input)
 
+        # Each step is given the model returned by the previous one, which
+        # is not used again, so the steps correct it in place instead of
+        # copying it
+
         # apply dq_init, saturation, and ipc steps
-        input = self.dq_init(input)
-        input = self.saturation(input)
-        input = self.ipc(input)
+        input = self.dq_init(input.transfer())
+        input = self.saturation(input.transfer())
+        input = self.ipc(input.transfer())
 
         # apply superbias subtraction to all except MIRI data
         if input.meta.instrument.name != 'MIRI':
-            input = self.superbias(input)
+            input = self.superbias(input.transfer())
 
         # apply reference pixel correction
-        input = self.refpix(input)
+        input = self.refpix(input.transfer())
 
         # apply reset and lastframe corrections to MIRI data
         if input.meta.instrument.name == 'MIRI':
-            input = self.reset(input)
-            input = self.lastframe(input)
+            input = self.reset(input.transfer())
+            input = self.lastframe(input.transfer())
 
         # apply linearity, dark, and jump steps
-        input = self.linearity(input)
+        input = self.linearity(input.transfer())
         self.dark_current.output_dir = self.output_dir
-        input = self.dark_current(input)
-        input = self.jump(input)
+        input = self.dark_current(input.transfer())
+        input = self.jump(input.transfer())
 
         # save the corrected ramp data, if requested
         if self.save_calibrated_ramp:
@@ -90,7 +94,7 @@ class SloperPipeline(Pipeline):
 
         # apply the ramp_fit step
         self.ramp_fit.output_dir = self.output_dir
-        input = self.ramp_fit(input)
+        input = self.ramp_fit(input.transfer())
 
         # setup output_file for saving
         self.setup_output(input)
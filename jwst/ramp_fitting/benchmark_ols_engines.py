@@ -0,0 +1,162 @@
+#! /usr/bin/env python
+#
+# benchmark_ols_engines.py - compare the run times of the iterative
+#     (calc_slope) and batched (calc_slope_batched) OLS engines on simulated
+#     data sections having NIRCam and MIRI full-frame widths.
+#
+# Both engines are run on the same data section, and the results are
+# compared as well as timed. The data sections contain simulated ramps with
+# randomly placed cosmic rays, and saturation in a fraction of the pixels.
+#
+# linux usage example:
+#  ./benchmark_ols_engines.py 256 optim
+#  ... which runs sections of 256 rows, using optimal weighting.  The number
+#  of rows defaults to 128 and the weighting to 'unwtd'.
+
+from __future__ import division, print_function
+
+import sys
+import time
+import numpy as np
+
+from jwst.datamodels import dqflags
+from jwst.ramp_fitting import ramp_fit
+
+# name, number of groups, number of columns, number of rows in full frame
+DETECTORS = [ ('NIRCAM', 10, 2048, 2048),
+              ('MIRI', 40, 1032, 1024) ]
+
+CR_PROB = 0.01 # probability of a cosmic ray in each group of each pixel
+SAT_FRAC = 0.05 # fraction of pixels that saturate during the ramp
+
+
+def make_section( ngroups, nrows, ncols, seed=0 ):
+    """
+    Short Summary
+    -------------
+    Create a data section of simulated ramps, and its GROUPDQ section,
+    read noise and gain arrays.
+
+    Parameters
+    ----------
+    ngroups: int
+        number of groups in each ramp
+
+    nrows: int
+        number of rows in section
+
+    ncols: int
+        number of columns in section
+
+    seed: int
+        seed for random number generator
+
+    Returns
+    -------
+    data_sect: float, 3D array
+        data section
+
+    gdq_sect: int, 3D array
+        GROUPDQ section
+
+    rn_sect: float, 2D array
+        read noise values
+
+    gain_sect: float, 2D array
+        gain values
+    """
+    rng = np.random.RandomState( seed )
+    shape = ( ngroups, nrows, ncols )
+
+    rate = rng.uniform( 0., 100., ( nrows, ncols ))
+    data_sect = np.cumsum( rng.poisson( rate, shape ), axis=0 )
+    data_sect = data_sect + rng.normal( 0., 10., shape )
+
+    gdq_sect = np.zeros( shape, dtype=np.uint8 )
+    crs = rng.uniform( size=shape ) < CR_PROB
+    gdq_sect[ crs ] = dqflags.group['JUMP_DET']
+    data_sect += np.cumsum( crs * rng.uniform( 100., 1000., shape ), axis=0 )
+
+    sat_read = rng.randint( 0, ngroups, ( nrows, ncols ))
+    sat_pix = rng.uniform( size=( nrows, ncols )) < SAT_FRAC
+    sat = ( np.arange( ngroups )[:, np.newaxis, np.newaxis] >= sat_read ) & \
+          sat_pix
+    gdq_sect[ sat ] = np.bitwise_or( gdq_sect[ sat ],
+                                     dqflags.group['SATURATED'] )
+
+    rn_sect = np.zeros( ( nrows, ncols ), dtype=np.float32 ) + 10.
+    gain_sect = np.zeros( ( nrows, ncols ), dtype=np.float32 ) + 2.
+
+    return data_sect.astype( np.float32 ), gdq_sect, rn_sect, gain_sect
+
+
+def run_engine( slope_func, data_sect, gdq_sect, rn_sect, gain_sect,
+                weighting ):
+    """
+    Short Summary
+    -------------
+    Fit the data section with one of the OLS engines, returning the time
+    taken and the results.
+    """
+    ngroups = data_sect.shape[0]
+    opt_res = ramp_fit.utils.OptRes( 1, data_sect.shape[-2:], ngroups, ngroups )
+
+    tstart = time.time()
+    err_sect, t_dq_sect, m_by_var, inv_var, opt_res = \
+        slope_func( data_sect, gdq_sect, 10.7, opt_res, rn_sect, gain_sect,
+                    ngroups, ngroups, weighting )
+    elapsed = time.time() - tstart
+
+    return elapsed, (m_by_var, inv_var, opt_res.slope_2d, opt_res.inv_var_2d)
+
+
+def benchmark( nrows=128, weighting='unwtd' ):
+    """
+    Short Summary
+    -------------
+    Time both OLS engines on a section of each detector, and print the
+    times, the times extrapolated to a full frame, and whether the results
+    agree.
+
+    Parameters
+    ----------
+    nrows: int
+        number of rows in each section
+
+    weighting: string
+        'unwtd' or 'optim'
+    """
+    for name, ngroups, ncols, full_rows in DETECTORS:
+        sect = make_section( ngroups, nrows, ncols )
+
+        t_iter, res_iter = run_engine( ramp_fit.calc_slope, *sect,
+                                       weighting=weighting )
+        t_batch, res_batch = run_engine( ramp_fit.calc_slope_batched, *sect,
+                                         weighting=weighting )
+
+        same = all( np.allclose( a, b, rtol=1.e-6, equal_nan=True )
+                    for a, b in zip( res_iter, res_batch ))
+        scale = full_rows / nrows
+
+        print('%s: %d groups, section of %d x %d pixels' %
+              ( name, ngroups, nrows, ncols ))
+        print('  iterative: %8.3f s  (full frame ~ %8.1f s)' %
+              ( t_iter, t_iter * scale ))
+        print('  batched:   %8.3f s  (full frame ~ %8.1f s)' %
+              ( t_batch, t_batch * scale ))
+        print('  speedup: %.1f   results agree: %s' %
+              ( t_iter / t_batch, same ))
+
+
+if __name__=="__main__":
+    """Get the number of rows per section and the weighting, and run the
+    benchmark.
+    """
+    usage = "usage:  ./benchmark_ols_engines.py [nrows] [weighting]"
+
+    nrows = 128
+    weighting = 'unwtd'
+    if ( len(sys.argv) > 1 ): nrows = int( sys.argv[1] )
+    if ( len(sys.argv) > 2 ): weighting = sys.argv[2]
+
+    benchmark( nrows, weighting )
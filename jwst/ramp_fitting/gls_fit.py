@@ -33,10 +33,21 @@ FIT_MUST_BE_POSITIVE = 1.e10
 # the following factor to convert from CDS to single read.
 SINGLE_READOUT_RN_FACTOR = 1. / math.sqrt(2.)
 
+# This is the default limit (in bytes) on the memory used for the arrays
+# created in one call to gls_fit.  The pixels with a given number of cosmic
+# rays are fit in batches small enough to stay within this limit.
+MAX_BATCH_BYTES = 100 * 1024 * 1024
+
+# This is approximately the number of arrays with shape (nz, ngroups,
+# ngroups) that exist at the same time in gls_fit (the covariance matrix,
+# its inverse, and temporary copies made by la.solve).
+NUM_GROUP_MATRICES = 4
+
 def determine_slope(data_sect, input_var_sect,
                     gdq_sect, readnoise_sect, gain_sect,
                     frame_time, group_time, nframes_used,
-                    max_num_cr, saturated_flag, jump_flag):
+                    max_num_cr, saturated_flag, jump_flag,
+                    max_batch_bytes=None):
     """Iteratively fit a slope, intercept, and cosmic rays to a ramp.
 
     This function fits a ramp, possibly with discontinuities (cosmic-ray
@@ -115,7 +126,9 @@ def determine_slope(data_sect, input_var_sect,
 
     gls_fit is called for the subset of pixels (nz of them) that have
     num_cr cosmic ray hits within the ramp, the same number for every
-    pixel.
+    pixel.  If there are so many such pixels that the arrays in gls_fit
+    would take more than max_batch_bytes, the pixels are split into
+    batches, and gls_fit is called for each batch.
 
     Parameters
     ----------
@@ -165,6 +178,11 @@ def determine_slope(data_sect, input_var_sect,
     jump_flag: int
         dqflags.group['JUMP_DET']
 
+    max_batch_bytes: int or None
+        The approximate maximum amount of memory (bytes) to use for the
+        arrays in one call to gls_fit.  If None, MAX_BATCH_BYTES will be
+        used.
+
     Returns
     -------
     tuple:  (intercept_sect, int_var_sect, slope_sect, slope_var_sect,
@@ -208,7 +226,7 @@ def determine_slope(data_sect, input_var_sect,
                               prev_fit, prev_slope_sect,
                               frame_time, group_time, nframes_used,
                               max_num_cr, saturated_flag, jump_flag,
-                              temp_use_extra_terms)
+                              temp_use_extra_terms, max_batch_bytes)
         iter += 1
         if iter == NUM_ITER_NO_EXTRA_TERMS:
             temp_use_extra_terms = use_extra_terms
@@ -339,12 +357,14 @@ def compute_slope(data_sect, input_var_sect,
                   prev_fit, prev_slope_sect,
                   frame_time, group_time, nframes_used,
                   max_num_cr, saturated_flag, jump_flag,
-                  use_extra_terms):
+                  use_extra_terms, max_batch_bytes=None):
     """Set up the call to fit a slope to ramp data.
 
     This loops over the number of cosmic rays (jumps).  That is, all the
     ramps with no cosmic rays are processed first, then all the ramps with
-    one cosmic ray, then with two, etc.
+    one cosmic ray, then with two, etc.  The ramps with a given number of
+    cosmic rays are fit in batches, with the batch size limited by
+    max_batch_bytes.
 
     Parameters
     ----------
@@ -402,6 +422,11 @@ def compute_slope(data_sect, input_var_sect,
         covariance matrix.
         See JWST-STScI-003193.pdf
 
+    max_batch_bytes: int or None
+        The approximate maximum amount of memory (bytes) to use for the
+        arrays in one call to gls_fit.  If None, MAX_BATCH_BYTES will be
+        used.
+
     Returns
     -------
     tuple:  (intercept_sect, int_var_sect, slope_sect, slope_var_sect,
@@ -484,66 +509,100 @@ def compute_slope(data_sect, input_var_sect,
         slope_sect[one_group_mask] = data_sect[0, one_group_mask] / group_time
     del one_group_mask
 
+    if max_batch_bytes is None:
+        max_batch_bytes = MAX_BATCH_BYTES
+
     # Fit slopes for all pixels that have no cosmic ray hits anywhere in
     # the ramp, then fit slopes with one CR hit, then with two, etc.
+    ngroups = len(data_sect)
     for num_cr in range(max_num_cr + 1):
-        ngroups = len(data_sect)
         ncr_mask = (sum_flagged == num_cr)
         # Number of detector pixels flagged with num_cr CRs within the ramp.
         nz = ncr_mask.sum(dtype=np.int32)
         if nz <= 0:
             continue
 
-        # ramp_data will be a ramp with a 1-D array of pixels copied out
-        # of data_sect.
-        ramp_data = np.empty((ngroups, nz), dtype=data_sect.dtype)
-        input_var_data = np.empty((ngroups, nz), dtype=data_sect.dtype)
-        prev_fit_data = np.empty((ngroups, nz), dtype=prev_fit.dtype)
-        prev_slope_data = np.empty(nz, dtype=prev_slope_sect.dtype)
-        prev_slope_data[:] = prev_slope_sect[ncr_mask]
-        readnoise = np.empty(nz, dtype=readnoise_sect.dtype)
-        readnoise[:] = readnoise_sect[ncr_mask]
-        if gain_sect is None:
-            gain = None
-        else:
-            gain = np.empty(nz, dtype=gain_sect.dtype)
-            gain[:] = gain_sect[ncr_mask]
-        cr_flagged_2d = np.empty((ngroups, nz), dtype=cr_flagged.dtype)
-        saturated_data = np.empty((ngroups, nz), dtype=prev_fit.dtype)
-        for k in range(ngroups):
-            ramp_data[k] = data_sect[k][ncr_mask]
-            input_var_data[k] = input_var_sect[k][ncr_mask]
-            prev_fit_data[k] = prev_fit[k][ncr_mask]
-            cr_flagged_2d[k] = cr_flagged[k][ncr_mask]
-            # This is for clobbering saturated pixels.
-            saturated_data[k] = saturated[k][ncr_mask]
-
-        (result, variances) = \
-                gls_fit(ramp_data, input_var_data,
-                        prev_fit_data, prev_slope_data,
-                        readnoise, gain,
-                        frame_time, group_time, nframes_used,
-                        num_cr, cr_flagged_2d, saturated_data,
-                        use_extra_terms=use_extra_terms)
-        # Copy the intercept, slope, and cosmic-ray amplitudes and their
-        # variances to the arrays to be returned.
-        # ncr_mask is a mask array that is True for each pixel that has the
-        # current number (num_cr) of cosmic rays.  Thus, the output arrays
-        # are being populated here in sets, a different set of pixels with
-        # each iteration of this loop.
-        intercept_sect[ncr_mask] = result[:, 0].copy()
-        int_var_sect[ncr_mask] = variances[:, 0].copy()
-        slope_sect[ncr_mask] = result[:, 1].copy()
-        slope_var_sect[ncr_mask] = variances[:, 1].copy()
-        # In this loop, i is just an index.  cr_sect is populated for
-        # number of cosmic rays = 1 to num_cr, inclusive.
-        for i in range(num_cr):
-            cr_sect[ncr_mask, i] = result[:, 2+i].copy()
-            cr_var_sect[ncr_mask, i] = variances[:, 2+i].copy()
+        # The (y, x) indices of these pixels, which will be fit in batches
+        # of at most batch_size pixels.
+        (ncr_y, ncr_x) = np.where(ncr_mask)
+        batch_size = gls_batch_size(ngroups, num_cr, max_batch_bytes)
+
+        for start in range(0, nz, batch_size):
+            pix = (ncr_y[start:start + batch_size],
+                   ncr_x[start:start + batch_size])
+
+            # ramp_data will be a ramp with a 1-D array of pixels copied out
+            # of data_sect; shape (ngroups, number of pixels in the batch).
+            ramp_data = data_sect[:, pix[0], pix[1]]
+            input_var_data = input_var_sect[:, pix[0], pix[1]]
+            prev_fit_data = prev_fit[:, pix[0], pix[1]]
+            prev_slope_data = prev_slope_sect[pix]
+            readnoise = readnoise_sect[pix]
+            if gain_sect is None:
+                gain = None
+            else:
+                gain = gain_sect[pix]
+            cr_flagged_2d = cr_flagged[:, pix[0], pix[1]]
+            # This is for clobbering saturated pixels.  It has the same
+            # data type as prev_fit.
+            saturated_data = \
+                    saturated[:, pix[0], pix[1]].astype(prev_fit.dtype)
+
+            (result, variances) = \
+                    gls_fit(ramp_data, input_var_data,
+                            prev_fit_data, prev_slope_data,
+                            readnoise, gain,
+                            frame_time, group_time, nframes_used,
+                            num_cr, cr_flagged_2d, saturated_data,
+                            use_extra_terms=use_extra_terms)
+            # Copy the intercept, slope, and cosmic-ray amplitudes and their
+            # variances to the arrays to be returned, for just the pixels
+            # in the current batch.
+            intercept_sect[pix] = result[:, 0]
+            int_var_sect[pix] = variances[:, 0]
+            slope_sect[pix] = result[:, 1]
+            slope_var_sect[pix] = variances[:, 1]
+            # cr_sect is populated for number of cosmic rays = 1 to num_cr,
+            # inclusive.
+            cr_sect[pix[0], pix[1], :num_cr] = result[:, 2:]
+            cr_var_sect[pix[0], pix[1], :num_cr] = variances[:, 2:]
 
     return (intercept_sect, int_var_sect, slope_sect, slope_var_sect,
             cr_sect, cr_var_sect)
 
+def gls_batch_size(ngroups, num_cr, max_batch_bytes):
+    """Compute the number of pixels to pass to gls_fit in one call.
+
+    Parameters
+    ----------
+    ngroups: int
+        The number of groups in each ramp.
+
+    num_cr: int
+        The number of cosmic rays in each ramp.
+
+    max_batch_bytes: int
+        The approximate maximum amount of memory (bytes) to use for the
+        arrays in one call to gls_fit.
+
+    Returns
+    -------
+    int
+        The number of pixels (at least one) that can be fit in one call to
+        gls_fit without using much more than max_batch_bytes.
+    """
+
+    nparams = 2 + num_cr
+    # Bytes per pixel for the float64 arrays in gls_fit:  the covariance
+    # matrix, its inverse and temporary copies (ngroups x ngroups), x and
+    # xT @ weight (ngroups x nparams), and the smaller arrays of fitted
+    # parameters.
+    bytes_per_pixel = 8 * (NUM_GROUP_MATRICES * ngroups**2 +
+                           3 * ngroups * nparams +
+                           3 * nparams**2 + 2 * ngroups)
+
+    return max(1, int(max_batch_bytes // bytes_per_pixel))
+
 def gls_fit(ramp_data, input_var_data,
              prev_fit_data, prev_slope_data,
              readnoise, gain,
@@ -649,16 +708,13 @@ def gls_fit(ramp_data, input_var_data,
                  frame_time * (M + 1.) / 2.
 
     if num_cr > 0:
-        sum_crs = cr_flagged_2d.cumsum(axis=0)
-        for k in range(ngroups):
-            s = slice(k, ngroups)
-            for n in range(1, num_cr + 1):
-                temp = np.where(np.logical_and(cr_flagged_2d[k] == 1,
-                                               sum_crs[k] == n))
-                if len(temp[0]) > 0:
-                    index = (temp[0], s, n + 1)
-                    x[index] = 1
-        del temp, index
+        # The column for the n-th cosmic ray is 1 for every group at which
+        # at least n cosmic rays have been flagged (counting from the start
+        # of the ramp), i.e. the cumulative sum of cr_flagged_2d is >= n.
+        sum_crs = cr_flagged_2d.cumsum(axis=0).transpose()
+        n_cr = np.arange(1, num_cr + 1).reshape((1, 1, num_cr))
+        x[:, :, 2:] = (sum_crs[:, :, np.newaxis] >= n_cr)
+        del sum_crs
 
     y = np.transpose(ramp_data, (1, 0)).reshape((nz, ngroups, 1))
 
@@ -669,50 +725,45 @@ def gls_fit(ramp_data, input_var_data,
     # smaller matrix (see near the end of this function) that contains
     # the variances and covariances of the fitted parameters.
 
-    cov = np.ones((nz, ngroups, ngroups), dtype=np.float64)
-
     # Use the previous fit to the data to populate the covariance matrix,
-    # for each of the nz pixels.  prev_fit_data has shape (ngroups, nz),
-    # similar to the ramp data, but we want the nz axis to be the first
-    # (we're constructing an array of nz matrix equations), so transpose
+    # for each of the nz pixels:  element [j, k] is the previous fit at
+    # group min(j, k).  prev_fit_data has shape (ngroups, nz), similar to
+    # the ramp data, but we want the nz axis to be the first (we're
+    # constructing an array of nz matrix equations), so transpose
     # prev_fit_data.
     prev_fit_T = np.transpose(prev_fit_data, (1, 0))
-    for k in range(ngroups):
-        # Populate the upper right, row by row.
-        cov[:, k, k:ngroups] = prev_fit_T[:, k:k+1]
-        # Populate the lower left, column by column.
-        cov[:, k:ngroups, k] = prev_fit_T[:, k:k+1]
-        # Propagate errors from input.
-        cov[:, k, k] += input_var_data[k, :]
-        # Give saturated pixels very low weight (i.e. high variance).
-        cov[:, k, k] += saturated_data[k, :]
-    del prev_fit_T
-
-    # I is 2-D, but it can broadcast to 4-D.  This is used to add terms to
-    # the diagonal of the covariance matrix.
-    I = np.identity(ngroups)
+    k_min = np.minimum.outer(np.arange(ngroups), np.arange(ngroups))
+    cov = np.empty((nz, ngroups, ngroups), dtype=np.float64)
+    cov[:] = prev_fit_T[:, k_min]
+    del prev_fit_T, k_min
+
+    # diag is used to index the main diagonal of each of the nz matrices
+    # in cov; cov[:, diag, diag] has shape (nz, ngroups).
+    diag = np.arange(ngroups)
+    # Propagate errors from input.
+    cov[:, diag, diag] += input_var_data.transpose()
+    # Give saturated pixels very low weight (i.e. high variance).
+    cov[:, diag, diag] += saturated_data.transpose()
 
     # Divide by sqrt(2) to convert the readnoise from CDS to single readout.
-    rn3d = readnoise.reshape((nz, 1, 1)) * SINGLE_READOUT_RN_FACTOR
-    cov += (I * (rn3d**2 / M))
+    rn2d = readnoise.reshape((nz, 1)) * SINGLE_READOUT_RN_FACTOR
+    cov[:, diag, diag] += (rn2d**2 / M)
 
     # prev_slope_data must be non-negative.
     flags = prev_slope_data < 0.
     prev_slope_data[flags] = 1.
 
     if use_extra_terms:
-        # Include two dummy axes to allow broadcasting with cov.
-        slope3d = prev_slope_data.reshape((nz, 1, 1))
+        # Include a dummy axis to allow broadcasting with the diagonal.
+        slope2d = prev_slope_data.reshape((nz, 1))
         # diagonal:
         if gain is not None:
-            g3d = gain.reshape((nz, 1, 1))
+            g2d = gain.reshape((nz, 1))
         else:
-            g3d = 1.
-        delta_diag = I * (slope3d * frame_time *
-                          (M - 1.) * (M - 2.) / (3. * M) +
-                          (g3d * M)**2 / 12.)
-        cov += delta_diag
-        del delta_diag
+            g2d = 1.
+        cov[:, diag, diag] += (slope2d * frame_time *
+                               (M - 1.) * (M - 2.) / (3. * M) +
+                               (g2d * M)**2 / 12.)
 
     # This is the solution:  (xT @ weight @ x)^-1 @ [xT @ weight @ y]
     # where @ means matrix multiplication.
@@ -721,7 +772,7 @@ def gls_fit(ramp_data, input_var_data,
     xT = np.transpose(x, (0, 2, 1))
 
     # shape of `weight` is (nz, ngroups, ngroups)
-    I = I.reshape((1, ngroups, ngroups))
+    I = np.identity(ngroups).reshape((1, ngroups, ngroups))
     weight = la.solve(cov, I)                   # inverse of cov
     del I
 
@@ -14,8 +14,10 @@
 
 from __future__ import division
 import time
+import multiprocessing
 import numpy as np
 import logging
+from astropy.io import fits
 from jwst import datamodels
 from jwst.datamodels import dqflags
 
@@ -34,7 +36,8 @@ LARGE_VARIANCE = 1.e8
 
 
 def ramp_fit( model, buffsize, save_opt, readnoise_model, gain_model,
-              algorithm, weighting ):
+              algorithm, weighting, max_cores='none', ols_engine='iterative',
+              stream_file=None ):
     """
     Extended Summary
     ----------------
@@ -70,6 +73,21 @@ def ramp_fit( model, buffsize, save_opt, readnoise_model, gain_model,
         'unwtd' specifies that no weighting should be used (default)
         'optim' specifies that optimal weighting should be used
 
+    max_cores: string
+        number of cores to use for OLS fitting: 'none' (fit serially),
+        'quarter', 'half' or 'all' of the available cores
+
+    ols_engine: string
+        'iterative' fits one segment of every pixel at a time (default);
+        'batched' finds all segments up front and fits them all at once
+
+    stream_file: string or None
+        name of the FITS file that model was read from; if given, OLS
+        fitting reads the data one section at a time from the memory-mapped
+        file (see ols_ramp_fit_stream) instead of using the arrays of model,
+        serially whatever the value of max_cores. This is ignored for GLS,
+        and if save_opt is True.
+
     Returns
     -------
     new_model: Data Model object
@@ -93,10 +111,23 @@ def ramp_fit( model, buffsize, save_opt, readnoise_model, gain_model,
                                 buffsize, save_opt,
                                 readnoise_model, gain_model)
         opt_model = None
+    elif stream_file is not None and not save_opt:
+        if max_cores is not None and max_cores != 'none':
+            log.warning('Streamed data sections are fit serially, so'
+                        ' max_cores is ignored')
+        new_model, int_model = ols_ramp_fit_stream(model, stream_file,
+                                buffsize, readnoise_model, gain_model,
+                                weighting, ols_engine)
+        opt_model = None
+        gls_opt_model = None
     else:
+        if stream_file is not None:
+            log.warning('Optional results require the full data cubes, so'
+                        ' the input will not be streamed')
         new_model, int_model, opt_model = ols_ramp_fit(model,
                                 buffsize, save_opt,
-                                readnoise_model, gain_model, weighting)
+                                readnoise_model, gain_model, weighting,
+                                max_cores, ols_engine)
         gls_opt_model = None
 
 
@@ -104,7 +135,7 @@ def ramp_fit( model, buffsize, save_opt, readnoise_model, gain_model,
 
 
 def ols_ramp_fit( model, buffsize, save_opt, readnoise_model, gain_model,
-                  weighting): 
+                  weighting, max_cores='none', ols_engine='iterative' ):
     """ 
     Extended Summary
     ----------------
@@ -134,6 +165,18 @@ def ols_ramp_fit( model, buffsize, save_opt, readnoise_model, gain_model,
         'unwtd' specifies that no weighting should be used (default)
         'optim' specifies that optimal weighting should be used
 
+    max_cores: string
+        number of cores to use: 'none' (fit serially), 'quarter', 'half' or
+        'all' of the available cores. The data sections are then fit in a
+        pool of worker processes, which read the data and GROUPDQ cubes
+        from shared memory.
+
+    ols_engine: string
+        'iterative' uses calc_slope, which fits one segment of every pixel
+        at a time (default); 'batched' uses calc_slope_batched, which finds
+        all segments up front and fits them all at once. Both give the
+        same results.
+
     Returns
     -------
     new_model: Data Model object
@@ -186,6 +229,12 @@ def ols_ramp_fit( model, buffsize, save_opt, readnoise_model, gain_model,
     # calculate number of (contiguous) rows per data section
     nrows = calc_nrows( model, buffsize, cubeshape, nreads )
 
+    # When fitting in parallel, make sure there are at least as many data
+    #   sections per integration as there are processes
+    nproc = get_num_processes( max_cores )
+    if nproc > 1:
+        nrows = min( nrows, -(-cubeshape[1] // nproc) )
+
     # get numbers of frames to skip
     skip_i, skip_f =utils.get_skip_frames( instrume )
 
@@ -213,73 +262,110 @@ def ols_ramp_fit( model, buffsize, save_opt, readnoise_model, gain_model,
         max_seg = 1 # needed for calc_slope()
         opt_res = None
 
-    # loop over data integrations
-    for num_int in range( 0, n_int ):
-
-        # loop over data sections
-        for rlo in range ( 0, cubeshape[1], nrows):
-            rhi = rlo + nrows
-
-            if rhi > cubeshape[1]:
-                rhi = cubeshape[1]
-
-            data_sect = model.get_section('data')[num_int, :, rlo:rhi, :]
-
-            # first frame section for 1st read of current integration
-            ff_sect = model.get_section('data')[num_int,
-                                                0, rlo:rhi, :].astype(np.float32)
-            # get appropriate sections
-            gdq_sect = gdq_cube[num_int, :, rlo:rhi, :]
-            rn_sect = readnoise_2d[rlo:rhi, :]
-            gain_sect = gain_2d[rlo:rhi, :]
-
-            t_err_cube, t_dq_cube, m_by_var, inv_var, opt_res = \
-                 calc_slope( data_sect, gdq_sect, frame_time, opt_res, \
-                             rn_sect, gain_sect, max_seg, ngroups, weighting )
-            
-            err_cube[num_int, :, rlo:rhi, :] += t_err_cube
-            gdq_cube[num_int, :, rlo:rhi, :] = t_dq_cube
-
-            # The current data section has been fit, so if any initial/final
-            #   frames were skipped, revert the corresponding GROUPDQ values
-            #   back to their original values.
-            if (skip_i + skip_f > 0):
-                gdq_cube = revert_dq( gdq_cube, gdq_cube_orig, num_int,
-                                      skip_i, skip_f, rlo, rhi )
-
-            # Compress 4D->2D dq arrays for saturated and jump-detected pixels
-            pixeldq_sect = pixeldq[rlo:rhi, :].copy()
-            dq_int[ num_int, rlo:rhi, : ] = \
-                  dq_compress_sect( t_dq_cube, pixeldq_sect ).copy()
-
-            sect_shape = data_sect.shape[-2:]
-            m_sum_2d[ rlo:rhi, : ] += m_by_var.reshape( sect_shape )
-            var_sum_2d[ rlo:rhi, : ] += inv_var.reshape( sect_shape )
-
-            if save_opt: # collect optional results for output
-                opt_res.reshape_res( num_int, rlo, rhi, sect_shape, ff_sect )
+    # If fitting in parallel, start a pool of worker processes sharing the
+    #   data and GROUPDQ cubes, and hand them all of the data sections. The
+    #   results are returned in the same order as the sections are processed
+    #   in the loop below.
+    pool = None
+    sect_results = None
+    if nproc > 1:
+        log.info('Fitting data sections with %d processes' % nproc)
+        pool = multiprocessing.Pool( nproc, _init_section_worker,
+                      ( _share_array( model.data ), _share_array( gdq_cube ),
+                        readnoise_2d, gain_2d, frame_time, max_seg, ngroups,
+                        weighting, save_opt, ols_engine ))
+        sections = [ (num_int, rlo, min(rlo + nrows, cubeshape[1]))
+                     for num_int in range( 0, n_int )
+                     for rlo in range( 0, cubeshape[1], nrows ) ]
+        sect_results = pool.imap( _fit_section, sections )
 
-            # Calculate difference between each slice and the previous slice
-            #   as approximation to cosmic ray amplitude for those pixels
-            #   having their DQ set for cosmic rays
-                data_diff = data_sect - utils.shift_z( data_sect, -1)
-                dq_cr = np.bitwise_and( dqflags.group['JUMP_DET'], gdq_sect )
-
-                opt_res.cr_mag_seg[num_int,:,rlo:rhi,:] = data_diff*(dq_cr != 0)
-
-            m_by_var_int[num_int,rlo:rhi,:] = m_by_var.reshape(sect_shape)
-            inv_var_int[num_int,rlo:rhi,:] = inv_var.reshape(sect_shape)
-
-        slope_int[ num_int, :, : ] = \
-                 utils.calc_slope_int( slope_int, m_by_var_int, inv_var_int,
-                                       num_int )
-
-        err_int[ num_int, :, : ] = err_cube[ 0, 0, :, : ] # change eventually
-
-        if save_opt: # collect optional pedestal results for output
-            opt_res.ped_int[num_int,:,:] = \
-                   utils.calc_pedestal(num_int, slope_int, opt_res.firstf_int,
-                                       gdq_cube)
+    try:
+        if ols_engine == 'batched':
+            slope_func = calc_slope_batched
+        else:
+            slope_func = calc_slope
+
+        # loop over data integrations
+        for num_int in range( 0, n_int ):
+
+            # loop over data sections
+            for rlo in range ( 0, cubeshape[1], nrows):
+                rhi = rlo + nrows
+
+                if rhi > cubeshape[1]:
+                    rhi = cubeshape[1]
+
+                data_sect = model.get_section('data')[num_int, :, rlo:rhi, :]
+
+                # first frame section for 1st read of current integration
+                ff_sect = model.get_section('data')[num_int,
+                                                    0, rlo:rhi, :].astype(np.float32)
+                # get appropriate sections
+                gdq_sect = gdq_cube[num_int, :, rlo:rhi, :]
+                rn_sect = readnoise_2d[rlo:rhi, :]
+                gain_sect = gain_2d[rlo:rhi, :]
+
+                if sect_results is None:
+                    t_err_cube, t_dq_cube, m_by_var, inv_var, opt_res = \
+                         slope_func( data_sect, gdq_sect, frame_time, opt_res, \
+                                     rn_sect, gain_sect, max_seg, ngroups,
+                                     weighting )
+                else:
+                    err_2d, m_by_var, inv_var, opt_2d = next( sect_results )
+                    t_err_cube = err_2d[np.newaxis, :, :]
+                    t_dq_cube = gdq_sect
+                    if save_opt:
+                        ( opt_res.interc_2d, opt_res.slope_2d,
+                          opt_res.siginterc_2d, opt_res.sigslope_2d,
+                          opt_res.inv_var_2d ) = opt_2d
+
+                err_cube[num_int, :, rlo:rhi, :] += t_err_cube
+                gdq_cube[num_int, :, rlo:rhi, :] = t_dq_cube
+
+                # The current data section has been fit, so if any initial/final
+                #   frames were skipped, revert the corresponding GROUPDQ values
+                #   back to their original values.
+                if (skip_i + skip_f > 0):
+                    gdq_cube = revert_dq( gdq_cube, gdq_cube_orig, num_int,
+                                          skip_i, skip_f, rlo, rhi )
+
+                # Compress 4D->2D dq arrays for saturated and jump-detected pixels
+                pixeldq_sect = pixeldq[rlo:rhi, :].copy()
+                dq_int[ num_int, rlo:rhi, : ] = \
+                      dq_compress_sect( t_dq_cube, pixeldq_sect ).copy()
+
+                sect_shape = data_sect.shape[-2:]
+                m_sum_2d[ rlo:rhi, : ] += m_by_var.reshape( sect_shape )
+                var_sum_2d[ rlo:rhi, : ] += inv_var.reshape( sect_shape )
+
+                if save_opt: # collect optional results for output
+                    opt_res.reshape_res( num_int, rlo, rhi, sect_shape, ff_sect )
+
+                # Calculate difference between each slice and the previous slice
+                #   as approximation to cosmic ray amplitude for those pixels
+                #   having their DQ set for cosmic rays
+                    data_diff = data_sect - utils.shift_z( data_sect, -1)
+                    dq_cr = np.bitwise_and( dqflags.group['JUMP_DET'], gdq_sect )
+
+                    opt_res.cr_mag_seg[num_int,:,rlo:rhi,:] = data_diff*(dq_cr != 0)
+
+                m_by_var_int[num_int,rlo:rhi,:] = m_by_var.reshape(sect_shape)
+                inv_var_int[num_int,rlo:rhi,:] = inv_var.reshape(sect_shape)
+
+            slope_int[ num_int, :, : ] = \
+                     utils.calc_slope_int( slope_int, m_by_var_int, inv_var_int,
+                                           num_int )
+
+            err_int[ num_int, :, : ] = err_cube[ 0, 0, :, : ] # change eventually
+
+            if save_opt: # collect optional pedestal results for output
+                opt_res.ped_int[num_int,:,:] = \
+                       utils.calc_pedestal(num_int, slope_int, opt_res.firstf_int,
+                                           gdq_cube)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
 
     wh_non_zero = (var_sum_2d != 0.0)
 
@@ -347,15 +433,276 @@ def ols_ramp_fit( model, buffsize, save_opt, readnoise_model, gain_model,
     log.debug('The execution time in seconds: %f' %(tstop - tstart))
 
     # Create new model...
-    new_model = models.ImageModel( data=c_rates.astype(np.float32),
-                                   dq=final_pixeldq.astype(np.int32),
-                                   err=err_cube[0,0].copy())
+    new_model = datamodels.ImageModel( data=c_rates.astype(np.float32),
+                                       dq=final_pixeldq.astype(np.int32),
+                                       err=err_cube[0,0].copy())
 
     new_model.update( model )  # ... and add all keys from input
 
     return new_model, int_model, opt_model
 
 
+def ols_ramp_fit_stream( model, filename, buffsize, readnoise_model,
+                         gain_model, weighting, ols_engine='iterative' ):
+    """
+    Extended Summary
+    ----------------
+    Fit a ramp using ordinary least squares, as in ols_ramp_fit, but read
+    the input one data section at a time. The SCI, GROUPDQ and ERR arrays are
+    read from the memory-mapped FITS file, one integration and one block of
+    rows at a time, so the memory used is set by buffsize (and by the 2D and
+    integration-specific results) rather than by the size of the 4D cubes.
+    The arrays of model are not used, nor modified. The data sections are
+    fit serially, and optional results are not calculated.
+
+    Parameters
+    ----------
+    model: data model
+        input data model, assumed to be of type RampModel, which may be lazily
+        loaded; only its metadata and PIXELDQ array are used
+
+    filename: string
+        name of the FITS file containing the input data
+
+    buffsize: int
+        size of data section (buffer) in bytes
+
+    readnoise_model: instance of data Model
+        readnoise for all pixels
+
+    gain_model: instance of gain model
+        gain for all pixels
+
+    weighting: string
+        'unwtd' specifies that no weighting should be used (default)
+        'optim' specifies that optimal weighting should be used
+
+    ols_engine: string
+        'iterative' (default) or 'batched'; see ols_ramp_fit
+
+    Returns
+    -------
+    new_model: Data Model object
+        DM object containing a rate image averaged over all integrations in
+        the exposure
+
+    int_model: Data Model object or None
+        DM object containing rate images for each integration in the exposure,
+        or None if there is only one integration in the exposure
+    """
+
+    tstart = time.time()
+
+    # get needed sizes and shapes from the header of the SCI extension, so
+    #   that the arrays of a lazily loaded model are not read
+    sci_header = fits.getheader( filename, 'SCI' )
+    sci_shape = tuple( sci_header['NAXIS%d' % axis]
+                       for axis in range( sci_header['NAXIS'], 0, -1 ) )
+    nreads, npix, imshape, cubeshape, n_int, instrume, frame_time, ngroups = \
+        utils.get_dataset_info( model, sci_shape )
+
+    if (ngroups == 1):
+        log.warn('Dataset has NGROUPS=1, so count rates for each integration')
+        log.warn('will be calculated as the value of that 1 group divided by')
+        log.warn('the group exposure time.')
+
+    m_sum_2d = np.zeros( imshape, dtype = np.float64 )
+    var_sum_2d = np.zeros( imshape, dtype = np.float64 )
+
+    # Integration-specific results; the slopes/variance and inverse variances
+    #   are only needed for the current integration
+    slope_int = np.zeros( (n_int,) + imshape, dtype = np.float64 )
+    err_int = np.zeros( (n_int,) + imshape, dtype = np.float64 )
+    dq_int = np.zeros( (n_int,) + imshape, dtype = np.uint32 )
+
+    # Error array of the primary output, which as in ols_ramp_fit is the
+    #   input ERR of the first read of the first integration plus 1/variance
+    #   of the first integration
+    err_2d = np.zeros( imshape, dtype = np.float32 )
+
+    pixeldq = model.pixeldq
+
+    # calculate number of (contiguous) rows per data section
+    nrows = calc_nrows( model, buffsize, cubeshape, nreads,
+                        abs( sci_header['BITPIX'] ) // 8 )
+
+    # get numbers of frames to skip
+    skip_i, skip_f =utils.get_skip_frames( instrume )
+
+    # Get readnoise array for calculation of variance of noiseless ramps, and
+    #   gain array in case optimal weighting is to be done
+    readnoise_2d, gain_2d = utils.get_ref_subs( model, readnoise_model, gain_model )
+
+    if ols_engine == 'batched':
+        slope_func = calc_slope_batched
+    else:
+        slope_func = calc_slope
+
+    log.info('Streaming data sections of %d rows from %s' % (nrows, filename))
+    with fits.open( filename, memmap=True ) as hdulist:
+
+        # loop over data integrations
+        for num_int in range( 0, n_int ):
+            m_by_var_2d = np.zeros( imshape, dtype = np.float64 )
+            inv_var_2d = np.zeros( imshape, dtype = np.float64 )
+
+            # loop over data sections
+            for rlo in range ( 0, cubeshape[1], nrows):
+                rhi = min( rlo + nrows, cubeshape[1] )
+
+                # read the sections; these are copies, so the file is not
+                #   modified
+                data_sect = read_stream_section( hdulist, 'SCI',
+                                (num_int, slice(None), slice(rlo, rhi)),
+                                (nreads, rhi - rlo, cubeshape[2]), np.float32 )
+                gdq_sect = read_stream_section( hdulist, 'GROUPDQ',
+                                (num_int, slice(None), slice(rlo, rhi)),
+                                (nreads, rhi - rlo, cubeshape[2]), np.uint8 )
+                rn_sect = readnoise_2d[rlo:rhi, :]
+                gain_sect = gain_2d[rlo:rhi, :]
+
+                # Flag the initial and final frames to be skipped in the
+                #   section, keeping the original GROUPDQ values to revert to
+                #   after the fitting
+                if ( skip_i + skip_f > 0 ):
+                    gdq_sect_orig = gdq_sect.copy()
+                    groupdq_skip( gdq_sect[np.newaxis, :, :, :], skip_i, skip_f )
+
+                t_err_cube, t_dq_cube, m_by_var, inv_var, opt_res = \
+                     slope_func( data_sect, gdq_sect, frame_time, None, \
+                                 rn_sect, gain_sect, 1, ngroups, weighting )
+
+                if ( skip_i + skip_f > 0 ):
+                    revert_dq( t_dq_cube[np.newaxis, :, :, :],
+                               gdq_sect_orig[np.newaxis, :, :, :],
+                               0, skip_i, skip_f, 0, rhi - rlo )
+
+                if num_int == 0:
+                    err_2d[ rlo:rhi, : ] = read_stream_section( hdulist, 'ERR',
+                                (0, 0, slice(rlo, rhi)),
+                                (rhi - rlo, cubeshape[2]), np.float32 )
+                    err_2d[ rlo:rhi, : ] += t_err_cube[0]
+
+                # Compress 3D->2D dq arrays for saturated and jump-detected
+                #   pixels
+                pixeldq_sect = pixeldq[rlo:rhi, :].copy()
+                dq_int[ num_int, rlo:rhi, : ] = \
+                      dq_compress_sect( t_dq_cube, pixeldq_sect )
+
+                sect_shape = data_sect.shape[-2:]
+                m_sum_2d[ rlo:rhi, : ] += m_by_var.reshape( sect_shape )
+                var_sum_2d[ rlo:rhi, : ] += inv_var.reshape( sect_shape )
+                m_by_var_2d[ rlo:rhi, : ] = m_by_var.reshape( sect_shape )
+                inv_var_2d[ rlo:rhi, : ] = inv_var.reshape( sect_shape )
+
+            wh_v = ( inv_var_2d != 0.0 )
+            slope_int[ num_int ][ wh_v ] = m_by_var_2d[ wh_v ]/inv_var_2d[ wh_v ]
+
+            err_int[ num_int, :, : ] = err_2d # change eventually
+
+    slope_wtd = np.zeros( imshape, dtype = np.float64 )
+    wh_non_zero = (var_sum_2d != 0.0)
+    slope_wtd[ wh_non_zero ] = (m_sum_2d[ wh_non_zero ]/
+                                var_sum_2d[ wh_non_zero ])
+
+    # Calculate effective integration time (once EFFINTIM has been populated
+    #   and accessible, will use that instead)
+    effintim = utils.get_effintim( model )
+
+    # Divide slopes by total (summed over all integrations) effective
+    #   integration time to give count rates.
+    c_rates = slope_wtd/effintim
+
+    # Values in err_2d have been 1./variance, so take reciprocal
+    #    of non-zero values to write
+    err_2d [ err_2d <= 0. ] = MIN_ERR  # for pixels having no signal
+    err_2d = 1./err_2d # has no zero values
+
+    # Compress all integration's dq arrays to create 2D PIXELDDQ array for
+    #   primary output
+    final_pixeldq = dq_compress_final( dq_int, n_int )
+
+    # If either skip_i or skip_f are > 0, include the FRAMES_SKIPPED flag
+    #   within the output 2D PIXELDQ and, if there is more than one
+    #   integration, also include this flag within the integration-specific dq
+    #   output cube
+    if ( skip_i + skip_f > 0 ):
+        final_pixeldq = np.bitwise_or( dqflags.pixel['FRAMES_SKIPPED'],
+                                       final_pixeldq )
+        if n_int > 1:
+            dq_int = np.bitwise_or( dqflags.pixel['FRAMES_SKIPPED'], dq_int )
+
+    if n_int > 1:
+        int_model = utils.output_integ( model, slope_int, err_int, dq_int,
+                                        effintim )
+    else:
+        int_model = None
+
+    tstop = time.time()
+
+    log_stats( c_rates )
+
+    log.debug('Instrument: %s' %(instrume))
+    log.debug('Number of pixels in 2D array: %d' %(npix))
+    log.debug('Shape of 2D image: (%d, %d)' %(imshape))
+    log.debug('Shape of data cube: (%d, %d, %d)' %(cubeshape))
+    log.debug('Buffer size (bytes): %d' %(buffsize))
+    log.debug('Number of rows per buffer: %d' %(nrows))
+    log.info('Number of groups per integration: %d' %(nreads))
+    log.info('Number of integrations: %d' %(n_int))
+    log.info('Number of initial groups skipped: %d' %(skip_i))
+    log.info('Number of final groups skipped: %d' %(skip_f))
+    log.debug('The execution time in seconds: %f' %(tstop - tstart))
+
+    # Create new model...
+    new_model = datamodels.ImageModel( data=c_rates.astype(np.float32),
+                                       dq=final_pixeldq.astype(np.int32),
+                                       err=err_2d.copy())
+
+    new_model.update( model )  # ... and add all keys from input
+
+    return new_model, int_model
+
+
+def read_stream_section( hdulist, extname, index, shape, dtype ):
+    """
+    Short Summary
+    -------------
+    Read a section of an array from an open (memory-mapped) FITS file,
+    returning a copy of the section, converted to the given data type. If the
+    file has no such extension, an array of zeros is returned, as that is the
+    default value for the arrays of a RampModel.
+
+    Parameters
+    ----------
+    hdulist: HDUList
+        the open FITS file
+
+    extname: string
+        name of the extension, e.g. 'SCI'
+
+    index: tuple
+        index of the section in the array of the extension
+
+    shape: tuple
+        shape of the section
+
+    dtype: numpy data type
+        data type of the returned section
+
+    Returns
+    -------
+    sect: ndarray
+        copy of the section
+    """
+    try:
+        hdu = hdulist[extname]
+    except KeyError:
+        return np.zeros( shape, dtype=dtype )
+
+    return np.array( hdu.data[index], dtype=dtype )
+
+
 def gls_ramp_fit(model,
                  buffsize, save_opt,
                  readnoise_model, gain_model):
@@ -781,10 +1128,7 @@ def dq_compress_final( dq_int, n_int ):
         combination of all integration's pixeldq arrays
 
     """
-    f_dq = dq_int[ 0,:,: ]
-
-    for jj in range( 1, n_int ):
-        f_dq = np.bitwise_or( f_dq, dq_int[ jj,:,: ])
+    f_dq = np.bitwise_or.reduce( dq_int[ :n_int,:,: ], axis=0 )
 
     return f_dq
 
@@ -867,7 +1211,7 @@ def groupdq_skip( gdq_cube, skip_i, skip_f ):
     return gdq_cube
 
 
-def calc_nrows( model, buffsize, cubeshape, nreads ):
+def calc_nrows( model, buffsize, cubeshape, nreads, itemsize=None ):
     """
     Short Summary
     -------------
@@ -887,6 +1231,10 @@ def calc_nrows( model, buffsize, cubeshape, nreads ):
     nreads: int
        number of reads in input dataset
 
+    itemsize: int
+       size in bytes of an element of the SCI array; if None (default), the
+       item size of model.data is used
+
     Returns
     -------
     nrows: int
@@ -894,7 +1242,9 @@ def calc_nrows( model, buffsize, cubeshape, nreads ):
 
     """
 
-    bitpix = model.data.dtype.itemsize
+    if itemsize is None:
+        itemsize = model.data.dtype.itemsize
+    bitpix = itemsize
     bytepix = int( abs(bitpix)/8 )
     if bytepix < 1:
         bytepix = 1
@@ -908,6 +1258,143 @@ def calc_nrows( model, buffsize, cubeshape, nreads ):
     return nrows
 
 
+def get_num_processes( max_cores ):
+    """
+    Short Summary
+    -------------
+    Get the number of processes to use for fitting the data sections.
+
+    Parameters
+    ----------
+    max_cores: string
+        'none', 'quarter', 'half' or 'all' of the available cores
+
+    Returns
+    -------
+    nproc: int
+        number of processes; 1 means the sections will be fit serially
+    """
+    if max_cores is None or max_cores == 'none':
+        return 1
+
+    ncpus = multiprocessing.cpu_count()
+    if max_cores == 'quarter':
+        nproc = ncpus // 4
+    elif max_cores == 'half':
+        nproc = ncpus // 2
+    elif max_cores == 'all':
+        nproc = ncpus
+    else:
+        log.warning('Unknown value for max_cores: %s; fitting serially'
+                    % max_cores)
+        nproc = 1
+
+    return max( nproc, 1 )
+
+
+def _share_array( arr ):
+    """
+    Short Summary
+    -------------
+    Copy an array into a block of shared memory, for use by the worker
+    processes fitting the data sections.
+
+    Parameters
+    ----------
+    arr: ndarray
+        array to copy
+
+    Returns
+    -------
+    shared: (RawArray, string, tuple) tuple
+        shared memory block, dtype and shape of the array
+    """
+    raw = multiprocessing.RawArray( 'b', max( arr.nbytes, 1 ) )
+    shared = np.frombuffer( raw, dtype=arr.dtype, count=arr.size )
+    shared[:] = arr.ravel()
+
+    return raw, arr.dtype.str, arr.shape
+
+
+# Values shared by all data sections fit by a worker process
+_worker_args = {}
+
+def _init_section_worker( data, gdq, readnoise_2d, gain_2d, frame_time,
+                          max_seg, ngroups, weighting, save_opt, ols_engine ):
+    """
+    Short Summary
+    -------------
+    Initialize a worker process, making array views of the shared data and
+    GROUPDQ cubes and saving the values used by all data sections.
+    """
+    for name, (raw, dtype, shape) in ( ('data', data), ('gdq', gdq) ):
+        count = int( np.prod( shape ) )
+        _worker_args[name] = np.frombuffer( raw, dtype=dtype,
+                                            count=count ).reshape( shape )
+
+    _worker_args.update( readnoise_2d=readnoise_2d, gain_2d=gain_2d,
+                         frame_time=frame_time, max_seg=max_seg,
+                         ngroups=ngroups, weighting=weighting,
+                         save_opt=save_opt, ols_engine=ols_engine )
+
+
+def _fit_section( section ):
+    """
+    Short Summary
+    -------------
+    Fit a single data section in a worker process.
+
+    Parameters
+    ----------
+    section: (int, int, int) tuple
+        integration number, and first and last+1 rows of the data section
+
+    Returns
+    -------
+    err_2d: float, 2D array
+        fitting error estimate for pixels in section (the same for all reads)
+
+    m_by_var: float, 1D array
+        values of slope/variance for good pixels
+
+    inv_var: float, 1D array
+        values of 1/variance for good pixels
+
+    opt_2d: tuple of float 2D arrays, or None
+        segment-specific optional results for the section
+    """
+    num_int, rlo, rhi = section
+    args = _worker_args
+
+    data_sect = args['data'][num_int, :, rlo:rhi, :]
+    gdq_sect = args['gdq'][num_int, :, rlo:rhi, :]
+    nreads = data_sect.shape[0]
+
+    if args['save_opt']:
+        opt_res = utils.OptRes( 1, data_sect.shape[-2:], args['max_seg'],
+                                nreads )
+    else:
+        opt_res = None
+
+    if args['ols_engine'] == 'batched':
+        slope_func = calc_slope_batched
+    else:
+        slope_func = calc_slope
+
+    err_sect, gdq_sect, m_by_var, inv_var, opt_res = \
+        slope_func( data_sect, gdq_sect, args['frame_time'], opt_res,
+                    args['readnoise_2d'][rlo:rhi, :],
+                    args['gain_2d'][rlo:rhi, :], args['max_seg'],
+                    args['ngroups'], args['weighting'] )
+
+    opt_2d = None
+    if opt_res is not None:
+        opt_2d = ( opt_res.interc_2d, opt_res.slope_2d, opt_res.siginterc_2d,
+                   opt_res.sigslope_2d, opt_res.inv_var_2d )
+
+    return err_sect[0], m_by_var, inv_var, opt_2d
+
+
 def calc_slope( data_sect, gdq_sect, frame_time, opt_res, rn_sect, gain_sect,
                 max_seg, ngroups, weighting ): 
     """
@@ -1081,6 +1568,198 @@ def calc_slope( data_sect, gdq_sect, frame_time, opt_res, rn_sect, gain_sect,
     return err_sect, gdq_sect, m_by_var, inv_var, opt_res
 
 
+def calc_slope_batched( data_sect, gdq_sect, frame_time, opt_res, rn_sect,
+                        gain_sect, max_seg, ngroups, weighting ):
+    """
+    Short Summary
+    -------------
+    Calculate the count rate for each pixel in the data cube section
+    for the current integration, giving the same results as calc_slope.
+    Instead of fitting one segment per pixel at a time, all of the segments
+    of every pixel are found up front from the runs of good reads in the
+    GROUPDQ section, and all segments are fit at once.
+
+    For datasets with NGROUPS<3, which need special handling, this falls
+    back to calc_slope.
+
+    Parameters
+    ----------
+    data_sect: float
+        section of input data cube array
+
+    gdq_sect: float
+        section of GROUPDQ data quality array
+
+    frame_time: float
+        integration time
+
+    opt_res: OptRes object
+        contains quantities related to fitting for optional output
+
+    rn_sect: float, 2D array
+        read noise values for all pixels in data section
+
+    gain_sect: float, 2D array
+        gain values for all pixels in data section
+
+    max_seg: int
+        maximum number of segments that will be fit within an
+        integration, calculated over all pixels and all integrations
+
+    ngroups: int
+        number of groups per integration
+
+    weighting: string
+        'unwtd' specifies that no weighting should be used (default)
+        'optim' specifies that optimal weighting should be used
+
+    Returns
+    -------
+    err_sect: float, 3D array
+        fitting error estimate for pixels in section
+
+    gdq_sect: int, 3D array
+        data quality flags for pixels in section
+
+    m_by_var: float, 1D array
+        values of slope/variance for good pixels
+
+    inv_var: float, 1D array
+        values of 1/variance for good pixels
+
+    opt_res: OptRes object
+        contains quantities related to fitting for optional output
+
+    """
+    nreads, asize2, asize1 = data_sect.shape
+    if nreads < 3 or ngroups != nreads:
+        return calc_slope( data_sect, gdq_sect, frame_time, opt_res, rn_sect,
+                           gain_sect, max_seg, ngroups, weighting )
+
+    npix = asize2*asize1  # number of pixels in section of 2D array
+    imshape = data_sect.shape[-2:]
+    cubeshape = (nreads,)+imshape  # cube section shape
+
+    inv_var = np.zeros( npix, dtype = np.float64)
+    m_by_var = np.zeros( npix, dtype = np.float64)
+
+    # Create nominal 2D ERR array, which is 1st slice of
+    #    avged_data_cube * readtime
+    err_2d_array = data_sect[0, :, :] * frame_time
+    err_2d_array[ err_2d_array < 0 ] = 0
+
+    data_r = np.reshape( data_sect, (nreads, npix) )
+    good_r = ( np.reshape( gdq_sect, (nreads, npix) ) == 0 )
+    total_mask_sum = good_r.sum(axis=0) # number of good reads along ramp
+
+    # Segment endpoints for each pixel are the first read, every flagged
+    #   read in between, and the last read. A segment runs from one endpoint
+    #   to the next, and the segments are sorted by pixel and then by read.
+    bounds = np.zeros( (npix, nreads), dtype = bool )
+    bounds[ :, 1:-1 ] = ~good_r[ 1:-1, : ].T
+    bounds[ :, 0 ] = True
+    bounds[ :, -1 ] = True
+    b_pix, b_read = np.nonzero( bounds )
+    same = ( b_pix[:-1] == b_pix[1:] )
+    seg_pix = b_pix[:-1][ same ]
+    seg_start = b_read[:-1][ same ]
+    seg_end = b_read[1:][ same ]
+    bounds = 0
+
+    # Position of each segment within its pixel's ramp, and number of
+    #   endpoints still to be processed when the segment is fit
+    seg_order = np.arange( len(seg_pix) ) - np.searchsorted( seg_pix, seg_pix )
+    end_heads = np.bincount( seg_pix, minlength=npix )[ seg_pix ] - seg_order
+
+    l_interval = seg_end - seg_start # fitting interval length
+    at_end = ( seg_end == nreads-1 )
+
+    # Reads to fit for each segment; as in fit_lines, the read previous to
+    #   each good read is also included, so that the first read fit in a
+    #   segment is the one in which a cosmic ray has been flagged.
+    arange_nreads_col = np.arange( nreads )[:, np.newaxis ]
+    mask_2d = (( arange_nreads_col >= seg_start ) &
+               ( arange_nreads_col <= seg_end ) & good_r[ :, seg_pix ])
+    mask_2d[:-1, :] |= mask_2d[1:, :].copy()
+    mask_sum = mask_2d.sum(axis=0)
+
+    slope = np.zeros( len(seg_pix), dtype = np.float64 )
+    variance = np.zeros( len(seg_pix), dtype = np.float64 ) + MIN_ERR
+    intercept = np.zeros( len(seg_pix), dtype = np.float64 )
+    sig_intercept = np.zeros( len(seg_pix), dtype = np.float64 ) + MIN_ERR
+    sig_slope = np.zeros( len(seg_pix), dtype = np.float64 ) + MIN_ERR
+
+    # Full-length ramps in which only the 1st read has good data use that
+    #   data value as the slope
+    wh_sat1 = np.where( (mask_sum == 1) & mask_2d[0, :] &
+                        (end_heads == nreads-1) )
+    slope[ wh_sat1 ] = data_r[ 0, seg_pix[ wh_sat1 ] ]
+    intercept[ wh_sat1 ] = 0.
+    sig_intercept[ wh_sat1 ] = 0.
+
+    # Fit all segments having enough reads at once
+    good_seg = np.where( mask_sum > MIN_LEN )[0]
+    good_pix = seg_pix[ good_seg ]
+    mask_good = mask_2d[:, good_seg ]
+    data_masked = data_r[:, good_pix ] * mask_good
+    xvalues = arange_nreads_col * mask_good
+    nreads_1d = mask_sum[ good_seg ]
+
+    slope[ good_seg ], intercept[ good_seg ], variance[ good_seg ], \
+        sig_intercept[ good_seg ], sig_slope[ good_seg ] = \
+        calc_masked_fits( data_sect, data_masked, mask_good, xvalues,
+                          nreads_1d, good_pix, rn_sect, gain_sect, weighting )
+
+    data_masked = 0
+    xvalues = 0
+    mask_good = 0
+
+    # A ramp having a single good read, with an interval of length 1 that
+    #   is not at the end of the array, is finished after that interval (see
+    #   CASE 0 in fit_next_segment); later segments of the ramp are not used.
+    case_0 = ( (total_mask_sum[ seg_pix ] == 1) & (l_interval == 1) &
+               ~at_end & (mask_sum == 1) )
+    n_case_0 = np.cumsum( case_0 )
+    n_case_0_before = n_case_0 - case_0
+    n_case_0_before -= n_case_0_before[ seg_pix.searchsorted( seg_pix ) ]
+    used = ( n_case_0_before == 0 )
+
+    # Segments whose slopes and variances are added to the running sums:
+    #   CASE 0 segments, and segments long enough to fit (CASES 3 and 4)
+    #   that have positive variance.
+    wh_sum = np.where( used & ( case_0 |
+                       (( l_interval > MIN_LEN ) & ( variance > 0. )) ) )[0]
+    sum_pix = seg_pix[ wh_sum ]
+    sum_inv_var = 1.0/variance[ wh_sum ]
+
+    np.add.at( inv_var, sum_pix, sum_inv_var )
+    np.add.at( m_by_var, sum_pix, slope[ wh_sum ]/variance[ wh_sum ] )
+
+    if ( opt_res is not None ):
+        opt_res.init_2d( npix, max_seg )
+
+        # Number of each summed segment within its pixel's ramp
+        num_seg = np.arange( len(sum_pix) ) - np.searchsorted( sum_pix, sum_pix )
+
+        opt_res.interc_2d[ num_seg, sum_pix ] = intercept[ wh_sum ]
+        opt_res.slope_2d[ num_seg, sum_pix ] = slope[ wh_sum ]
+        opt_res.siginterc_2d[ num_seg, sum_pix ] = sig_intercept[ wh_sum ]
+        opt_res.sigslope_2d[ num_seg, sum_pix ] = sig_slope[ wh_sum ]
+
+        # The inverse variances saved are the running sums
+        run_inv_var = np.zeros( npix, dtype = np.float64)
+        for ii_seg in range( num_seg.max() + 1 if len(num_seg) else 0 ):
+            wh_seg = ( num_seg == ii_seg )
+            these_pix = sum_pix[ wh_seg ]
+            run_inv_var[ these_pix ] += sum_inv_var[ wh_seg ]
+            opt_res.inv_var_2d[ ii_seg, these_pix ] = run_inv_var[ these_pix ]
+
+    err_sect = np.zeros( cubeshape, dtype = np.float32)
+    err_sect[:, :, :] = err_2d_array
+
+    return err_sect, gdq_sect, m_by_var, inv_var, opt_res
+
+
 def fit_next_segment( start, end_st, end_heads, pixel_done, data_sect, mask_2d,
                       inv_var, m_by_var, num_seg, opt_res, rn_sect, gain_sect,
                       ngroups, weighting, total_mask_sum ):
@@ -1440,6 +2119,89 @@ def fit_lines( data, mask_2d, end_heads, end_st, start, rn_sect, gain_sect,
     mask_2d = mask_2d[:, good_pix ]
     nreads_1d = nreads_1d[ good_pix ]  
     
+    slope, intercept, variance, sig_intercept, sig_slope = \
+        calc_masked_fits( data, data_masked, mask_2d, xvalues, nreads_1d,
+                          good_pix, rn_sect, gain_sect, weighting )
+
+    full_slope[ good_pix ] = slope
+    full_variance[ good_pix ] = variance
+    full_intercept[ good_pix ] = intercept
+    full_sig_intercept[ good_pix ] = sig_intercept
+    full_sig_slope[ good_pix ] = sig_slope
+
+    # include pixels with >1 good reads
+    mask_2d = mask_2d.compress( mask_2d.sum(axis = 0) >1., axis = 1)
+
+    if (ngroups == 1): # process 1 group/integration dataset
+        full_slope, full_intercept, full_variance, full_sig_intercept, \
+        full_sig_slope = fit_1_group( full_slope, full_intercept, \
+        full_variance, full_sig_intercept, full_sig_slope, npix, data, mask_2d)
+
+    if (ngroups == 2): # process 2 group/integration dataset
+        full_slope, full_intercept, full_variance, full_sig_intercept, \
+        full_sig_slope = fit_2_group( full_slope, full_intercept, \
+        full_variance, full_sig_intercept, full_sig_slope, npix, data, mask_2d)
+
+    return full_slope, full_intercept, full_variance,  \
+           full_sig_intercept, full_sig_slope
+
+
+def calc_masked_fits( data, data_masked, mask_2d, xvalues, nreads_1d,
+                      good_pix, rn_sect, gain_sect, weighting ):
+    """
+    Extended Summary
+    ----------------
+    Do the linear least squares fits of the masked segment data, using
+    either unweighted or optimally weighted sums, and compute the variance
+    of each fit. Each column of the input arrays holds one segment to fit.
+
+    Parameters
+    ----------
+    data: float, 3D array
+        data cube section, used to correct noiseless segments
+
+    data_masked: float, 2D array
+        masked values for the segments to fit
+
+    mask_2d: boolean, 2D array
+        delineates which channels to fit for each segment
+
+    xvalues: int, 2D array
+        indices of valid pixel values for all reads of each segment
+
+    nreads_1d: int, 1D array
+        number of reads in each segment
+
+    good_pix: int, 1D array
+        index in the data section of the pixel of each segment
+
+    rn_sect: float, 2D array
+        read noise values for all pixels in data section
+
+    gain_sect: float, 2D array
+        gain values for all pixels in data section
+
+    weighting: string
+        'unwtd' specifies that no weighting should be used (default)
+        'optim' specifies that optimal weighting should be used
+
+    Returns
+    -------
+    slope: float, 1D array
+       slope of each segment
+
+    intercept: float, 1D array
+       y-intercept of each segment
+
+    variance: float, 1D array
+       variance of fit of each segment
+
+    sig_intercept: float, 1D array
+       sigma of y-intercept of each segment
+
+    sig_slope: float, 1D array
+       sigma of slope of each segment
+    """
     if weighting.lower() == 'optim': # do the fits using optimal weighting 
         # get sums from optimal weighting
         sumx, sumxx, sumxy, sumy, nreads_wtd, xvalues =\
@@ -1468,27 +2230,7 @@ def fit_lines( data, mask_2d, end_heads, end_st, start, rn_sect, gain_sect,
     # check to prevent NaN propagation
     variance = correct_noiseless( variance, nreads_1d, data, good_pix, rn_sect )  
 
-    full_slope[ good_pix ] = slope
-    full_variance[ good_pix ] = variance
-    full_intercept[ good_pix ] = intercept
-    full_sig_intercept[ good_pix ] = sig_intercept
-    full_sig_slope[ good_pix ] = sig_slope
-
-    # include pixels with >1 good reads
-    mask_2d = mask_2d.compress( mask_2d.sum(axis = 0) >1., axis = 1)
-
-    if (ngroups == 1): # process 1 group/integration dataset
-        full_slope, full_intercept, full_variance, full_sig_intercept, \
-        full_sig_slope = fit_1_group( full_slope, full_intercept, \
-        full_variance, full_sig_intercept, full_sig_slope, npix, data, mask_2d)
-
-    if (ngroups == 2): # process 2 group/integration dataset
-        full_slope, full_intercept, full_variance, full_sig_intercept, \
-        full_sig_slope = fit_2_group( full_slope, full_intercept, \
-        full_variance, full_sig_intercept, full_sig_slope, npix, data, mask_2d)
-
-    return full_slope, full_intercept, full_variance,  \
-           full_sig_intercept, full_sig_slope
+    return slope, intercept, variance, sig_intercept, sig_slope
 
 
 def calc_unwtd_fit( xvalues, nreads_1d, sumxx, sumx, sumxy, sumy ):
@@ -2,6 +2,8 @@
 
 from __future__ import division
 
+from astropy.extern import six
+
 from jwst.stpipe import Step, cmdline
 from jwst import datamodels
 from . import ramp_fit
@@ -23,6 +25,9 @@ class RampFitStep (Step):
         opt_name = string( default='' )
         algorithm = string( default='OLS')
         weighting = string( default='unwtd')
+        maximum_cores = option('none', 'quarter', 'half', 'all', default='none') # max number of processes to create
+        ols_engine = option('iterative', 'batched', default='iterative') # OLS segment fitting engine
+        streaming = boolean(default=False) # read OLS input one section at a time from the file
     """
 
     reference_file_types = ['readnoise', 'gain']
@@ -30,7 +35,19 @@ class RampFitStep (Step):
 
     def process(self, input):
 
-        with models.open(input) as input_model:
+        # Streaming reads the data sections directly from the input file,
+        #   so it requires the input to be given as a file name; the model is
+        #   then opened lazily, so that its 4D arrays are not read into memory
+        stream_file = None
+        if self.streaming:
+            if isinstance(input, six.string_types):
+                stream_file = input
+            else:
+                log.warning('Streaming requires an input file name;'
+                            ' the input model will be fit in memory')
+
+        with datamodels.open(input, lazy_load=stream_file is not None) \
+                as input_model:
 
             readnoise_filename = self.get_reference_file( input_model,
                                                           'readnoise')
@@ -38,23 +55,29 @@ class RampFitStep (Step):
                                                      'gain')
 
             log.info('Using READNOISE reference file: %s', readnoise_filename)
-            readnoise_model = models.ReadnoiseModel( readnoise_filename )
             log.info('Using GAIN reference file: %s', gain_filename)
-            gain_model = models.GainModel( gain_filename )
 
             log.info('Using algorithm = %s' % self.algorithm)
             log.info('Using weighting = %s' % self.weighting)
+            log.info('Using maximum_cores = %s' % self.maximum_cores)
 
             buffsize = ramp_fit.BUFSIZE
             if self.algorithm == "GLS":
                 buffsize //= 10
-            out_model, int_model, opt_model, gls_opt_model = \
+
+            with self.open_reference_model( readnoise_filename,
+                                            datamodels.ReadnoiseModel ) \
+                    as readnoise_model, \
+                 self.open_reference_model( gain_filename,
+                                            datamodels.GainModel ) \
+                    as gain_model:
+                out_model, int_model, opt_model, gls_opt_model = \
                         ramp_fit.ramp_fit (input_model,
                                            buffsize, self.save_opt,
                                            readnoise_model, gain_model,
-                                           self.algorithm, self.weighting)
-
-            readnoise_model.close()
+                                           self.algorithm, self.weighting,
+                                           self.maximum_cores,
+                                           self.ols_engine, stream_file)
 
         if int_model is not None:
             if self.int_name != '':
@@ -0,0 +1,166 @@
+from __future__ import absolute_import, division
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from numpy.testing import assert_allclose, assert_array_equal
+
+from astropy.io import fits
+
+from jwst import datamodels
+from jwst.datamodels import dqflags
+from jwst.ramp_fitting import ramp_fit
+
+# Tolerance of the comparison of the results of the OLS engines, which sum
+# the same terms in a different order
+RTOL = 1.e-5
+ATOL = 1.e-6
+
+OPT_ARRAYS = ('slope', 'sigslope', 'yint', 'sigyint', 'pedestal', 'weights',
+              'crmag')
+
+
+def make_models(nints=2, ngroups=10, nrows=8, ncols=9, instrument='NIRCAM',
+                seed=0):
+    """
+    A RampModel of simulated ramps with cosmic rays and saturation, and
+    matching read noise and gain models.
+    """
+    rng = np.random.RandomState(seed)
+    shape = (nints, ngroups, nrows, ncols)
+
+    rate = rng.uniform(0., 100., (nints, 1, nrows, ncols))
+    data = np.cumsum(rng.poisson(rate, shape), axis=1) + \
+           rng.normal(0., 10., shape)
+
+    groupdq = np.zeros(shape, dtype=np.uint8)
+    crs = rng.uniform(size=shape) < 0.05
+    groupdq[crs] = dqflags.group['JUMP_DET']
+    data += np.cumsum(crs * rng.uniform(100., 1000., shape), axis=1)
+
+    sat_group = rng.randint(0, ngroups, (nints, 1, nrows, ncols))
+    sat_pix = rng.uniform(size=(nints, 1, nrows, ncols)) < 0.2
+    sat = (np.arange(ngroups).reshape((1, ngroups, 1, 1)) >= sat_group) & \
+          sat_pix
+    groupdq[sat] |= dqflags.group['SATURATED']
+
+    model = datamodels.RampModel(data=data.astype(np.float32),
+                                 groupdq=groupdq,
+                                 pixeldq=np.zeros((nrows, ncols),
+                                                  dtype=np.uint32),
+                                 err=np.zeros(shape, dtype=np.float32))
+    model.meta.filename = 'test_ramp_fit.fits'
+    model.meta.instrument.name = instrument
+    model.meta.exposure.ngroups = ngroups
+    model.meta.exposure.nframes = 1
+    model.meta.exposure.groupgap = 0
+    model.meta.exposure.frame_time = 10.7
+    model.meta.exposure.group_time = 10.7
+
+    readnoise_model = datamodels.ReadnoiseModel(
+        data=np.full((nrows, ncols), 10., dtype=np.float32))
+    gain_model = datamodels.GainModel(
+        data=np.full((nrows, ncols), 2., dtype=np.float32))
+    for m in (model, readnoise_model, gain_model):
+        m.meta.subarray.xstart = 1
+        m.meta.subarray.ystart = 1
+        m.meta.subarray.xsize = ncols
+        m.meta.subarray.ysize = nrows
+
+    return model, readnoise_model, gain_model
+
+
+def check_ols_engines(instrument, weighting):
+    results = {}
+    for ols_engine in ('iterative', 'batched'):
+        model, readnoise_model, gain_model = make_models(
+            instrument=instrument)
+        # a buffer of 3 rows, to fit several data sections
+        buffsize = 3 * model.data.shape[1] * model.data.shape[3]
+        results[ols_engine] = ramp_fit.ols_ramp_fit(
+            model, buffsize, True, readnoise_model, gain_model, weighting,
+            ols_engine=ols_engine)
+
+    (new_iter, int_iter, opt_iter) = results['iterative']
+    (new_batch, int_batch, opt_batch) = results['batched']
+
+    for iter_model, batch_model in ((new_iter, new_batch),
+                                    (int_iter, int_batch)):
+        assert_allclose(batch_model.data, iter_model.data, rtol=RTOL,
+                        atol=ATOL)
+        assert_allclose(batch_model.err, iter_model.err, rtol=RTOL,
+                        atol=ATOL)
+        assert_array_equal(batch_model.dq, iter_model.dq)
+
+    for name in OPT_ARRAYS:
+        expected = getattr(opt_iter, name)
+        actual = getattr(opt_batch, name)
+        assert actual.shape == expected.shape, name
+        assert_allclose(actual, expected, rtol=RTOL, atol=ATOL,
+                        err_msg=name)
+
+
+def test_ols_engines_unweighted():
+    check_ols_engines('NIRCAM', 'unwtd')
+
+
+def test_ols_engines_optimal():
+    check_ols_engines('NIRCAM', 'optim')
+
+
+def test_ols_engines_skipped_frames():
+    check_ols_engines('MIRI', 'optim')
+
+
+def write_ramp_file(model, filename):
+    """Write the arrays and the metadata used by ramp fitting of a RampModel
+    to a FITS file."""
+    primary = fits.PrimaryHDU()
+    for keyword, value in (
+            ('INSTRUME', model.meta.instrument.name),
+            ('NGROUPS', model.meta.exposure.ngroups),
+            ('NFRAMES', model.meta.exposure.nframes),
+            ('GROUPGAP', model.meta.exposure.groupgap),
+            ('TFRAME', model.meta.exposure.frame_time),
+            ('TGROUP', model.meta.exposure.group_time),
+            ('SUBSTRT1', model.meta.subarray.xstart),
+            ('SUBSTRT2', model.meta.subarray.ystart),
+            ('SUBSIZE1', model.meta.subarray.xsize),
+            ('SUBSIZE2', model.meta.subarray.ysize)):
+        primary.header[keyword] = value
+    fits.HDUList([primary,
+                  fits.ImageHDU(model.data, name='SCI'),
+                  fits.ImageHDU(model.pixeldq, name='PIXELDQ'),
+                  fits.ImageHDU(model.groupdq, name='GROUPDQ'),
+                  fits.ImageHDU(model.err, name='ERR')]).writeto(filename)
+
+
+def test_stream_matches_in_memory():
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(tmp_dir, 'ramp.fits')
+        model, readnoise_model, gain_model = make_models(nints=3)
+        model.err[:] = 1.
+        write_ramp_file(model, filename)
+        buffsize = 3 * model.data.shape[1] * model.data.shape[3]
+
+        results = {}
+        for stream_file in (None, filename):
+            with datamodels.RampModel(filename) as model:
+                results[stream_file] = ramp_fit.ramp_fit(
+                    model, buffsize, False, readnoise_model, gain_model,
+                    'OLS', 'optim', stream_file=stream_file)
+
+        (new_model, int_model, opt_model, gls_opt_model) = results[None]
+        (new_stream, int_stream, opt_stream, gls_opt_stream) = \
+            results[filename]
+        assert opt_stream is None and gls_opt_stream is None
+        for expected, actual in ((new_model, new_stream),
+                                 (int_model, int_stream)):
+            assert_array_equal(actual.data, expected.data)
+            assert_array_equal(actual.err, expected.err)
+            assert_array_equal(actual.dq, expected.dq)
+    finally:
+        shutil.rmtree(tmp_dir)
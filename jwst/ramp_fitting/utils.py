@@ -181,10 +181,8 @@ class OptRes( object ):
         pixels having at least one read with a non-zero magnitude. For
         every integration, the depth of the array is equal to the
         maximum number of cosmic rays flagged in all pixels in all
-        integrations.  This routine currently involves a loop over all
-        pixels having at least 1 read flagged; if this algorithm takes
-        too long for datasets having an overabundance of cosmic rays,
-        this routine will require further optimization.
+        integrations.  Within each pixel, the non-zero magnitudes are kept
+        in read order.
 
         Parameters
         ----------
@@ -223,23 +221,20 @@ class OptRes( object ):
         # Allocate compressed array based on max number of crs
         cr_com = np.zeros((n_int,) + (max_cr,) + imshape, dtype=np.int16)
 
-        # Loop over integrations and reads: for those pix having a cr, add
-        #    the magnitude to the compressed array
+        # Loop over integrations: for those pix having a cr, add the
+        #    positive magnitudes to the compressed array, each at the index
+        #    given by the number of such magnitudes in earlier reads
         for ii_int in range( 0, n_int ):
             cr_mag_int = self.cr_mag_seg[ ii_int, :, :, :]
-            cr_int_has_cr = np.where( cr_mag_int.sum(axis=0) != 0 )
+            cr_int_has_cr = ( cr_mag_int.sum(axis=0) != 0 )
 
-            # Initialize number of crs for each image pixel for this integration
-            end_cr = np.zeros( imshape, dtype= np.int8)
+            cr_mag_rd = cr_mag_int[ :nreads - skip_i - skip_f, :, :]
+            wh_cr = ( cr_mag_rd > 0. ) & cr_int_has_cr
+            end_cr = np.cumsum( wh_cr, axis=0 ) - 1
 
-            for k_rd in range( nreads - skip_i - skip_f ):
-                # loop over pixels having a CR
-                for nn in range( len(cr_int_has_cr[0]) ):
-                    y, x = cr_int_has_cr[0][nn], cr_int_has_cr[1][nn]
-
-                    if (cr_mag_int[ k_rd, y, x ] > 0.):
-                        cr_com[ii_int, end_cr[ y,x ],y,x] = cr_mag_int[k_rd,y,x]
-                        end_cr[ y, x ] += 1
+            k_rd, y, x = np.where( wh_cr )
+            cr_com[ ii_int, end_cr[ k_rd, y, x ], y, x ] = \
+                                                    cr_mag_rd[ k_rd, y, x ]
 
         self.cr_mag_seg = cr_com
 
@@ -271,7 +266,7 @@ class OptRes( object ):
         """
 
         rfo_model = \
-        models.RampFitOutputModel(\
+        datamodels.RampFitOutputModel(\
             slope = self.slope_seg.astype(np.float32)/effintim,
             sigslope = self.sigslope_seg.astype(np.float32),
             yint = self.yint_seg.astype(np.float32),
@@ -469,7 +464,7 @@ def output_integ( model, slope_int, err_int, dq_int, effintim ):
 
     """
 
-    cubemod = models.CubeModel()
+    cubemod = datamodels.CubeModel()
 
     cubemod.data = slope_int/effintim
     cubemod.err = err_int/effintim
@@ -656,7 +651,7 @@ def get_effintim( model ):
 
 
 
-def get_dataset_info( model ):
+def get_dataset_info( model, shape=None ):
     """
     Short Summary
     -------------
@@ -669,6 +664,10 @@ def get_dataset_info( model ):
     model: instance of Data Model
        DM object for input
 
+    shape: (int, int, int, int) tuple
+       shape of the SCI array of the input; if None (default), the shape of
+       model.data is used, which loads the array if it is lazily loaded
+
     Returns
     -------
     nreads: int
@@ -701,10 +700,9 @@ def get_dataset_info( model ):
     frame_time = model.meta.exposure.frame_time
     ngroups = model.meta.exposure.ngroups
 
-    n_int = model.data.shape[0]
-    nreads = model.data.shape[1]
-    asize2 = model.data.shape[2]
-    asize1 = model.data.shape[3]
+    if shape is None:
+        shape = model.data.shape
+    n_int, nreads, asize2, asize1 = shape
 
     npix = asize2*asize1  # number of pixels in 2D array
     imshape = (asize2, asize1)
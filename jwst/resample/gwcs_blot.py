@@ -60,7 +60,10 @@ class GWCSBlot(object):
         self.source_wcs = product.meta.wcs
         self.source = product.data
 
-    def extract_image(self, blot_wcs, interp='poly5', sinscl=1.0):
+    def extract_image(self, blot_wcs, interp='poly5', sinscl=1.0,
+                      pixmap_stepsize=1,
+                      pixmap_tolerance=resample_utils.PIXMAP_TOLERANCE,
+                      pixmap_cache=False, pixmap=None):
         """
         Resample the output/resampled image to recreate an input image based on 
         the input image's world coordinate system 
@@ -81,13 +84,31 @@ class GWCSBlot(object):
 
         sincscl : float, optional
             The scaling factor for sinc interpolation.
+
+        pixmap_stepsize : int, optional
+            Spacing in pixels of the grid on which the WCS transforms are
+            evaluated to compute the pixel map.  The default value of 1
+            evaluates the transforms on every pixel.
+
+        pixmap_tolerance : float, optional
+            Maximum error in pixels of the interpolated pixel map.
+
+        pixmap_cache : bool, optional
+            Look up and store the pixel map in the cache of `resample_utils`.
+
+        pixmap : array, optional
+            The precomputed pixel map of the source WCS to `blot_wcs`.  It
+            is computed if None.
         """
         blot_shape = resample_utils.build_size_from_domain(blot_wcs.domain)
         _outsci = np.zeros((blot_shape[1],blot_shape[0]),dtype=np.float32)
         
         # Compute the mapping between the input and output pixel coordinates
         #log.info("Creating PIXMAP for blotted image...")
-        pixmap = resample_utils.calc_gwcs_pixmap(self.source_wcs, blot_wcs)
+        if pixmap is None:
+            pixmap = resample_utils.calc_gwcs_pixmap(
+                self.source_wcs, blot_wcs, stepsize=pixmap_stepsize,
+                tolerance=pixmap_tolerance, use_cache=pixmap_cache)
 
         source_pscale = self.source_wcs.forward_transform['cdelt1'].factor.value
         blot_pscale = blot_wcs.forward_transform['cdelt1'].factor.value
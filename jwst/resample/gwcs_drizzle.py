@@ -35,7 +35,9 @@ class GWCSDrizzle(object):
     """
     def __init__(self, product="", outwcs=None, single=False,
                  wt_scl="exptime", pixfrac=1.0, kernel="square",
-                 fillval="INDEF"):
+                 fillval="INDEF", pixmap_stepsize=1,
+                 pixmap_tolerance=resample_utils.PIXMAP_TOLERANCE,
+                 pixmap_cache=False):
         """
         Create a new Drizzle output object and set the drizzle parameters.
 
@@ -81,6 +83,19 @@ class GWCSDrizzle(object):
         fillval : str, otional
             The value a pixel is set to in the output if the input image does
             not overlap it. The default value of INDEF does not set a value.
+
+        pixmap_stepsize : int, optional
+            Spacing in pixels of the grid on which the WCS transforms are
+            evaluated to compute the pixel map of each input image.  The
+            pixel map is interpolated between the grid points.  The default
+            value of 1 evaluates the transforms on every pixel.
+
+        pixmap_tolerance : float, optional
+            Maximum error in output pixels of the interpolated pixel maps.
+
+        pixmap_cache : bool, optional
+            Keep the pixel maps in the cache of `resample_utils`, for reuse
+            by later drizzling of the same inputs to the same output WCS.
         """
 
         # Initialize the object fields
@@ -97,6 +112,9 @@ class GWCSDrizzle(object):
         self.kernel = kernel
         self.fillval = fillval
         self.pixfrac = float(pixfrac)
+        self.pixmap_stepsize = pixmap_stepsize
+        self.pixmap_tolerance = pixmap_tolerance
+        self.pixmap_cache = pixmap_cache
 
         self.sciext = "SCI"
         self.whtext = "WHT"
@@ -160,7 +178,7 @@ class GWCSDrizzle(object):
 
     def add_image(self, insci, inwcs, inwht=None,
                   xmin=0, xmax=0, ymin=0, ymax=0, pscale_ratio=1.0,
-                  expin=1.0, in_units="cps", wt_scl=1.0):
+                  expin=1.0, in_units="cps", wt_scl=1.0, pixmap=None):
         """
         Combine an input image with the output drizzled image.
 
@@ -225,6 +243,10 @@ class GWCSDrizzle(object):
             initialized with wt_scl set to "exptime" or "expsq", the exposure time
             will be used to set the weight scaling and the value of this parameter
             will be ignored.
+
+        pixmap : array, optional
+            The pixel map of the input image to the output WCS, as computed
+            by `resample_utils.calc_gwcs_pixmap`.  It is computed if None.
         """
         insci = insci.astype(np.float32)
 
@@ -247,7 +269,10 @@ class GWCSDrizzle(object):
                             pscale_ratio=pscale_ratio, uniqid=self.uniqid,
                             xmin=xmin, xmax=xmax, ymin=ymin, ymax=ymax,
                             pixfrac=self.pixfrac, kernel=self.kernel,
-                            fillval=self.fillval)        
+                            fillval=self.fillval,
+                            pixmap_stepsize=self.pixmap_stepsize,
+                            pixmap_tolerance=self.pixmap_tolerance,
+                            pixmap_cache=self.pixmap_cache, pixmap=pixmap)
 
     def blot_fits_file(self, infile, interp='poly5', sinscl=1.0):
         """
@@ -347,7 +372,10 @@ def dodrizzle(insci, input_wcs, inwht,
               expin, in_units, wt_scl,
               pscale_ratio=1.0, uniqid=1,
               xmin=0, xmax=0, ymin=0, ymax=0,
-              pixfrac=1.0, kernel='square', fillval="INDEF"):
+              pixfrac=1.0, kernel='square', fillval="INDEF",
+              pixmap_stepsize=1,
+              pixmap_tolerance=resample_utils.PIXMAP_TOLERANCE,
+              pixmap_cache=False, pixmap=None):
     """
     Low level routine for performing 'drizzle' operation.on one image.
 
@@ -453,6 +481,21 @@ def dodrizzle(insci, input_wcs, inwht,
         The value a pixel is set to in the output if the input image does
         not overlap it. The default value of INDEF does not set a value.
 
+    pixmap_stepsize : int, optional
+        Spacing in pixels of the grid on which the WCS transforms are
+        evaluated to compute the pixel map.  The default value of 1
+        evaluates the transforms on every pixel.
+
+    pixmap_tolerance : float, optional
+        Maximum error in output pixels of the interpolated pixel map.
+
+    pixmap_cache : bool, optional
+        Look up and store the pixel map in the cache of `resample_utils`.
+
+    pixmap : 3d array, optional
+        The precomputed pixel map of the input image to the output WCS.
+        If None, it is computed.
+
     Returns
     -------
     A tuple with three values: a version string, the number of pixels
@@ -506,7 +549,11 @@ def dodrizzle(insci, input_wcs, inwht,
         outcon = outcon[planeid]
 
     # Compute the mapping between the input and output pixel coordinates
-    pixmap = resample_utils.calc_gwcs_pixmap(input_wcs, output_wcs)    
+    if pixmap is None:
+        pixmap = resample_utils.calc_gwcs_pixmap(input_wcs, output_wcs,
+                                                 stepsize=pixmap_stepsize,
+                                                 tolerance=pixmap_tolerance,
+                                                 use_cache=pixmap_cache)
 
     #
     # Call 'drizzle' to perform image combination
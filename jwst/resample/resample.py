@@ -1,3 +1,6 @@
+import multiprocessing
+import os
+import sys
 import time
 import numpy as np
 from collections import OrderedDict
@@ -36,7 +39,11 @@ class ResampleData(object):
          (eventually) a record of metadata from all input models.
     """
     drizpars = {'single':False,'kernel':'square','pixfrac':1.0,'good_bits':None,
-                        'fillval':'INDEF','wht_type':'exptime'}
+                        'fillval':'INDEF','wht_type':'exptime',
+                        'pixmap_stepsize':1,
+                        'pixmap_tolerance':resample_utils.PIXMAP_TOLERANCE,
+                        'pixmap_cache':False,
+                        'nproc':1}
 
     def __init__(self, input_models, output=None, ref_filename=None, **pars):
         """
@@ -161,57 +168,174 @@ class ResampleData(object):
             group_exptime = [total_exposure_time]
          
         pointings = len(self.input_models.group_names)
-        # Now, generate each output for all input_models
-        for obs_product, group, texptime in zip(driz_outputs, model_groups, group_exptime):
-            output_model = self.blank_output.copy()
-            output_model.meta.filename = obs_product
-
-            output_model.meta.asn.pool_name = self.input_models.meta.pool_name
-            output_model.meta.asn.table_name = self.input_models.meta.table_name
-                        
-            exposure_times = {'start':[], 'end':[]}
-            
-            # Initialize the output with the wcs
-            driz = gwcs_drizzle.GWCSDrizzle(output_model,
-                                single=self.drizpars['single'],
-                                pixfrac=self.drizpars['pixfrac'],
-                                kernel=self.drizpars['kernel'],
-                                fillval=self.drizpars['fillval'])
-
-            for n,img in enumerate(group):
-                wcslin_pscale = img.meta.wcs.forward_transform['cdelt1'].factor.value
-                exposure_times['start'].append(img.meta.exposure.start_time)
-                exposure_times['end'].append(img.meta.exposure.end_time)
-
-                outwcs_pscale = output_model.meta.wcs.forward_transform['cdelt1'].factor.value
-                wcslin_pscale = img.meta.wcs.forward_transform['cdelt1'].factor.value
-
-                inwht = build_driz_weight(img, wht_type=self.drizpars['wht_type'],
-                                    good_bits=self.drizpars['good_bits'])
-                driz.add_image(img.data, img.meta.wcs, inwht=inwht,
-                        expin=img.meta.exposure.exposure_time,
-                        pscale_ratio=outwcs_pscale/wcslin_pscale)
-
-            # Update some basic exposure time values based on all the inputs
-            output_model.meta.exposure.exposure_time = texptime
-            output_model.meta.exposure.start_time = min(exposure_times['start'])
-            output_model.meta.exposure.end_time = max(exposure_times['end'])
-            output_model.meta.resample.product_exposure_time = texptime
-            output_model.meta.resample.product_data_extname = driz.sciext
-            output_model.meta.resample.product_context_extname = driz.conext
-            output_model.meta.resample.product_weight_extname = driz.whtext
-            output_model.meta.resample.drizzle_fill_value = str(driz.fillval)
-            output_model.meta.resample.drizzle_pixel_fraction = driz.pixfrac
-            output_model.meta.resample.drizzle_kernel = driz.kernel
-            output_model.meta.resample.drizzle_output_units = driz.out_units
-            output_model.meta.resample.drizzle_weight_scale = driz.wt_scl
-            output_model.meta.resample.resample_bits = self.drizpars['good_bits']
-            output_model.meta.resample.weight_type = self.drizpars['wht_type']
-            output_model.meta.resample.pointings = pointings            
-
+        groups = list(zip(driz_outputs, model_groups, group_exptime))
+
+        # Drizzle independent output groups in parallel when there are
+        # more than one; otherwise use the processes for the pixel maps.
+        nproc = min(self.drizpars['nproc'], len(groups))
+        if nproc > 1:
+            output_models = self._drizzle_groups_parallel(groups, pointings,
+                                                          nproc)
+        else:
+            output_models = []
+            for obs_product, group, texptime in groups:
+                output_model, _metadata = self._drizzle_group(
+                    obs_product, group, texptime, pointings,
+                    nproc=self.drizpars['nproc'])
+                output_models.append(output_model)
+
+        for output_model in output_models:
             self.output_models.append(output_model)
         #self.output_models.save(None)  # DEBUG: Remove for production
-                
+
+    def _new_output_model(self, obs_product):
+        """ Create a blank output model for an output product.
+        """
+        output_model = self.blank_output.copy()
+        output_model.meta.filename = obs_product
+
+        output_model.meta.asn.pool_name = self.input_models.meta.pool_name
+        output_model.meta.asn.table_name = self.input_models.meta.table_name
+        return output_model
+
+    def _drizzle_group(self, obs_product, group, texptime, pointings,
+                       nproc=1):
+        """ Drizzle a group of input models into a new output model.
+
+        Returns the output model and the metadata values which were set on
+        it, as a dictionary of dotted names.  The pixel maps of `nproc`
+        input models at a time are computed in parallel.
+        """
+        output_model = self._new_output_model(obs_product)
+
+        exposure_times = {'start':[], 'end':[]}
+
+        # Initialize the output with the wcs
+        driz = gwcs_drizzle.GWCSDrizzle(output_model,
+                            single=self.drizpars['single'],
+                            pixfrac=self.drizpars['pixfrac'],
+                            kernel=self.drizpars['kernel'],
+                            fillval=self.drizpars['fillval'],
+                            pixmap_stepsize=self.drizpars['pixmap_stepsize'],
+                            pixmap_tolerance=self.drizpars['pixmap_tolerance'],
+                            pixmap_cache=self.drizpars['pixmap_cache'])
+
+        group = list(group)
+        pixmap = None
+        for n,img in enumerate(group):
+            if nproc > 1:
+                if n % nproc == 0:
+                    # Compute the pixel maps of the next nproc images in
+                    # parallel
+                    pixmaps = resample_utils.calc_gwcs_pixmaps(
+                        [(i.meta.wcs, output_model.meta.wcs)
+                         for i in group[n:n + nproc]],
+                        stepsize=self.drizpars['pixmap_stepsize'],
+                        tolerance=self.drizpars['pixmap_tolerance'],
+                        use_cache=self.drizpars['pixmap_cache'],
+                        nproc=nproc)
+                pixmap = pixmaps[n % nproc]
+
+            wcslin_pscale = img.meta.wcs.forward_transform['cdelt1'].factor.value
+            exposure_times['start'].append(img.meta.exposure.start_time)
+            exposure_times['end'].append(img.meta.exposure.end_time)
+
+            outwcs_pscale = output_model.meta.wcs.forward_transform['cdelt1'].factor.value
+            wcslin_pscale = img.meta.wcs.forward_transform['cdelt1'].factor.value
+
+            inwht = build_driz_weight(img, wht_type=self.drizpars['wht_type'],
+                                good_bits=self.drizpars['good_bits'])
+            driz.add_image(img.data, img.meta.wcs, inwht=inwht,
+                    expin=img.meta.exposure.exposure_time,
+                    pscale_ratio=outwcs_pscale/wcslin_pscale, pixmap=pixmap)
+
+        # Update some basic exposure time values based on all the inputs
+        metadata = OrderedDict([
+            ('meta.exposure.exposure_time', texptime),
+            ('meta.exposure.start_time', min(exposure_times['start'])),
+            ('meta.exposure.end_time', max(exposure_times['end'])),
+            ('meta.resample.product_exposure_time', texptime),
+            ('meta.resample.product_data_extname', driz.sciext),
+            ('meta.resample.product_context_extname', driz.conext),
+            ('meta.resample.product_weight_extname', driz.whtext),
+            ('meta.resample.drizzle_fill_value', str(driz.fillval)),
+            ('meta.resample.drizzle_pixel_fraction', driz.pixfrac),
+            ('meta.resample.drizzle_kernel', driz.kernel),
+            ('meta.resample.drizzle_output_units', driz.out_units),
+            ('meta.resample.drizzle_weight_scale', driz.wt_scl),
+            ('meta.resample.resample_bits', self.drizpars['good_bits']),
+            ('meta.resample.weight_type', self.drizpars['wht_type']),
+            ('meta.resample.pointings', pointings),
+        ])
+        for key, value in metadata.items():
+            output_model[key] = value
+
+        return output_model, metadata
+
+    def _drizzle_groups_parallel(self, groups, pointings, nproc):
+        """ Drizzle independent groups using `nproc` worker processes.
+
+        Worker processes are forked so that they share the input models
+        instead of having them pickled; only the output arrays and
+        metadata are sent back.  When processes cannot be forked, groups
+        are drizzled serially.  Output models are returned in the order
+        of `groups`.
+        """
+        global _pool_resample, _pool_groups, _pool_pointings
+
+        try:
+            if sys.version_info[0] >= 3:
+                ctx = multiprocessing.get_context('fork')
+            elif hasattr(os, 'fork'):
+                ctx = multiprocessing
+            else:
+                raise ValueError('fork is not available')
+        except ValueError:
+            log.warning("Cannot fork worker processes. Groups will be "
+                        "drizzled serially.")
+            return [self._drizzle_group(obs_product, group, texptime,
+                                        pointings)[0]
+                    for obs_product, group, texptime in groups]
+
+        _pool_resample = self
+        _pool_groups = groups
+        _pool_pointings = pointings
+        pool = ctx.Pool(processes=nproc)
+        try:
+            results = pool.map(_pool_drizzle_group, range(len(groups)),
+                               chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+            _pool_resample = None
+            _pool_groups = None
+            _pool_pointings = None
+
+        output_models = []
+        for (obs_product, group, texptime), result in zip(groups, results):
+            data, wht, con, metadata = result
+            output_model = self._new_output_model(obs_product)
+            output_model.data = data
+            output_model.wht = wht
+            output_model.con = con
+            for key, value in metadata.items():
+                output_model[key] = value
+            output_models.append(output_model)
+        return output_models
+
+
+_pool_resample = None
+_pool_groups = None
+_pool_pointings = None
+
+
+def _pool_drizzle_group(n):
+    obs_product, group, texptime = _pool_groups[n]
+    output_model, metadata = _pool_resample._drizzle_group(
+        obs_product, group, texptime, _pool_pointings)
+    return output_model.data, output_model.wht, output_model.con, metadata
+
+
 def _buildMask(dqarr,bitvalue):
     """ Builds a bit-mask from an input DQ array and a bitvalue flag"""
 
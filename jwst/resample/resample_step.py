@@ -2,7 +2,6 @@
 
 from jwst.stpipe import Step, cmdline
 from jwst import datamodels
-from . import resample
 
 
 class ResampleStep(Step):
@@ -25,10 +24,15 @@ class ResampleStep(Step):
         kernel = string(default='square')
         fillval = string(default='INDEF')
         good_bits = integer(default=-1)
+        pixmap_stepsize = integer(min=1, default=1) # Grid spacing of interpolated pixel maps
+        pixmap_tolerance = float(default=0.01) # Max error of interpolated pixel maps
+        pixmap_cache = boolean(default=False) # Keep pixel maps in memory (up to 1 GB) for reuse
+        nproc = integer(min=1, default=1) # Number of processes drizzling groups or computing pixel maps
     """
     reference_file_types=['drizpars']
 
     def process(self, input):
+        from . import resample
 
         input_models = models.open(input)
         if type(input_models) != type(models.ModelContainer()): # single exposure
@@ -54,7 +58,11 @@ class ResampleStep(Step):
         self.step = resample.ResampleData(self.input_models, self.ref_filename,
                                 single=self.single, wht_type=self.wht_type,
                                 pixfrac=self.pixfrac, kernel=self.kernel,
-                                fillval=self.fillval, good_bits=self.good_bits)
+                                fillval=self.fillval, good_bits=self.good_bits,
+                                pixmap_stepsize=self.pixmap_stepsize,
+                                pixmap_tolerance=self.pixmap_tolerance,
+                                pixmap_cache=self.pixmap_cache,
+                                nproc=self.nproc)
         self.step.do_drizzle()
 
         #self.input_models.close()
@@ -1,13 +1,24 @@
 """ General utilities used throughout the resample package.
 
 """
+from collections import OrderedDict
+import hashlib
+import multiprocessing
+import os
+import sys
+import threading
+
 import numpy as np
+from scipy.interpolate import RectBivariateSpline
 
 from astropy import wcs as fitswcs
 from gwcs import wcs
 from gwcs import wcstools
 
-from jwst import assign_wcs
+from jwst.assign_wcs import util
+
+import logging
+log = logging.getLogger(__name__)
 
 DEFAULT_DOMAIN = {'lower':None,'upper':None,'includes_lower':True, 'includes_upper':False}
 
@@ -29,7 +40,7 @@ def make_output_wcs(input_models):
         if w.domain is None:
            w.domain = create_domain(w,i.data.shape)
 
-    output_wcs = assign_wcs.util.wcs_from_footprints(wcslist)
+    output_wcs = util.wcs_from_footprints(wcslist)
     data_size = build_size_from_domain(output_wcs.domain)
     output_wcs.data_size = (data_size[1],data_size[0])
     return output_wcs
@@ -62,14 +73,266 @@ def build_size_from_domain(domain):
         size.append(int(delta+0.5))
     return tuple(size)
 
-def calc_gwcs_pixmap(in_wcs, out_wcs):
+# Maximum error, in output pixels, of interpolated pixel maps
+PIXMAP_TOLERANCE = 0.01
+
+# Maximum total size in bytes of the cached pixel maps.  The cache is only
+# used when asked for, with the pixmap_cache parameter of the steps.
+PIXMAP_CACHE_SIZE = 1024 ** 3
+
+_pixmap_cache = OrderedDict()
+_pixmap_cache_lock = threading.Lock()
+_pixmap_cache_stats = {'hits': 0, 'misses': 0, 'nbytes': 0}
+
+
+def calc_gwcs_pixmap(in_wcs, out_wcs, stepsize=1, tolerance=PIXMAP_TOLERANCE,
+                     use_cache=False):
+    """ Compute the mapping of the pixels of `in_wcs` to the pixels of `out_wcs`.
+
+    Parameters
+    ----------
+    in_wcs, out_wcs : `~gwcs.wcs.WCS`
+        WCS of the input and output frames.  The pixel map covers the
+        domain of `in_wcs`.
+
+    stepsize : int, optional
+        When larger than 1, the transforms are only evaluated on a grid
+        of pixels `stepsize` apart and the pixel map is interpolated
+        from it with bicubic splines.  The grid is refined until the
+        interpolated map agrees with the exact transforms to within
+        `tolerance` half way between the grid points.  A step size of 1
+        evaluates the transforms on every pixel.
+
+    tolerance : float, optional
+        Maximum error of the interpolated pixel map, in output pixels.
+
+    use_cache : bool, optional
+        Look up and store the pixel map in a cache keyed by the two WCSs
+        and the step size and tolerance, so that a later call for the
+        same mapping, such as the drizzling of the same input to the
+        same output frame by both outlier detection and resample, reuses
+        it.  Cached pixel maps must not be modified.
+
+    Returns
+    -------
+    pixmap : ndarray
+        Array of shape ``(ny, nx, 2)`` of the output pixel coordinates of
+        each input pixel.
+    """
+    key = None
+    if use_cache:
+        key = _pixmap_key(in_wcs, out_wcs, stepsize, tolerance)
+    if key is not None:
+        with _pixmap_cache_lock:
+            pixmap = _pixmap_cache.pop(key, None)
+            if pixmap is not None:
+                _pixmap_cache[key] = pixmap
+                _pixmap_cache_stats['hits'] += 1
+                return pixmap
+            _pixmap_cache_stats['misses'] += 1
+
+    pixmap = _compute_pixmap(in_wcs, out_wcs, stepsize, tolerance)
+
+    if key is not None:
+        _cache_pixmap(key, pixmap)
+    return pixmap
+
+
+def calc_gwcs_pixmaps(wcs_pairs, stepsize=1, tolerance=PIXMAP_TOLERANCE,
+                      use_cache=False, nproc=1):
+    """ Compute the pixel maps of a list of (in_wcs, out_wcs) pairs.
+
+    This is `calc_gwcs_pixmap` for independent images, computing the
+    pixel maps which are not cached in `nproc` worker processes.  Worker
+    processes are forked so that they inherit the WCSs instead of having
+    them pickled.  When processes cannot be forked, pixel maps are
+    computed serially.  Pixel maps are returned in the order of
+    `wcs_pairs`.
+    """
+    global _pool_wcs_pairs, _pool_pars
+
+    pixmaps = [None] * len(wcs_pairs)
+    keys = [None] * len(wcs_pairs)
+    todo = []
+    for n, (in_wcs, out_wcs) in enumerate(wcs_pairs):
+        if use_cache:
+            keys[n] = _pixmap_key(in_wcs, out_wcs, stepsize, tolerance)
+        if keys[n] is not None:
+            with _pixmap_cache_lock:
+                pixmap = _pixmap_cache.pop(keys[n], None)
+                if pixmap is not None:
+                    _pixmap_cache[keys[n]] = pixmap
+                    _pixmap_cache_stats['hits'] += 1
+                    pixmaps[n] = pixmap
+                    continue
+                _pixmap_cache_stats['misses'] += 1
+        todo.append(n)
+
+    ctx = None
+    if nproc > 1 and len(todo) > 1:
+        try:
+            if sys.version_info[0] >= 3:
+                ctx = multiprocessing.get_context('fork')
+            elif hasattr(os, 'fork'):
+                ctx = multiprocessing
+            else:
+                raise ValueError('fork is not available')
+        except ValueError:
+            log.warning("Cannot fork worker processes. Pixel maps will be "
+                        "computed serially.")
+
+    if ctx is None:
+        results = [_compute_pixmap(wcs_pairs[n][0], wcs_pairs[n][1],
+                                   stepsize, tolerance) for n in todo]
+    else:
+        _pool_wcs_pairs = wcs_pairs
+        _pool_pars = (stepsize, tolerance)
+        pool = ctx.Pool(processes=min(nproc, len(todo)))
+        try:
+            results = pool.map(_pool_compute_pixmap, todo, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+            _pool_wcs_pairs = None
+            _pool_pars = None
+
+    for n, pixmap in zip(todo, results):
+        pixmaps[n] = pixmap
+        if keys[n] is not None:
+            _cache_pixmap(keys[n], pixmap)
+    return pixmaps
+
 
+def clear_pixmap_cache():
+    """ Remove all of the pixel maps from the cache.
+    """
+    with _pixmap_cache_lock:
+        _pixmap_cache.clear()
+        _pixmap_cache_stats.update(hits=0, misses=0, nbytes=0)
+
+
+def pixmap_cache_info():
+    """ Return the number of hits, misses, entries and bytes of the pixel
+    map cache.
+    """
+    with _pixmap_cache_lock:
+        info = dict(_pixmap_cache_stats)
+        info['size'] = len(_pixmap_cache)
+    return info
+
+
+def _cache_pixmap(key, pixmap):
+    if pixmap.nbytes > PIXMAP_CACHE_SIZE:
+        return
+    with _pixmap_cache_lock:
+        old = _pixmap_cache.pop(key, None)
+        if old is not None:
+            _pixmap_cache_stats['nbytes'] -= old.nbytes
+        _pixmap_cache[key] = pixmap
+        _pixmap_cache_stats['nbytes'] += pixmap.nbytes
+        # Evict the least recently used pixel maps
+        while _pixmap_cache_stats['nbytes'] > PIXMAP_CACHE_SIZE:
+            _old_key, old = _pixmap_cache.popitem(last=False)
+            _pixmap_cache_stats['nbytes'] -= old.nbytes
+
+
+def _pixmap_key(in_wcs, out_wcs, stepsize, tolerance):
+    """ Return the cache key of a pixel map, or None if it can't be cached.
+
+    The key is computed from the values of the WCSs, rather than their
+    identity, so that a WCS which is modified in place (for instance by
+    tweakreg) does not get the pixel map of its previous state.
+    """
+    try:
+        if isinstance(in_wcs, fitswcs.WCS):
+            in_key = in_wcs.to_header_string()
+        else:
+            in_key = _transform_key(in_wcs.forward_transform) + \
+                repr(in_wcs.domain)
+        if isinstance(out_wcs, fitswcs.WCS):
+            out_key = out_wcs.to_header_string()
+        else:
+            out_key = _transform_key(out_wcs.backward_transform)
+    except Exception:
+        return None
+    return (hashlib.sha1(in_key.encode('utf-8')).hexdigest(),
+            hashlib.sha1(out_key.encode('utf-8')).hexdigest(),
+            stepsize, tolerance)
+
+
+def _transform_key(transform):
+    parameters = np.asarray(transform.parameters, dtype=np.float64)
+    return repr(transform) + hashlib.sha1(parameters.tobytes()).hexdigest()
+
+
+_pool_wcs_pairs = None
+_pool_pars = None
+
+
+def _pool_compute_pixmap(n):
+    in_wcs, out_wcs = _pool_wcs_pairs[n]
+    return _compute_pixmap(in_wcs, out_wcs, *_pool_pars)
+
+
+def _compute_pixmap(in_wcs, out_wcs, stepsize=1, tolerance=PIXMAP_TOLERANCE):
+    """ Compute a pixel map, interpolated from a grid `stepsize` pixels apart.
+    """
     g = wcstools.grid_from_domain(in_wcs.domain)
+    transform = reproject(in_wcs,out_wcs)
 
-    pixmap_tuple = reproject(in_wcs,out_wcs)(g[1],g[0])
+    while stepsize > 1:
+        pixmap = _interpolate_pixmap(transform, g[1], g[0], stepsize,
+                                     tolerance)
+        if pixmap is not None:
+            return pixmap
+        stepsize //= 2
+
+    pixmap_tuple = transform(g[1],g[0])
     pixmap = np.dstack(pixmap_tuple)
     return pixmap
 
+
+def _grid_indices(size, stepsize):
+    """ Indices `stepsize` apart spanning ``range(size)``, and the indices
+    half way between them.
+    """
+    nodes = np.arange(0, size, stepsize)
+    if nodes[-1] != size - 1:
+        nodes = np.append(nodes, size - 1)
+    middles = (nodes[:-1] + nodes[1:]) // 2
+    return nodes, middles
+
+
+def _interpolate_pixmap(transform, x, y, stepsize, tolerance):
+    """ Interpolate the pixel map of `transform` at the `x`, `y` grid from a
+    grid of nodes `stepsize` pixels apart.  Return None if the interpolated
+    map is off by more than `tolerance` half way between the nodes, or the
+    transforms are not defined at every node.
+    """
+    rows, mid_rows = _grid_indices(x.shape[0], stepsize)
+    cols, mid_cols = _grid_indices(x.shape[1], stepsize)
+    # Splines need more nodes than their degree
+    if len(rows) < 4 or len(cols) < 4:
+        return None
+
+    nodes = np.ix_(rows, cols)
+    node_values = transform(x[nodes], y[nodes])
+    check = np.ix_(mid_rows, mid_cols)
+    check_values = transform(x[check], y[check])
+    if not all(np.isfinite(values).all()
+               for values in tuple(node_values) + tuple(check_values)):
+        return None
+
+    all_rows = np.arange(x.shape[0])
+    all_cols = np.arange(x.shape[1])
+    pixmap = np.empty(x.shape + (len(node_values),), dtype=np.float64)
+    for axis, (values, exact) in enumerate(zip(node_values, check_values)):
+        spline = RectBivariateSpline(rows, cols, values, kx=3, ky=3)
+        if np.abs(spline(mid_rows, mid_cols) - exact).max() > tolerance:
+            return None
+        pixmap[..., axis] = spline(all_rows, all_cols)
+    return pixmap
+
 def reproject(wcs1, wcs2, origin=0):
     """
     Given two WCSs return a function which takes pixel coordinates in
@@ -0,0 +1,112 @@
+#! /usr/bin/env python
+#
+# benchmark_rscd.py - compare the run times of the per-pixel and batched
+#     least-squares fits of rscd_sub.get_DNaccumulated_last_int on a
+#     synthetic MIRI exposure.
+#
+# The synthetic exposure has linear ramps with random slopes plus noise.
+# The accumulated DN of the previous integration is computed for every
+# integration after the first with both fits, and the largest difference
+# between them is printed.  The per-pixel fit is only run on `nrows_pixel`
+# rows, and its time is scaled to the full frame, as it takes minutes.
+#
+# linux usage example:
+#  ./benchmark_rscd.py 1024 1032 10 4
+#  ... which runs a 1024 x 1032 exposure with 10 groups and 4
+#  integrations.  The defaults are 1024, 1032, 10 and 3.
+
+from __future__ import division, print_function
+
+import sys
+import time
+import numpy as np
+
+from jwst.rscd import rscd_sub
+
+NROWS_PIXEL = 16  # number of rows fitted pixel by pixel
+
+
+class Exposure(object):
+    """The part of a RampModel used by get_DNaccumulated_last_int."""
+    def __init__(self, data):
+        self.data = data
+
+
+def make_exposure(nrows, ncols, ngroups, nints, seed=0):
+    """
+    Create a synthetic exposure of linear ramps with noise, of shape
+    ``(nints, ngroups, nrows, ncols)``.
+    """
+    rng = np.random.RandomState(seed)
+    data = np.empty((nints, ngroups, nrows, ncols), dtype=np.float32)
+    for i in range(nints):
+        slopes = rng.uniform(0., 50., (nrows, ncols))
+        for j in range(ngroups):
+            data[i, j] = (1000. + slopes * j +
+                          rng.normal(0., 10., (nrows, ncols)))
+    return Exposure(data)
+
+
+def dn_accumulated_per_pixel(exposure, i, ngroups, nrows):
+    """
+    The accumulated DN of the first `nrows` rows, fitting the ramps
+    pixel by pixel with rscd_sub.ols_fit.
+    """
+    dn_lastframe = exposure.data[i - 1, ngroups - 2, :nrows]
+    dn_accumulated = np.zeros_like(dn_lastframe)
+    for j in range(nrows):
+        for k in range(dn_lastframe.shape[1]):
+            slope, intercept = rscd_sub.ols_fit(
+                exposure.data[i, 0:ngroups - 1, j, k])
+            dn_accumulated[j, k] = dn_lastframe[j, k] - intercept
+    return dn_accumulated
+
+
+def benchmark(nrows, ncols, ngroups, nints):
+    """
+    Time the per-pixel and batched fits of all of the integrations after
+    the first, and print the times and the largest difference.
+    """
+    exposure = make_exposure(nrows, ncols, ngroups, nints)
+    nrows_pixel = min(NROWS_PIXEL, nrows)
+
+    t_pixel = t_batch = 0.
+    max_diff = 0.
+    for i in range(1, nints):
+        tstart = time.time()
+        expected = dn_accumulated_per_pixel(exposure, i, ngroups,
+                                            nrows_pixel)
+        t_pixel += time.time() - tstart
+
+        tstart = time.time()
+        dn_accumulated = rscd_sub.get_DNaccumulated_last_int(exposure, i,
+                                                             ngroups)
+        t_batch += time.time() - tstart
+
+        max_diff = max(max_diff, np.abs(dn_accumulated[:nrows_pixel] -
+                                        expected).max())
+
+    print('%d x %d pixels, %d groups, %d integrations' %
+          (nrows, ncols, ngroups, nints))
+    print('  per-pixel: %8.3f s (scaled from %d rows)' %
+          (t_pixel * nrows / nrows_pixel, nrows_pixel))
+    print('  batched:   %8.3f s' % t_batch)
+    print('  max difference: %.3g DN' % max_diff)
+
+
+if __name__ == "__main__":
+    """Get the size of the exposure and run the benchmark.
+    """
+    usage = "usage:  ./benchmark_rscd.py [nrows [ncols [ngroups [nints]]]]"
+
+    args = sys.argv[1:]
+    if len(args) > 4:
+        print(usage)
+        sys.exit(1)
+
+    nrows = int(args[0]) if len(args) > 0 else 1024
+    ncols = int(args[1]) if len(args) > 1 else 1032
+    ngroups = int(args[2]) if len(args) > 2 else 10
+    nints = int(args[3]) if len(args) > 3 else 3
+
+    benchmark(nrows, ncols, ngroups, nints)
@@ -96,27 +96,18 @@ def get_DNaccumulated_last_int(input_model,i,sci_ngroups):
     # Find the accumulated DN from the last integration
     # need to add skipping N frames (frames affected by reset)
     # Add check to make sure we have enough frames left to do a fit
-    
-    nrows = input_model.data.shape[2]
-    ncols = input_model.data.shape[3]
+
     # last frame affected by "last frame" effect - use second to last frame 
     # may want to extrapolate to last frame 
     # we may want to check if data has saturated 
     dn_lastframe = input_model.data[i-1][sci_ngroups-2]
 
-    dn_accumulated = dn_lastframe.copy()*0.0
-   # print('nrows,ncols',nrows,ncols)
-   # print(input_model.data.shape)
-    for j in range(nrows):
-        for k in range(ncols):
-            ramp = input_model.data[i,0:sci_ngroups-1,j,k]
-            
-            slope,intercept = ols_fit(ramp)
-            #print('slope & intercept',slope,intercept)
-
-            dn_accumulated[j,k] = dn_lastframe[j,k] - intercept
+    # Fit the ramps of all of the pixels at once, along the groups axis
+    ramps = input_model.data[i,0:sci_ngroups-1]
+    slope,intercept = ols_fit(ramps)
 
-    return dn_accumulated
+    dn_accumulated = dn_lastframe - intercept
+    return dn_accumulated.astype(dn_lastframe.dtype)
 
 def ols_fit(y):
     shape = y.shape
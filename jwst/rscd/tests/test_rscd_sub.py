@@ -0,0 +1,47 @@
+from __future__ import absolute_import, division
+
+import numpy as np
+from numpy.testing import assert_allclose
+
+from jwst import datamodels
+from jwst.rscd import rscd_sub
+
+
+def make_ramps(nints=3, ngroups=10, nrows=8, ncols=9, seed=1):
+    rng = np.random.RandomState(seed)
+    shape = (nints, ngroups, nrows, ncols)
+    slopes = rng.uniform(0., 50., (nints, 1, nrows, ncols))
+    data = 1000. + slopes * np.arange(ngroups).reshape((1, ngroups, 1, 1))
+    data += rng.normal(0., 10., shape)
+    return data.astype(np.float32)
+
+
+def test_ols_fit_all_pixels_matches_per_pixel():
+    ramps = make_ramps()[1]
+
+    slope, intercept = rscd_sub.ols_fit(ramps)
+    for j in range(ramps.shape[1]):
+        for k in range(ramps.shape[2]):
+            expected = rscd_sub.ols_fit(ramps[:, j, k])
+            assert_allclose([slope[j, k], intercept[j, k]], expected,
+                            rtol=1e-6, atol=1e-3)
+
+
+def test_DNaccumulated_last_int_matches_per_pixel():
+    data = make_ramps()
+    ngroups = data.shape[1]
+
+    with datamodels.RampModel(data=data) as model:
+        for i in range(1, data.shape[0]):
+            dn_accumulated = rscd_sub.get_DNaccumulated_last_int(model, i,
+                                                                 ngroups)
+            assert dn_accumulated.dtype == data.dtype
+
+            dn_lastframe = data[i - 1, ngroups - 2]
+            for j in range(data.shape[2]):
+                for k in range(data.shape[3]):
+                    slope, intercept = rscd_sub.ols_fit(
+                        data[i, 0:ngroups - 1, j, k])
+                    assert_allclose(dn_accumulated[j, k],
+                                    dn_lastframe[j, k] - intercept,
+                                    rtol=1e-6, atol=1e-3)
@@ -43,13 +43,14 @@ def do_correction( input_model, ref_model ):
     output_model = input_model.copy()
     groupdq = output_model.groupdq
 
-    # Check for subarray mode
+    # Check for subarray mode; the masks are copied, as they are modified
+    #   below and the reference model is read-only
     if ref_matches_sci( ref_model, input_model):
-        satmask = ref_model.data
-        dqmask = ref_model.dq
+        satmask = ref_model.data.copy()
+        dqmask = ref_model.dq.copy()
     else:
-        satmask = get_subarray( ref_model.data, input_model)
-        dqmask  = get_subarray( ref_model.dq, input_model)
+        satmask = get_subarray( ref_model.data, input_model).copy()
+        dqmask  = get_subarray( ref_model.dq, input_model).copy()
 
     # For pixels flagged in reference file as NO_SAT_CHECK, set the dq mask
     #   and saturation mask
@@ -14,7 +14,7 @@ class SaturationStep(Step):
     def process(self, input):
 
         # Open the input data model
-        with models.open(input) as input_model:
+        with datamodels.open(input) as input_model:
 
             # Get the name of the saturation reference file
             self.ref_name = self.get_reference_file(input_model, 'saturation')
@@ -28,14 +28,13 @@ class SaturationStep(Step):
                 result.meta.cal_step.saturation = 'SKIPPED'
                 return result
 
-            # Open the reference file data model
-            ref_model = models.SaturationModel(self.ref_name)
+            # Open the reference file data model and do the saturation check
+            with self.open_reference_model(self.ref_name,
+                                           datamodels.SaturationModel) \
+                    as ref_model:
+                sat = saturation.do_correction(input_model, ref_model)
 
-            # Do the saturation check
-            sat = saturation.do_correction(input_model, ref_model)
-
-            # Close the reference file and update the step status
-            ref_model.close()
+            # Update the step status
             sat.meta.cal_step.saturation = 'COMPLETE'
 
         return sat
@@ -132,8 +132,15 @@ class Polygon(Region):
         self._bbox = self._get_bounding_box()
         self._scan_line_range = \
                 list(range(self._bbox[1], self._bbox[3]+self._bbox[1]+1))
-        #constructs a Global Edge Table (GET) in bbox coordinates
-        self._GET = self._construct_ordered_GET()
+        # the Global Edge Table (GET) in bbox coordinates is constructed
+        # the first time it is needed by scan():
+        self._GET_cache = None
+
+    @property
+    def _GET(self):
+        if self._GET_cache is None:
+            self._GET_cache = self._construct_ordered_GET()
+        return self._GET_cache
 
     def _get_bounding_box(self):
         x = self._vertices[:,0].min()
@@ -238,14 +245,103 @@ class Polygon(Region):
                 continue
 
             for i, j in zip(xnew[::2], xnew[1::2]):
-                xstart = max(0, i + self._shiftx)
-                xend   = min(j + self._shiftx, nx - 1)
+                xstart = max(0, int(i) + self._shiftx)
+                xend   = min(int(j) + self._shiftx, nx - 1)
                 data[ysh][xstart:xend+1] = self._rid
 
             y += 1
 
         return data
 
+    def scan_vectorized(self, data):
+        """
+        Array-based equivalent of `scan`.
+
+        Instead of maintaining an Active Edge Table one scan line at a time,
+        the intersections of all scan lines with all edges are computed at
+        once with numpy, sorted along each scan line and the resulting spans
+        are filled in bulk. The filled pixels are exactly the same as those
+        filled by `scan`: an edge is active on scan lines
+        ``ymin <= y < ymax``, except on the top-most scan line of the
+        polygon, where the edges that end on that line are used, and
+        intersections are rounded up to the next integer.
+
+        Parameters
+        ----------
+        data : array
+            the mask array
+            it has all zeros initially, elements within a region are set to
+            the region's ID
+
+        """
+        (ny, nx) = data.shape
+
+        # non-horizontal edges:
+        start = self._vertices[:-1]
+        stop = self._vertices[1:]
+        keep = start[:, 1] != stop[:, 1]
+        sx = start[keep, 0]
+        sy = start[keep, 1]
+        ux = stop[keep, 0] - sx
+        uy = stop[keep, 1] - sy
+        eymin = np.minimum(sy, sy + uy)
+        eymax = np.maximum(sy, sy + uy)
+
+        # scan lines that fall inside the mask (see comments in the
+        # __init__ function for the polygon shifts):
+        ytop = self._scan_line_range[-1]
+        y = np.arange(self._scan_line_range[0], ytop + 1)
+        ysh = y + self._shifty
+        inside = (ysh >= 0) & (ysh < ny)
+        y = y[inside, np.newaxis]
+        ysh = ysh[inside]
+
+        if sx.size == 0 or ysh.size == 0:
+            return data
+
+        active = (eymin <= y) & (y < eymax)
+        active[y[:, 0] == ytop] = (eymax == ytop)
+
+        # intersections of the scan lines with the lines through the edges:
+        x = np.ceil(((y - sy) / uy) * ux + sx)
+        x = np.sort(np.where(active, x, np.inf), axis=1)
+
+        # pair up consecutive intersections along each scan line:
+        npairs = active.sum(axis=1) // 2
+        maxpairs = npairs.max()
+        if maxpairs == 0:
+            return data
+        xstart = x[:, 0:2 * maxpairs:2] + self._shiftx
+        xend = x[:, 1:2 * maxpairs:2] + self._shiftx
+        valid = np.arange(maxpairs) < npairs[:, np.newaxis]
+        xstart = np.where(valid, xstart, 0).astype(int)
+        xend = np.where(valid, xend, -1).astype(int)
+
+        # clip spans to the mask the same way slicing data[y][xstart:xend+1]
+        # does in scan():
+        xstart = np.minimum(np.maximum(xstart, 0), nx)
+        xstop = np.minimum(xend, nx - 1) + 1
+        xstop = np.where(xstop < 0, xstop + nx, xstop).clip(0, nx)
+        valid &= xstop > xstart
+
+        if not valid.any():
+            return data
+
+        # fill all spans at once using a running sum of span boundaries
+        # within the columns covered by the spans (scan lines inside the
+        # mask are consecutive rows):
+        x0 = xstart[valid].min()
+        width = xstop[valid].max() - x0
+        offsets = (width + 1) * np.arange(ysh.size)[:, np.newaxis] - x0
+        nbounds = (width + 1) * ysh.size
+        bounds = (np.bincount((xstart + offsets)[valid], minlength=nbounds) -
+                  np.bincount((xstop + offsets)[valid], minlength=nbounds))
+        bounds = bounds.reshape((ysh.size, width + 1))[:, :width]
+        fill = np.cumsum(bounds, axis=1, dtype=np.int32) > 0
+        data[ysh[0]:ysh[-1] + 1, x0:x0 + width][fill] = self._rid
+
+        return data
+
     def update_AET(self, y, AET):
         """
         Update the Active Edge Table (AET)
@@ -45,7 +45,8 @@ class SkyImage(object):
 
 
     def __init__(self, image, wcs_fwd, wcs_inv, pix_area=1.0, convf=1.0,
-                 mask=None, id=None, skystat=None, stepsize=None, meta=None):
+                 mask=None, id=None, skystat=None, stepsize=None, meta=None,
+                 fill_method='vectorized'):
         """ Initializes the SkyImage object.
 
         Parameters
@@ -103,7 +104,19 @@ class SkyImage(object):
             A dictionary of various items to be stored within the `SkyImage`
             object.
 
+        fill_method : {'vectorized', 'scanline'}, optional
+            Algorithm used to find the pixels inside overlap polygons:
+            :py:meth:`~jwst_pipeline.skymatch.region.Polygon.scan_vectorized`
+            (``'vectorized'``) or the original scan-line fill
+            :py:meth:`~jwst_pipeline.skymatch.region.Polygon.scan`
+            (``'scanline'``). Both select the same pixels.
+
         """
+        if fill_method not in ('vectorized', 'scanline'):
+            raise ValueError("Unsupported 'fill_method'. Valid values are: "
+                             "'vectorized' or 'scanline'")
+        self.fill_method = fill_method
+
         self.image = image
         self.convf = convf
         self.meta = meta
@@ -433,7 +446,10 @@ None, optional
                 poly_vert = list(zip(*[x, y]))
 
                 polygon = region.Polygon(True, poly_vert)
-                fill_mask = polygon.scan(fill_mask)
+                if self.fill_method == 'scanline':
+                    fill_mask = polygon.scan(fill_mask)
+                else:
+                    fill_mask = polygon.scan_vectorized(fill_mask)
 
             if self.mask is not None:
                 fill_mask &= self.mask
@@ -572,7 +588,8 @@ None, optional
             mask=None,
             id=self.id,
             stepsize=None,
-            meta=self.meta
+            meta=self.meta,
+            fill_method=self.fill_method
         )
         si.image = self.image
         si.mask = self.mask
@@ -12,6 +12,7 @@ from __future__ import division, print_function
 import os
 import sys
 import logging
+import multiprocessing
 from datetime import datetime
 
 # THIRD PARTY
@@ -36,7 +37,8 @@ log = logging.getLogger(__name__)
 log.setLevel(logging.DEBUG)
 
 
-def match(images, skymethod='global+match', match_down=True, subtract=False):
+def match(images, skymethod='global+match', match_down=True, subtract=False,
+          nproc=1):
     """
     A function to compute and/or "equalize" sky background in input images.
 
@@ -104,6 +106,10 @@ stsci_python_sphinxdocs_2.13/drizzlepac/astrodrizzle.html>`_ because it
     subtract : bool (Default = False)
         Subtract computed sky value from image data.
 
+    nproc : int (Default = 1)
+        Number of worker processes used to compute sky values in the
+        overlaps of pairs of images for the ``'match'`` algorithm.
+
 
     Raises
     ------
@@ -320,7 +326,8 @@ stsci_python_sphinxdocs_2.13/drizzlepac/astrodrizzle.html>`_\ .
                  "overlapping regions.")
 
         # find "optimum" sky changes:
-        sky_deltas = _find_optimum_sky_deltas(images, apply_sky=not subtract)
+        sky_deltas = _find_optimum_sky_deltas(images, apply_sky=not subtract,
+                                              nproc=nproc)
         sky_good = np.isfinite(sky_deltas)
 
         # match sky "Up" or "Down":
@@ -463,37 +470,169 @@ def _apply_sky(images, sky_deltas, do_global, do_skysub):
     #return A, W
 
 # bug workaround version:
-def _overlap_matrix(images, apply_sky=True):
-    #TODO: to improve performance, the nested loops could be parallelized
-    # since _calc_sky() here can be called independently from previous steps.
+def _overlap_matrix(images, apply_sky=True, nproc=1):
     ns = len(images)
     A = np.zeros((ns, ns), dtype=float)
     W = np.zeros((ns, ns), dtype=float)
 
-    for i in range(ns):
-        for j in range(i+1, ns):
-            s1, w1, area1 = images[i].calc_sky(
-                overlap=images[j], delta=apply_sky
-            )
+    # only pairs of images whose footprints may intersect need to have
+    # their sky computed. Since _calc_sky() can be called independently
+    # for each pair, these pairs can be processed in parallel:
+    pairs = _overlap_candidates(images)
+    log.debug("Computing sky in {:d} of {:d} pairs of images with possibly "
+              "overlapping footprints.".format(len(pairs), ns * (ns - 1) // 2))
 
-            s2, w2, area2 = images[j].calc_sky(
-                overlap=images[i], delta=apply_sky
-            )
+    if nproc > 1 and len(pairs) > 1:
+        skies = _pair_skies_parallel(images, pairs, apply_sky, nproc)
+    else:
+        skies = [_pair_sky(images, i, j, apply_sky) for i, j in pairs]
 
-            if area1 == 0.0 or area2 == 0.0 or s1 is None or s2 is None:
-                continue
+    for (i, j), (s1, w1, area1, s2, w2, area2) in zip(pairs, skies):
+        if area1 == 0.0 or area2 == 0.0 or s1 is None or s2 is None:
+            continue
 
-            A[j,i] = s1
-            W[j,i] = w1
-            A[i,j] = s2
-            W[i,j] = w2
+        A[j,i] = s1
+        W[j,i] = w1
+        A[i,j] = s2
+        W[i,j] = w2
 
     return A, W
 
 
-def _find_optimum_sky_deltas(images, apply_sky=True):
+def _pair_sky(images, i, j, apply_sky):
+    s1, w1, area1 = images[i].calc_sky(
+        overlap=images[j], delta=apply_sky
+    )
+
+    s2, w2, area2 = images[j].calc_sky(
+        overlap=images[i], delta=apply_sky
+    )
+
+    return (s1, w1, area1, s2, w2, area2)
+
+
+def _footprint_caps(images):
+    """ Compute spherical caps that enclose the footprints of images.
+
+    Parameters
+    ----------
+    images : list of SkyImage or SkyGroup
+        Images whose footprints should be bounded.
+
+    Returns
+    -------
+    centers : numpy.ndarray
+        An ``(N, 3)`` array of unit vectors pointing to the centers
+        of the caps.
+
+    radii : numpy.ndarray
+        Angular radii (in radians) of the caps. The radius of images
+        with empty footprints is ``-inf`` and the radius of footprints
+        too large to be bound by a cap smaller than a hemisphere is ``pi``.
+
+    """
+    ns = len(images)
+    centers = np.zeros((ns, 3), dtype=float)
+    radii = np.full(ns, -np.inf, dtype=float)
+
+    for k, img in enumerate(images):
+        ra = [np.asarray(r, dtype=float).ravel() for r, d in img.radec]
+        dec = [np.asarray(d, dtype=float).ravel() for r, d in img.radec]
+        if not ra or sum(r.size for r in ra) == 0:
+            continue
+
+        ra = np.deg2rad(np.concatenate(ra))
+        dec = np.deg2rad(np.concatenate(dec))
+        cosd = np.cos(dec)
+        xyz = np.column_stack([cosd * np.cos(ra), cosd * np.sin(ra),
+                               np.sin(dec)])
+
+        center = xyz.sum(axis=0)
+        norm = np.sqrt(np.dot(center, center))
+        if norm < 1.0e-12 * len(xyz):
+            radii[k] = np.pi
+            continue
+        center /= norm
+
+        radius = np.amax(np.arccos(np.clip(np.dot(xyz, center), -1.0, 1.0)))
+        centers[k] = center
+        radii[k] = radius if radius < 0.5 * np.pi else np.pi
+
+    return centers, radii
+
+
+def _overlap_candidates(images, tol=1.0e-8):
+    """ Find pairs of images whose footprints may intersect.
+
+    Returns a list of ``(i, j)`` pairs with ``i < j`` in the same order
+    in which a nested loop over the images would have visited them. Pairs
+    whose bounding caps are farther apart than the sum of the cap radii
+    (plus `tol` radians) cannot overlap and are left out.
+
+    """
+    ns = len(images)
+    if ns < 2:
+        return []
+
+    centers, radii = _footprint_caps(images)
+    sep = np.arccos(np.clip(np.dot(centers, centers.T), -1.0, 1.0))
+    maybe = sep <= radii[:, np.newaxis] + radii[np.newaxis, :] + tol
+    i, j = np.nonzero(np.triu(maybe, k=1))
+
+    return list(zip(i.tolist(), j.tolist()))
+
+
+# Images shared with the worker processes of _pair_skies_parallel():
+_pool_images = None
+_pool_apply_sky = True
+
+
+def _pool_pair_sky(pair):
+    return _pair_sky(_pool_images, pair[0], pair[1], _pool_apply_sky)
+
+
+def _pair_skies_parallel(images, pairs, apply_sky, nproc):
+    """ Compute sky in pairs of images using `nproc` worker processes.
+
+    Worker processes are forked so that they inherit the images instead
+    of having them pickled. When processes cannot be forked, sky is
+    computed serially. Results are returned in the order of `pairs`.
+
+    """
+    global _pool_images, _pool_apply_sky
+
+    try:
+        if sys.version_info[0] >= 3:
+            ctx = multiprocessing.get_context('fork')
+        elif hasattr(os, 'fork'):
+            ctx = multiprocessing
+        else:
+            raise ValueError('fork is not available')
+    except ValueError:
+        log.warning("Cannot fork worker processes. Sky in overlapping "
+                    "regions will be computed serially.")
+        return [_pair_sky(images, i, j, apply_sky) for i, j in pairs]
+
+    nproc = min(nproc, len(pairs))
+    chunksize = max(1, len(pairs) // (4 * nproc))
+
+    _pool_images = images
+    _pool_apply_sky = apply_sky
+    pool = ctx.Pool(processes=nproc)
+    try:
+        skies = pool.map(_pool_pair_sky, pairs, chunksize=chunksize)
+    finally:
+        pool.close()
+        pool.join()
+        _pool_images = None
+        _pool_apply_sky = True
+
+    return skies
+
+
+def _find_optimum_sky_deltas(images, apply_sky=True, nproc=1):
     ns = len(images)
-    A, W = _overlap_matrix(images, apply_sky=apply_sky)
+    A, W = _overlap_matrix(images, apply_sky=apply_sky, nproc=nproc)
 
     def is_valid(i, j):
         return (W[i,j] > 0 and W[j,i] > 0)
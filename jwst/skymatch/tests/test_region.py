@@ -0,0 +1,67 @@
+from __future__ import absolute_import, division
+
+import numpy as np
+from numpy.testing import assert_array_equal
+
+from jwst.skymatch import region
+
+SHAPE = (40, 50)
+
+POLYGONS = [
+    # convex
+    [(5, 5), (30, 8), (20, 30), (5, 5)],
+    [(10.4, 10.6), (35.5, 10.5), (35.5, 25.2), (10.4, 25.2), (10.4, 10.6)],
+    # concave
+    [(5, 5), (40, 5), (40, 15), (15, 15), (15, 35), (5, 35), (5, 5)],
+    [(25, 2), (30, 15), (45, 18), (32, 24), (35, 38), (25, 28), (12, 36),
+     (17, 22), (4, 14), (20, 14), (25, 2)],
+    # clockwise vertices
+    [(5, 5), (20, 30), (30, 8), (5, 5)],
+    # edges and vertices on the image boundary
+    [(0, 0), (49, 0), (49, 39), (0, 39), (0, 0)],
+    [(0, 10), (25, 0), (49, 20), (25, 39), (0, 10)],
+    [(0, 0), (49, 39), (0, 39), (20, 20), (0, 0)],
+    # vertices off the image
+    [(-10, -5), (30, -8), (60, 20), (25, 50), (-5, 30), (-10, -5)],
+    [(-20, 10), (70, 12), (71, 30), (-20, 28), (-20, 10)],
+    [(20, -30), (45, 60), (30, 10), (5, 60), (20, -30)],
+    [(-30, -30), (-5, -30), (-5, -2), (-30, -2), (-30, -30)],
+    [(60, 45), (80, 45), (80, 60), (60, 45)],
+]
+
+
+def random_polygon(rng, nvert):
+    """A random star-shaped (in general concave) polygon."""
+    center = rng.uniform(-10, 60, 2)
+    angles = np.sort(rng.uniform(0, 2 * np.pi, nvert))
+    radii = rng.uniform(2, 40, nvert)
+    x = center[0] + radii * np.cos(angles)
+    y = center[1] + radii * np.sin(angles)
+    vertices = list(zip(x, y))
+    return vertices + vertices[:1]
+
+
+def check_same_fill(vertices):
+    for rid, dtype in ((1, np.int32), (True, bool)):
+        polygon = region.Polygon(rid, vertices)
+        expected = polygon.scan(np.zeros(SHAPE, dtype=dtype))
+        mask = polygon.scan_vectorized(np.zeros(SHAPE, dtype=dtype))
+        assert_array_equal(mask, expected)
+
+
+def test_scan_vectorized():
+    for vertices in POLYGONS:
+        check_same_fill(vertices)
+
+
+def test_scan_vectorized_random():
+    rng = np.random.RandomState(12)
+    for i in range(100):
+        check_same_fill(random_polygon(rng, rng.randint(3, 12)))
+
+
+def test_scan_vectorized_fills():
+    # the comparison above should not be between two empty masks
+    polygon = region.Polygon(1, POLYGONS[5])
+    mask = polygon.scan_vectorized(np.zeros(SHAPE, dtype=np.int32))
+    assert_array_equal(mask, 1)
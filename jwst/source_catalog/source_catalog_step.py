@@ -2,7 +2,6 @@
 
 from jwst.stpipe import Step, cmdline
 from jwst.datamodels import DrizProductModel
-from . import source_catalog
 
 
 class SourceCatalogStep(Step):
@@ -27,6 +26,7 @@ class SourceCatalogStep(Step):
     """
 
     def process(self, input):
+        from . import source_catalog
 
         catalog_format = self.catalog_format
         kernel_fwhm = self.kernel_fwhm
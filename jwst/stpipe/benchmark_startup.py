@@ -0,0 +1,94 @@
+#! /usr/bin/env python
+#
+# benchmark_startup.py - time the startup of short-lived jwst processes:
+#     `import jwst`, the import of a step class, and `strun <step> --help`.
+#
+# Each command is run in a new Python process a number of times, and the
+# shortest and median wall clock times are printed.  The modules that each
+# import brings in are counted too, which shows what a lazily imported
+# subpackage saves.
+#
+# linux usage example:
+#  ./benchmark_startup.py jwst.jump.JumpStep 10
+#  ... which times 10 runs of each command for the jump step.  The
+#  defaults are jwst.dq_init.DQInitStep and 5 runs.
+
+from __future__ import division, print_function
+
+import os
+import subprocess
+import sys
+import time
+from distutils.spawn import find_executable
+
+COUNT_MODULES = "import sys; {0}; print(len(sys.modules))"
+
+
+def time_command(args, nrepeat):
+    """
+    Run the command `args` `nrepeat` times and return the shortest and
+    median wall clock times.
+    """
+    times = []
+    with open(os.devnull, 'w') as devnull:
+        for i in range(nrepeat):
+            tstart = time.time()
+            subprocess.check_call(args, stdout=devnull, stderr=devnull)
+            times.append(time.time() - tstart)
+    times.sort()
+    return times[0], times[len(times) // 2]
+
+
+def count_modules(statement):
+    """
+    Return the number of modules loaded after running `statement` in a
+    new Python process.
+    """
+    output = subprocess.check_output(
+        [sys.executable, '-c', COUNT_MODULES.format(statement)])
+    return int(output.split()[-1])
+
+
+def benchmark(step_class, nrepeat):
+    """
+    Time `import jwst`, the import of `step_class` and `strun step_class
+    --help`, and print the times and the number of modules loaded.
+    """
+    module_name, _, class_name = step_class.rpartition('.')
+    imports = [
+        ('python (no import)', 'pass'),
+        ('import jwst', 'import jwst'),
+        ('import jwst.stpipe', 'import jwst.stpipe'),
+        ('import ' + class_name,
+         'from {0} import {1}'.format(module_name, class_name)),
+    ]
+    for label, statement in imports:
+        tmin, tmedian = time_command([sys.executable, '-c', statement],
+                                     nrepeat)
+        print('%-40s %8.3f s (median %8.3f s)  %5d modules' %
+              (label, tmin, tmedian, count_modules(statement)))
+
+    strun = find_executable('strun')
+    if strun is None:
+        print('strun not found in PATH')
+        return
+    tmin, tmedian = time_command([sys.executable, strun, step_class,
+                                  '--help'], nrepeat)
+    print('%-40s %8.3f s (median %8.3f s)' %
+          ('strun %s --help' % class_name, tmin, tmedian))
+
+
+if __name__ == "__main__":
+    """Get the step class and the number of runs, and run the benchmark.
+    """
+    usage = "usage:  ./benchmark_startup.py [step_class [nrepeat]]"
+
+    args = sys.argv[1:]
+    if len(args) > 2:
+        print(usage)
+        sys.exit(1)
+
+    step_class = args[0] if len(args) > 0 else 'jwst.dq_init.DQInitStep'
+    nrepeat = int(args[1]) if len(args) > 1 else 5
+
+    benchmark(step_class, nrepeat)
@@ -30,15 +30,26 @@
 A client library for CRDS
 """
 import contextlib
+import hashlib
+import json
+import os
 from os.path import dirname, join
 import re
+import tempfile
 from astropy.extern import six
 
-import gc
-
 import crds
 from crds import log
 
+# Environment variable naming a JSON file used to keep the best
+# references across runs.
+BESTREFS_CACHE_ENV = 'JWST_BESTREFS_CACHE'
+
+# { (matching key hash, context) : { filetype : filepath or "N/A" } }
+_bestrefs_cache = {}
+_bestrefs_cache_stats = {'hits': 0, 'misses': 0}
+_disk_cache_loaded = set()
+
 def _flatten_dict(nested):
     def flatten(root, path, output):
         for key, val in root.items():
@@ -51,6 +62,110 @@ def _flatten_dict(nested):
     flatten(nested, [], output)
     return output
 
+def _get_data_dict(input_file):
+    """Return the flat dictionary of data model parameters of `input_file`
+    without reading any of its arrays.
+    """
+    from jwst import datamodels
+
+    if isinstance(input_file, datamodels.DataModel):
+        return input_file.to_flat_dict(include_arrays=False)
+    elif isinstance(input_file, six.string_types):
+        with datamodels.open(input_file, lazy_load=True) as dm:
+            return dm.to_flat_dict(include_arrays=False)
+    else:
+        return _flatten_dict(input_file)
+
+def _required_parkeys(data_dict, context):
+    """Return the set of the lower case names of the parameters which the
+    mappings of `context` select reference files on, for the instrument of
+    `data_dict`, or None if they cannot be determined.
+    """
+    try:
+        pmap = crds.get_cached_mapping(context)
+        imap = pmap.get_imap(pmap.get_instrument(data_dict))
+        parkeys = list(imap.get_required_parkeys()) + [pmap.instrument_key]
+    except Exception:
+        # e.g. no instrument in data_dict; the caller hashes everything
+        return None
+    return set(parkey.lower() for parkey in parkeys)
+
+def _matching_key(data_dict, context):
+    """Return a hash of the parameters of `data_dict` which CRDS matches
+    reference files on under `context`.
+
+    Keywords which the rmaps do not match on (cal_step, ref_file, history,
+    date, ...) are rewritten by the pipeline steps and do not change the
+    key.  When the matching parameters cannot be determined, `data_dict`
+    is hashed in full.
+    """
+    parkeys = _required_parkeys(data_dict, context)
+    items = sorted((key, repr(val)) for (key, val) in data_dict.items()
+                   if parkeys is None or key.lower() in parkeys)
+    return hashlib.sha1(repr(items).encode('utf-8')).hexdigest()
+
+def _disk_cache_path():
+    path = os.environ.get(BESTREFS_CACHE_ENV, '').strip()
+    return os.path.expanduser(path) if path else None
+
+def _disk_cache_name(key):
+    return '{0}:{1}'.format(*key)
+
+def _read_disk_cache(path):
+    try:
+        with open(path) as fd:
+            return json.load(fd)
+    except (IOError, OSError, ValueError):
+        return {}
+
+def _load_disk_cache(key):
+    """Fill the in-memory cache entry for `key` from the on-disk cache,
+    dropping any reference file which is no longer in the CRDS cache.
+    """
+    path = _disk_cache_path()
+    if path is None or (path, key) in _disk_cache_loaded:
+        return
+    _disk_cache_loaded.add((path, key))
+    refs = _read_disk_cache(path).get(_disk_cache_name(key), {})
+    cached = _bestrefs_cache.setdefault(key, {})
+    for filetype, filepath in refs.items():
+        if filepath == "N/A" or os.path.exists(filepath):
+            cached.setdefault(filetype, filepath)
+
+def _save_disk_cache(key):
+    """Merge the in-memory cache entry for `key` into the on-disk cache."""
+    path = _disk_cache_path()
+    if path is None:
+        return
+    disk = _read_disk_cache(path)
+    disk.setdefault(_disk_cache_name(key), {}).update(_bestrefs_cache[key])
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=dirname(os.path.abspath(path)))
+        with os.fdopen(fd, 'w') as tmp:
+            json.dump(disk, tmp, indent=1, sort_keys=True)
+        os.rename(tmp_path, path)
+    except (IOError, OSError) as exc:
+        log.warning("Cannot update best references cache", repr(path), ":", str(exc))
+
+def clear_bestrefs_cache():
+    """Forget all best references determined so far in this process.
+
+    The on-disk cache named by $JWST_BESTREFS_CACHE, if any, is left alone.
+    """
+    _bestrefs_cache.clear()
+    _disk_cache_loaded.clear()
+    _bestrefs_cache_stats['hits'] = 0
+    _bestrefs_cache_stats['misses'] = 0
+
+def bestrefs_cache_info():
+    """Return a dictionary with the number of cache ``hits`` and ``misses``
+    since the cache was last cleared, and the number of exposure/context
+    combinations currently cached (``size``).
+    """
+    info = dict(_bestrefs_cache_stats)
+    info['size'] = len(_bestrefs_cache)
+    return info
+
 def get_multiple_reference_paths(input_file, reference_file_types):
     """Aligns JWST pipeline requirements with CRDS library top
     level interfaces.
@@ -63,36 +178,42 @@ def get_multiple_reference_paths(input_file, reference_file_types):
 
     2. It verifies than any true filepath (not N/A) returned is openable.
 
+    3. It memoizes the results per set of matching parameters and CRDS
+    context, so steps run on the same exposure only determine each
+    reference once.  If $JWST_BESTREFS_CACHE names a file, the results
+    are also kept there for later runs.
+
     Returns { filetype : filepath or "N/A", ... }
     """
-    from jwst import datamodels
-
-    gc.collect()
-
     if not reference_file_types:   # [] interpreted as *all types*.
         return {}
 
-    if six.PY2:
-        model_types = (str, unicode, models.DataModel)
-    else:
-        model_types = (str, models.DataModel)
-    if isinstance(input_file, model_types):
-        with models.open(input_file) as dm:
-            data_dict = dm.to_flat_dict(include_arrays=False)
-    else:
-        data_dict = _flatten_dict(input_file)
+    data_dict = _get_data_dict(input_file)
+    context = get_context_used()
+    key = (_matching_key(data_dict, context), context)
 
-    gc.collect()
+    _load_disk_cache(key)
+    cached = _bestrefs_cache.setdefault(key, {})
+    missing = [filetype for filetype in reference_file_types
+               if filetype not in cached]
+    _bestrefs_cache_stats['hits'] += len(reference_file_types) - len(missing)
+    _bestrefs_cache_stats['misses'] += len(missing)
 
-    try:
-        bestrefs = crds.getreferences(data_dict, reftypes=reference_file_types, observatory="jwst")
-    except crds.CrdsBadRulesError as exc:
-        raise crds.CrdsBadRulesError(str(exc))
-    except crds.CrdsBadReferenceError as exc:
-        raise crds.CrdsBadReferenceError(str(exc))
-
-    refpaths = { filetype : filepath if "N/A" not in filepath.upper() else "N/A"
-                 for (filetype, filepath) in bestrefs.items() }
+    if missing:
+        try:
+            bestrefs = crds.getreferences(data_dict, reftypes=missing, observatory="jwst")
+        except crds.CrdsBadRulesError as exc:
+            raise crds.CrdsBadRulesError(str(exc))
+        except crds.CrdsBadReferenceError as exc:
+            raise crds.CrdsBadReferenceError(str(exc))
+
+        cached.update(
+            { filetype : filepath if "N/A" not in filepath.upper() else "N/A"
+              for (filetype, filepath) in bestrefs.items() })
+        _save_disk_cache(key)
+
+    refpaths = { filetype : cached[filetype]
+                 for filetype in reference_file_types if filetype in cached }
 
     return refpaths
 
@@ -0,0 +1,187 @@
+"""
+A bounded pool of opened reference file models.
+
+Reference files are read-only inputs that are very often the same from
+one exposure to the next, so a long-running process can keep the models
+it has opened and hand them out again instead of parsing the files
+every time.  Models are keyed by the absolute path and modification time
+of their file, so a reference file which is replaced on disk is opened
+afresh.  The pool is bounded by the total size of the arrays it holds and
+evicts the least recently used models first.
+"""
+from __future__ import absolute_import, division, print_function
+
+from collections import OrderedDict
+import os
+import threading
+
+import numpy as np
+
+# Environment variable giving the size of the default pool in bytes
+POOL_SIZE_ENV = 'JWST_REFERENCE_POOL_SIZE'
+
+DEFAULT_POOL_SIZE = 1024 ** 3
+
+
+def _model_nbytes(tree):
+    """Return the total size of the arrays in a model tree."""
+    if isinstance(tree, dict):
+        return sum(_model_nbytes(val) for val in tree.values())
+    elif isinstance(tree, (list, tuple)):
+        return sum(_model_nbytes(val) for val in tree)
+    elif isinstance(tree, np.ndarray):
+        return tree.nbytes
+    return 0
+
+
+def _set_read_only(tree):
+    """Make all of the arrays in a model tree read-only."""
+    if isinstance(tree, dict):
+        for val in tree.values():
+            _set_read_only(val)
+    elif isinstance(tree, (list, tuple)):
+        for val in tree:
+            _set_read_only(val)
+    elif isinstance(tree, np.ndarray):
+        tree.flags.writeable = False
+
+
+class ReferenceModelPool(object):
+    """
+    A least recently used pool of opened, read-only reference models.
+
+    Parameters
+    ----------
+    max_bytes : int
+        The maximum total size of the arrays of the pooled models.  A
+        model larger than this is opened but not kept.  0 disables
+        pooling.
+    """
+    def __init__(self, max_bytes=DEFAULT_POOL_SIZE):
+        self.max_bytes = max_bytes
+        self._models = OrderedDict()
+        self._nbytes = 0
+        self._borrowed = {}
+        self._evicted = set()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._models)
+
+    @property
+    def nbytes(self):
+        """The total size of the arrays of the pooled models."""
+        return self._nbytes
+
+    def acquire(self, filename, model_class=None):
+        """
+        Return the read-only model for reference file `filename`, opening
+        it if it is not in the pool.  Every model acquired must be given
+        back with `release`.
+
+        The model is opened as an instance of `model_class`, or with
+        `datamodels.open` if it is None.
+        """
+        from jwst import datamodels
+
+        path = os.path.abspath(filename)
+        key = (path, os.path.getmtime(path), model_class)
+        with self._lock:
+            entry = self._models.pop(key, None)
+            if entry is not None:
+                self._models[key] = entry
+                self.hits += 1
+                model = entry[0]
+                self._borrowed[id(model)] = self._borrowed.get(id(model), 0) + 1
+                return model
+            self.misses += 1
+
+        if model_class is None:
+            model = datamodels.open(path)
+        else:
+            model = model_class(path)
+        _set_read_only(model._instance)
+        nbytes = _model_nbytes(model._instance)
+
+        with self._lock:
+            self._borrowed[id(model)] = self._borrowed.get(id(model), 0) + 1
+            if nbytes > self.max_bytes:
+                self._evicted.add(id(model))
+                return model
+            old = self._models.pop(key, None)
+            if old is not None:
+                self._discard(*old)
+            self._models[key] = (model, nbytes)
+            self._nbytes += nbytes
+            self._shrink(self.max_bytes)
+        return model
+
+    def release(self, model):
+        """
+        Give back a model obtained from `acquire`.  Models which have been
+        evicted from the pool while in use are closed.
+        """
+        with self._lock:
+            count = self._borrowed.get(id(model), 0) - 1
+            if count > 0:
+                self._borrowed[id(model)] = count
+                return
+            self._borrowed.pop(id(model), None)
+            if id(model) in self._evicted:
+                self._evicted.discard(id(model))
+                model.close()
+
+    def resize(self, max_bytes):
+        """Change the maximum size of the pool, evicting models if needed."""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._shrink(max_bytes)
+
+    def clear(self):
+        """Evict all of the models in the pool."""
+        with self._lock:
+            self._shrink(0)
+            self.hits = 0
+            self.misses = 0
+
+    def _shrink(self, max_bytes):
+        while self._models and self._nbytes > max_bytes:
+            _key, (model, nbytes) = self._models.popitem(last=False)
+            self._discard(model, nbytes)
+        if not self._models:
+            self._nbytes = 0
+
+    def _discard(self, model, nbytes):
+        self._nbytes -= nbytes
+        if id(model) in self._borrowed:
+            self._evicted.add(id(model))
+        else:
+            model.close()
+
+
+def _default_pool_size():
+    try:
+        return int(os.environ.get(POOL_SIZE_ENV, DEFAULT_POOL_SIZE))
+    except ValueError:
+        return DEFAULT_POOL_SIZE
+
+
+_pool = None
+
+
+def get_pool():
+    """
+    Return the process-wide reference model pool.  Its size in bytes is
+    taken from $JWST_REFERENCE_POOL_SIZE, or 1 GB if that is not set.
+    """
+    global _pool
+    if _pool is None:
+        _pool = ReferenceModelPool(_default_pool_size())
+    return _pool
+
+
+def set_pool_size(max_bytes):
+    """Set the maximum size in bytes of the process-wide pool."""
+    get_pool().resize(max_bytes)
@@ -46,6 +46,7 @@ except ImportError:
 from . import config_parser
 from . import crds_client
 from . import log
+from . import reference_pool
 from . import utilities
 
 
@@ -381,6 +382,12 @@ class Step(object):
             else:
                 results = result
 
+            # An input given up with DataModel.transfer() is only handed
+            # over within this step; see also the input, in finally below
+            for model in results:
+                if isinstance(model, datamodels.DataModel):
+                    model._transferred = False
+
             if len(self._reference_files_used) and not self._is_association_file(args[0]):
                 for result in results:
                     if isinstance(result, models.DataModel):
@@ -418,6 +425,10 @@ class Step(object):
             self.log.info(
                 'Step {0} done'.format(self.name))
         finally:
+            # Even if the step fails, a transferred input must not stay
+            # transferred for later uses of it
+            if len(args) and isinstance(args[0], datamodels.DataModel):
+                args[0]._transferred = False
             log.delegator.log = orig_log
 
         return result
@@ -481,8 +492,12 @@ class Step(object):
             return
         if len(self.reference_file_types):
             from jwst import datamodels
+            if isinstance(input_file, datamodels.DataModel):
+                self._precache_reference_files_impl(input_file)
+                return
             try:
-                model = models.open(input_file)
+                # Only the metadata is needed to select reference files
+                model = datamodels.open(input_file, lazy_load=True)
             except (ValueError, TypeError, IOError):
                 self.log.info(
                     'First argument {0} does not appear to be a '
@@ -580,8 +595,8 @@ class Step(object):
                 (reference_file_type, hdr_name))
         return crds_client.check_reference_open(reference_name)
 
-    @contextlib.contextmanager
-    def get_reference_file_model(self, input_file, reference_file_type):
+    def get_reference_file_model(self, input_file, reference_file_type,
+                                 model_class=None):
         """
         Get a reference file from CRDS as a jwst_lib.models.ModelBase
         object.  If the configuration file or commandline parameters
@@ -600,17 +615,48 @@ class Step(object):
             retrieve a flat field reference file, this would be
             'flat_field'.
 
+        model_class : jwst_lib.models.ModelBase subclass, optional
+            The class of the model to open the reference file as.  By
+            default, the class is chosen by `datamodels.open`.
+
         Returns
         -------
-        reference_file_model : jwst_lib.models.ModelBase instance
-            A model to access the contents of the reference file.
+        reference_file_model : context manager
+            A context manager giving a read-only model to access the
+            contents of the reference file; see `open_reference_model`.
         """
-        from jwst import datamodels
+        filename = self.get_reference_file(input_file, reference_file_type)
+        return self.open_reference_model(filename, model_class)
 
-        filename = self.get_reference_file(input, reference_file_type)
-        with models.open(filename) as model:
+    @contextlib.contextmanager
+    def open_reference_model(self, filename, model_class=None):
+        """
+        Open a reference file, as returned by `get_reference_file`, as a
+        jwst_lib.models.ModelBase object, for use in a ``with`` block.
+
+        Parameters
+        ----------
+        filename : str
+            The path to the reference file.
+
+        model_class : jwst_lib.models.ModelBase subclass, optional
+            The class of the model to open the reference file as.  By
+            default, the class is chosen by `datamodels.open`.
+
+        Returns
+        -------
+        reference_file_model : jwst_lib.models.ModelBase instance
+            A read-only model to access the contents of the reference
+            file.  The model is shared through the process-wide
+            `reference_pool`, so it must not be modified or kept after
+            the ``with`` block exits.
+        """
+        pool = reference_pool.get_pool()
+        model = pool.acquire(filename, model_class)
+        try:
             yield model
-        gc.collect()
+        finally:
+            pool.release(model)
 
     def set_input_filename(self, path):
         """
@@ -56,3 +56,15 @@ class SaveStep(Step):
         self.save_model(model, 'processed')
 
         return model
+
+
+class FailStep(Step):
+    """
+    This is a step that always fails.
+    """
+
+    spec = """
+    """
+
+    def process(self, *args):
+        raise RuntimeError("FailStep always fails")
@@ -147,3 +147,47 @@ def test_crds_flatten():
     flat = crds_client._flatten_dict(json)
     print(flat)
     assert flat['meta.instrument.name'] == 'MIRI'
+
+
+def test_crds_matching_key():
+    """Only the matching parameters go into the best references cache key."""
+    from jwst.stpipe import crds_client
+
+    context = crds_client.get_context_used()
+    header = {
+        'meta.date': '2014-07-22T15:53:19.893683',
+        'meta.filename': 'crds.fits',
+        'meta.cal_step.dq_init': 'COMPLETE',
+        'meta.instrument.detector': 'NRCA1',
+        'meta.instrument.name': 'NIRCAM',
+        'meta.observation.date': '2012-04-22',
+        }
+    key = crds_client._matching_key(header, context)
+
+    stepped = dict(header)
+    stepped['meta.date'] = '2016-01-01T00:00:00'
+    stepped['meta.filename'] = 'crds_dq_init.fits'
+    stepped['meta.cal_step.saturation'] = 'COMPLETE'
+    assert crds_client._matching_key(stepped, context) == key
+
+    other = dict(header)
+    other['meta.instrument.detector'] = 'NRCA2'
+    assert crds_client._matching_key(other, context) != key
+
+    # Without an instrument, all parameters are matched
+    assert (crds_client._matching_key({'meta.date': '2012-04-22'}, context) !=
+            crds_client._matching_key({'meta.date': '2016-01-01'}, context))
+
+
+def test_crds_bestrefs_cache():
+    """Best references are determined once per exposure and context."""
+    from jwst.stpipe import crds_client
+
+    crds_client.clear_bestrefs_cache()
+    _run_flat_fetch_on_dataset('data/crds.fits')
+    assert crds_client.bestrefs_cache_info()['misses'] == 1
+    _run_flat_fetch_on_dataset('data/crds.fits')
+    info = crds_client.bestrefs_cache_info()
+    assert info['misses'] == 1
+    assert info['hits'] > 0
+    assert info['size'] == 1
@@ -0,0 +1,79 @@
+from __future__ import absolute_import, print_function
+
+from os.path import join, dirname
+import shutil
+import tempfile
+
+import numpy as np
+from nose.tools import raises
+
+from jwst import datamodels
+from jwst.stpipe.reference_pool import ReferenceModelPool
+
+FLAT = join(dirname(__file__), 'data', 'flat.fits')
+
+
+def test_pool_reuses_models():
+    pool = ReferenceModelPool()
+    model = pool.acquire(FLAT)
+    pool.release(model)
+    assert pool.acquire(FLAT) is model
+    pool.release(model)
+    assert pool.hits == 1
+    assert pool.misses == 1
+    assert len(pool) == 1
+    assert pool.nbytes > 0
+
+
+def test_pool_model_class():
+    pool = ReferenceModelPool()
+    model = pool.acquire(FLAT, datamodels.FlatModel)
+    pool.release(model)
+    assert isinstance(model, datamodels.FlatModel)
+    assert pool.acquire(FLAT, datamodels.FlatModel) is model
+    pool.release(model)
+
+    # Models of another class are pooled separately
+    other = pool.acquire(FLAT)
+    pool.release(other)
+    assert other is not model
+    assert len(pool) == 2
+
+
+@raises(ValueError)
+def test_pool_models_read_only():
+    pool = ReferenceModelPool()
+    model = pool.acquire(FLAT)
+    try:
+        model.data[0, 0] = 1.0
+    finally:
+        pool.release(model)
+
+
+def test_pool_bounded():
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        paths = []
+        for i in range(3):
+            paths.append(join(tmp_dir, 'flat{0}.fits'.format(i)))
+            shutil.copy(FLAT, paths[-1])
+
+        pool = ReferenceModelPool()
+        model = pool.acquire(paths[0])
+        pool.release(model)
+        pool.resize(pool.nbytes * 2)
+
+        for path in paths:
+            pool.release(pool.acquire(path))
+        assert len(pool) == 2
+        assert pool.nbytes <= pool.max_bytes
+
+        # The least recently used model was evicted
+        pool.release(pool.acquire(paths[0]))
+        assert pool.misses == 4
+
+        pool.clear()
+        assert len(pool) == 0
+        assert pool.nbytes == 0
+    finally:
+        shutil.rmtree(tmp_dir)
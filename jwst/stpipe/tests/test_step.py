@@ -230,3 +230,17 @@ def test_save_model():
     Step.from_cmdline(args)
 
     assert isfile(join(tempdir, 'flat_processed.fits'))
+
+
+def test_transfer_cleared_on_failure():
+    from jwst.datamodels import ImageModel
+    from .steps import FailStep
+
+    with ImageModel((10, 10)) as model:
+        try:
+            FailStep().run(model.transfer())
+        except RuntimeError:
+            pass
+        else:
+            assert False, "FailStep did not fail"
+        assert not model._transferred
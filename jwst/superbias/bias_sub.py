@@ -33,14 +33,20 @@ def do_correction(input_model, bias_model):
 
     """
 
-    # Replace NaN's in the superbias with zeros
-    bias_model.data[np.isnan(bias_model.data)] = 0.0
-
     # Check for subarray mode and extract subarray from the
     # bias reference data if necessary
     if not ref_matches_sci(bias_model, input_model):
         bias_model = get_subarray(bias_model, input_model)
-       
+
+    # Replace NaN's in the superbias with zeros, in a new model, as the
+    # reference model is read-only
+    nan_mask = np.isnan(bias_model.data)
+    if nan_mask.any():
+        bias_model = datamodels.SuperBiasModel(
+            data=np.where(nan_mask, 0.0, bias_model.data).astype(
+                bias_model.data.dtype),
+            err=bias_model.err, dq=bias_model.dq)
+
     # Subtract the bias ref image from the science data
     output_model = subtract_bias(input_model, bias_model)
 
@@ -110,7 +116,7 @@ def get_subarray(ref_model, sci_model):
     sub_dq = ref_model.dq[ystart:ystop, xstart:xstop]
 
     # Create the sliced model
-    sub_model = models.SuperBiasModel(data=sub_data, err=sub_err, dq=sub_dq)
+    sub_model = datamodels.SuperBiasModel(data=sub_data, err=sub_err, dq=sub_dq)
 
     # Return the sliced reference model
     return sub_model
@@ -18,7 +18,7 @@ class SuperBiasStep(Step):
     def process(self, input):
 
         # Open the input data model
-        with models.open(input) as input_model:
+        with datamodels.open(input) as input_model:
 
             # Get the name of the superbias reference file to use
             self.bias_name = self.get_reference_file(input_model, 'superbias')
@@ -32,15 +32,14 @@ class SuperBiasStep(Step):
                 result.meta.cal_step.superbias = 'SKIPPED'
                 return result
 
-            # Open the superbias ref file data model
-            bias_model = models.SuperBiasModel(self.bias_name)
+            # Open the superbias ref file data model and do the bias
+            # subtraction
+            with self.open_reference_model(self.bias_name,
+                                           datamodels.SuperBiasModel) \
+                    as bias_model:
+                result = bias_sub.do_correction(input_model, bias_model)
 
-            # Do the bias subtraction
-            result = bias_sub.do_correction(input_model, bias_model)
-
-            # Close the superbias reference file model and
-            # set the step status to complete
-            bias_model.close()
+            # Set the step status to complete
             result.meta.cal_step.superbias = 'COMPLETE'
 
         return result
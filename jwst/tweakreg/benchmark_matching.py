@@ -0,0 +1,110 @@
+#! /usr/bin/env python
+#
+# benchmark_matching.py - compare the run times of the 'xyxymatch' and
+#     'kdtree' source matching engines of tweakreg on synthetic catalogs of
+#     increasing density.
+#
+# For each catalog size, a reference catalog of sources uniformly
+# distributed over a 4096 x 4096 pixel frame is created, and an image
+# catalog is made from a random subset of the reference sources, shifted
+# and with some positional noise, plus a fraction of spurious sources. Both
+# engines are timed on the zero-point offset search (2D histogram of
+# offsets) and on the final tolerance matching, and their results are
+# compared.
+#
+# linux usage example:
+#  ./benchmark_matching.py 1000 10000 100000
+#  ... which runs catalogs of 1000, 10000 and 100000 reference sources.
+#  The default sizes are 1000, 3000, 10000 and 30000.
+
+from __future__ import division, print_function
+
+import sys
+import time
+import numpy as np
+
+from stsci.stimage import xyxymatch
+
+from jwst.tweakreg import chelp
+from jwst.tweakreg import matchutils
+
+FRAME_SIZE = 4096.  # size of the frame in pixels
+SHIFT = (3.7, -2.2)  # offset of image sources relative to reference sources
+NOISE = 0.05  # standard deviation of positional noise in pixels
+SUBSET = 0.8  # fraction of reference sources present in the image catalog
+SPURIOUS = 0.1  # number of spurious image sources relative to matched ones
+
+SEARCHRAD = 6.0
+TOLERANCE = 1.5
+SEPARATION = 0.5
+
+
+def make_catalogs(nref, seed=0):
+    """
+    Create a reference catalog of `nref` sources and an image catalog
+    overlapping it.
+
+    Returns
+    -------
+    imgxy, refxy : numpy.ndarray
+        ``(N, 2)`` arrays of image and reference source positions.
+    """
+    rng = np.random.RandomState(seed)
+    refxy = rng.uniform(0., FRAME_SIZE, (nref, 2))
+
+    nimg = int(SUBSET * nref)
+    imgxy = refxy[rng.permutation(nref)[:nimg]] + SHIFT
+    imgxy += rng.normal(0., NOISE, imgxy.shape)
+    spurious = rng.uniform(0., FRAME_SIZE, (int(SPURIOUS * nimg), 2))
+
+    return np.vstack([imgxy, spurious]), refxy
+
+
+def timed(func, *args, **kwargs):
+    tstart = time.time()
+    result = func(*args, **kwargs)
+    return time.time() - tstart, result
+
+
+def benchmark(sizes):
+    """
+    Time both matching engines on catalogs of each of the `sizes`, and
+    print the times and whether the results agree.
+    """
+    for nref in sizes:
+        imgxy, refxy = make_catalogs(nref)
+
+        t_hist, zp_hist = timed(chelp.arrxyzero, imgxy.astype(np.float32),
+                                refxy.astype(np.float32), SEARCHRAD)
+        t_tree, zp_tree = timed(matchutils.xy_zeropoint_matrix, imgxy,
+                                refxy, SEARCHRAD)
+
+        t_xyxy, m_xyxy = timed(xyxymatch, imgxy, refxy, origin=SHIFT,
+                               tolerance=TOLERANCE, separation=SEPARATION)
+        t_kdt, m_kdt = timed(matchutils.match_xy, imgxy, refxy,
+                             origin=SHIFT, tolerance=TOLERANCE,
+                             separation=SEPARATION)
+
+        pairs_xyxy = set(zip(m_xyxy['input_idx'], m_xyxy['ref_idx']))
+        pairs_kdt = set(zip(m_kdt['input_idx'], m_kdt['ref_idx']))
+        common = len(pairs_xyxy & pairs_kdt)
+
+        print('%d reference and %d image sources' % (len(refxy), len(imgxy)))
+        print('  offset histogram:  xyxymatch %8.3f s  kdtree %8.3f s  '
+              'identical: %s' % (t_hist, t_tree,
+                                 np.array_equal(zp_hist, zp_tree)))
+        print('  tolerance match:   xyxymatch %8.3f s  kdtree %8.3f s  '
+              'matches: %d / %d, %d in common' %
+              (t_xyxy, t_kdt, len(m_xyxy), len(m_kdt), common))
+
+
+if __name__ == "__main__":
+    """Get the catalog sizes and run the benchmark.
+    """
+    usage = "usage:  ./benchmark_matching.py [nref ...]"
+
+    sizes = [1000, 3000, 10000, 30000]
+    if len(sys.argv) > 1:
+        sizes = [int(arg) for arg in sys.argv[1:]]
+
+    benchmark(sizes)
@@ -37,7 +37,7 @@ def align(imcat, refcat=None, enforce_user_order=True,
           searchunits='arcseconds',
           use2dhist=True, separation=0.5, tolerance=1.0,
           xoffset=0.0, yoffset=0.0,
-          fitgeom='general', nclip=3, sigma=3.0):
+          fitgeom='general', nclip=3, sigma=3.0, match_engine='xyxymatch'):
     """
     Align (groups of) images by adjusting the parameters of their WCS based on
     fits between matched sources in these images and a reference catalog which
@@ -132,6 +132,12 @@ def align(imcat, refcat=None, enforce_user_order=True,
     sigma : float, optional
         Clipping limit in sigma units.
 
+    match_engine : {'xyxymatch', 'kdtree'}, optional
+        Source matching engine: the 2D histogram of all image-reference
+        offsets followed by :py:func:`~stsci.stimage.xyxymatch`, or KD-tree
+        based offset search and tolerance matching, which is much faster for
+        crowded fields.
+
     """
 
     function_name = align.__name__
@@ -236,7 +242,8 @@ def align(imcat, refcat=None, enforce_user_order=True,
             tolerance=tolerance,
             fitgeom=fitgeom,
             nclip=nclip,
-            sigma=sigma
+            sigma=sigma,
+            match_engine=match_engine
         )
 
         aligned_imcat.append(current_imcat)
@@ -3,6 +3,7 @@ from __future__ import (absolute_import, division, unicode_literals,
 
 import logging
 import numpy as np
+from scipy.spatial import cKDTree
 import stsci.imagestats as imagestats
 
 from . import chelp
@@ -53,15 +54,24 @@ def center_of_mass(img, labels=None, index=None):
     return [tuple(v) for v in np.array(results).T]
 
 
-def build_xy_zeropoint(imgxy, refxy, searchrad=3.0):
+def build_xy_zeropoint(imgxy, refxy, searchrad=3.0, match_engine='xyxymatch'):
     """ Create a matrix which contains the delta between each XY position and
         each UV position.
+
+        With ``match_engine='xyxymatch'`` the matrix is computed by the C
+        function ``arrxyzero`` which compares every pair of sources. With
+        ``match_engine='kdtree'`` the same matrix is computed by
+        :py:func:`xy_zeropoint_matrix` which only visits pairs of sources
+        within `searchrad` of each other.
     """
     log.info("Computing initial guess for X and Y shifts...")
 
-    # run C function to create ZP matrix
-    zpmat = chelp.arrxyzero(imgxy.astype(np.float32),
-                            refxy.astype(np.float32), searchrad)
+    if match_engine == 'kdtree':
+        zpmat = xy_zeropoint_matrix(imgxy, refxy, searchrad)
+    else:
+        # run C function to create ZP matrix
+        zpmat = chelp.arrxyzero(imgxy.astype(np.float32),
+                                refxy.astype(np.float32), searchrad)
 
     xp, yp, flux, zpqual = find_xy_peak(zpmat, center=(searchrad, searchrad))
     if zpqual is None:
@@ -142,3 +152,188 @@ def find_xy_peak(img, center=None, sigma=3.0):
         flux = imgc[xp_slice].max()
 
     return xp, yp, flux, zpqual
+
+
+def _tree_pairs(tree, other, r, p=2.0):
+    """ Return indices ``(i, j)`` of all pairs of points in two trees that
+        are within distance `r` of each other.
+    """
+    neighbors = tree.query_ball_tree(other, r, p=p)
+    counts = np.fromiter((len(n) for n in neighbors), dtype=np.intp,
+                         count=len(neighbors))
+    i = np.repeat(np.arange(len(neighbors)), counts)
+    j = np.fromiter((k for n in neighbors for k in n), dtype=np.intp,
+                    count=counts.sum())
+    return i, j
+
+
+def xy_zeropoint_matrix(imgxy, refxy, searchrad=3.0):
+    """ Compute the 2D histogram of offsets between image and reference
+        sources closer than `searchrad` along both axes.
+
+    This produces the same matrix as the C function ``arrxyzero``: offsets
+    are computed in single precision and the histogram has
+    ``int(2 * searchrad) + 1`` bins along each axis. Instead of comparing
+    each image source to each reference source, candidate pairs are found
+    with a KD-tree so that the cost grows with the number of pairs within
+    the search box instead of the product of the catalog lengths.
+    """
+    imgxy = np.asarray(imgxy, dtype=np.float32).reshape((-1, 2))
+    refxy = np.asarray(refxy, dtype=np.float32).reshape((-1, 2))
+
+    nbins = int(searchrad * 2) + 1
+    zpmat = np.zeros((nbins, nbins), dtype=np.float64)
+    if imgxy.shape[0] == 0 or refxy.shape[0] == 0:
+        return zpmat
+
+    # search a little beyond searchrad so that rounding of the single
+    # precision offsets tested below cannot lose any pair:
+    imgtree = cKDTree(imgxy.astype(np.float64))
+    reftree = cKDTree(refxy.astype(np.float64))
+    i, j = _tree_pairs(imgtree, reftree, searchrad * (1.0 + 1.0e-6),
+                       p=np.inf)
+
+    dx = (imgxy[i, 0] - refxy[j, 0]).astype(np.float64)
+    dy = (imgxy[i, 1] - refxy[j, 1]).astype(np.float64)
+    inbox = (np.abs(dx) < searchrad) & (np.abs(dy) < searchrad)
+    xind = (dx[inbox] + searchrad).astype(np.intp)
+    yind = (dy[inbox] + searchrad).astype(np.intp)
+
+    zpmat += np.bincount(yind * nbins + xind,
+                         minlength=nbins * nbins).reshape((nbins, nbins))
+    return zpmat
+
+
+def _xy_order(xy):
+    """ Return the rank of each source when sorted by y, then by x.
+    """
+    order = np.lexsort((xy[:, 0], xy[:, 1]))
+    rank = np.empty(order.size, dtype=np.intp)
+    rank[order] = np.arange(order.size)
+    return order, rank
+
+
+def _unique_sources(xy, separation):
+    """ Return a mask of the sources that are kept when removing sources
+        closer than `separation` to another source.
+
+    As in :py:func:`~stsci.stimage.xyxymatch`, the sources are visited in
+    order of y, then x, and each source that is kept removes all of the
+    following sources within `separation` of it.
+    """
+    unique = np.ones(xy.shape[0], dtype=np.bool_)
+    if xy.shape[0] < 2:
+        return unique
+
+    pairs = cKDTree(xy).query_pairs(separation)
+    if not pairs:
+        return unique
+    pairs = np.fromiter((k for pair in pairs for k in pair), dtype=np.intp,
+                        count=2 * len(pairs)).reshape((-1, 2))
+
+    order, rank = _xy_order(xy)
+    # order each pair as (first, second) in sorted order:
+    first = np.where(rank[pairs[:, 0]] < rank[pairs[:, 1]],
+                     pairs[:, 0], pairs[:, 1])
+    second = pairs[:, 0] + pairs[:, 1] - first
+    bounds = np.argsort(rank[first], kind='mergesort')
+    first = first[bounds]
+    second = second[bounds]
+    starts = np.searchsorted(rank[first], np.arange(xy.shape[0] + 1))
+
+    for k in order[np.unique(rank[first])]:
+        if unique[k]:
+            unique[second[starts[rank[k]]:starts[rank[k] + 1]]] = False
+    return unique
+
+
+def match_xy(imgxy, refxy, origin=(0.0, 0.0), tolerance=1.0,
+             separation=0.0):
+    """ Match image sources to reference sources using a KD-tree.
+
+    This produces the same matches as the 'tolerance' algorithm of
+    :py:func:`~stsci.stimage.xyxymatch`, but its cost grows as ``N log N``
+    instead of ``N_img * N_ref`` for dense catalogs. Sources closer than `separation` to a preceding source of the same
+    list (in order of y, then x) are removed first. Image positions are
+    then shifted by `origin` and each reference source is matched to the
+    nearest image source within `tolerance`; an image source may be
+    matched to several reference sources.
+
+    Parameters
+    ----------
+    imgxy : numpy.ndarray
+        An ``(N, 2)`` array of image source positions.
+
+    refxy : numpy.ndarray
+        An ``(M, 2)`` array of reference source positions.
+
+    origin : tuple of float, optional
+        Offset of image positions relative to reference positions.
+
+    tolerance : float, optional
+        The matching tolerance in pixels.
+
+    separation : float, optional
+        The minimum separation for sources in the input and reference
+        catalogs in order to be considered to be distinct sources.
+
+    Returns
+    -------
+    matches : numpy.ndarray
+        A structured array with the same fields as the output of
+        :py:func:`~stsci.stimage.xyxymatch`: ``input_x``, ``input_y``,
+        ``input_idx``, ``ref_x``, ``ref_y`` and ``ref_idx``, in the same
+        order (by y, then x of the reference sources).
+    """
+    imgxy = np.asarray(imgxy, dtype=np.float64).reshape((-1, 2))
+    refxy = np.asarray(refxy, dtype=np.float64).reshape((-1, 2))
+
+    dtype = [('input_x', np.float64), ('input_y', np.float64),
+             ('input_idx', np.int64), ('ref_x', np.float64),
+             ('ref_y', np.float64), ('ref_idx', np.int64)]
+
+    inpxy = imgxy - np.asarray(origin, dtype=np.float64)
+    img_idx = np.flatnonzero(_unique_sources(inpxy, separation))
+    ref_idx = np.flatnonzero(_unique_sources(refxy, separation))
+
+    if img_idx.size == 0 or ref_idx.size == 0:
+        return np.zeros(0, dtype=dtype)
+
+    # candidate pairs, searching a little beyond tolerance so that the
+    # exact test below decides the edge cases:
+    reftree = cKDTree(refxy[ref_idx])
+    imgtree = cKDTree(inpxy[img_idx])
+    i, j = _tree_pairs(reftree, imgtree, tolerance * (1.0 + 1.0e-6))
+    i = ref_idx[i]
+    j = img_idx[j]
+
+    # the same tests as xyxymatch: the image source must be within
+    # (-tolerance, tolerance] of the reference source in y and within
+    # tolerance of it:
+    dx = refxy[i, 0] - inpxy[j, 0]
+    dy = refxy[i, 1] - inpxy[j, 1]
+    r2 = dx * dx + dy * dy
+    found = (dy < tolerance) & (dy >= -tolerance) & \
+            (r2 <= tolerance * tolerance)
+    i = i[found]
+    j = j[found]
+    r2 = r2[found]
+
+    # keep the closest image source of each reference source and, for
+    # equal distances, the last one in order of y, then x:
+    ref_rank = _xy_order(refxy)[1]
+    img_rank = _xy_order(inpxy)[1]
+    order = np.lexsort((-img_rank[j], r2, ref_rank[i]))
+    first = np.ones(order.size, dtype=np.bool_)
+    first[1:] = i[order[1:]] != i[order[:-1]]
+    i = i[order[first]]
+    j = j[order[first]]
+
+    matches = np.zeros(i.size, dtype=dtype)
+    matches['input_x'] = imgxy[j, 0]
+    matches['input_y'] = imgxy[j, 1]
+    matches['input_idx'] = j
+    matches['ref_x'] = refxy[i, 0]
+    matches['ref_y'] = refxy[i, 1]
+    matches['ref_idx'] = i
+    return matches
@@ -0,0 +1,70 @@
+from __future__ import absolute_import, division
+
+import numpy as np
+from numpy.testing import assert_array_equal
+
+from stsci.stimage import xyxymatch
+
+from jwst.tweakreg import chelp
+from jwst.tweakreg import matchutils
+
+SHIFT = (3.7, -2.2)
+
+
+def make_catalogs(nref=2000, size=1024., seed=0):
+    """A reference catalog and an image catalog made of a shifted, noisy
+    subset of the reference sources and of spurious sources."""
+    rng = np.random.RandomState(seed)
+    refxy = rng.uniform(0., size, (nref, 2))
+    nimg = int(0.8 * nref)
+    imgxy = refxy[rng.permutation(nref)[:nimg]] + SHIFT
+    imgxy += rng.normal(0., 0.05, imgxy.shape)
+    spurious = rng.uniform(0., size, (nimg // 10, 2))
+    return np.vstack([imgxy, spurious]), refxy
+
+
+def test_xy_zeropoint_matrix():
+    imgxy, refxy = make_catalogs()
+    for searchrad in (3.0, 6.0, 7.5):
+        expected = chelp.arrxyzero(imgxy.astype(np.float32),
+                                   refxy.astype(np.float32), searchrad)
+        zpmat = matchutils.xy_zeropoint_matrix(imgxy, refxy, searchrad)
+        assert zpmat.shape == expected.shape
+        assert_array_equal(zpmat, expected)
+        assert zpmat.sum() > 0
+
+
+def test_xy_zeropoint_matrix_empty():
+    imgxy, refxy = make_catalogs(nref=10)
+    expected = chelp.arrxyzero(np.zeros((0, 2), dtype=np.float32),
+                               refxy.astype(np.float32), 3.0)
+    zpmat = matchutils.xy_zeropoint_matrix(np.zeros((0, 2)), refxy, 3.0)
+    assert_array_equal(zpmat, expected)
+
+
+def check_match_xy(imgxy, refxy, tolerance, separation):
+    expected = xyxymatch(imgxy, refxy, origin=SHIFT, tolerance=tolerance,
+                         separation=separation)
+    matches = matchutils.match_xy(imgxy, refxy, origin=SHIFT,
+                                  tolerance=tolerance, separation=separation)
+    assert len(matches) > 0
+    assert_array_equal(matches['input_idx'], expected['input_idx'])
+    assert_array_equal(matches['ref_idx'], expected['ref_idx'])
+    for name in ('input_x', 'input_y', 'ref_x', 'ref_y'):
+        assert_array_equal(matches[name], expected[name])
+
+
+def test_match_xy():
+    imgxy, refxy = make_catalogs()
+    for tolerance, separation in ((1.0, 0.0), (1.5, 0.5), (2.5, 5.0)):
+        check_match_xy(imgxy, refxy, tolerance, separation)
+
+
+def test_match_xy_ties():
+    # positions on a grid of a quarter of a pixel give sources at equal
+    # distances from each other
+    imgxy, refxy = make_catalogs(nref=500, size=200.)
+    imgxy = np.round(4. * imgxy) / 4.
+    refxy = np.round(4. * refxy) / 4.
+    for tolerance, separation in ((1.0, 0.0), (2.5, 1.0), (1.5, 3.0)):
+        check_match_xy(imgxy, refxy, tolerance, separation)
@@ -50,6 +50,7 @@ class TweakRegStep(Step):
         tolerance = float(default=1.0) # Matching tolerance for xyxymatch in pixels
         xoffset = float(default=0.0), # Initial guess for X offset in pixels
         yoffset = float(default=0.0) # Initial guess for Y offset in pixels
+        match_engine = option('xyxymatch', 'kdtree', default='xyxymatch') # Source matching engine
 
         # Catalog fitting parameters:
         fitgeometry = option('shift', 'rscale', 'general', default='general') # Fitting geometry
@@ -110,7 +111,8 @@ class TweakRegStep(Step):
             yoffset=self.yoffset,
             fitgeom=self.fitgeometry,
             nclip=self.nclip,
-            sigma=self.sigma
+            sigma=self.sigma,
+            match_engine=self.match_engine
         )
 
         return img
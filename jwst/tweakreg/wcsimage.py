@@ -635,7 +635,8 @@ class WCSGroupCatalog(object):
 
     def match2ref(self, refcat, minobj=15, searchrad=1.0,
                   searchunits='arcseconds', separation=0.5,
-                  use2dhist=True, xoffset=0.0, yoffset=0.0, tolerance=1.0):
+                  use2dhist=True, xoffset=0.0, yoffset=0.0, tolerance=1.0,
+                  match_engine='xyxymatch'):
         """ Uses xyxymatch to cross-match sources between this catalog and
             a reference catalog.
 
@@ -687,6 +688,15 @@ class WCSGroupCatalog(object):
             matching the object lists from each image with the reference
             image's object list.
 
+        match_engine : {'xyxymatch', 'kdtree'}, optional
+            Source matching engine. ``'xyxymatch'`` uses the C 2D histogram
+            of all image-reference offsets and
+            :py:func:`~stsci.stimage.xyxymatch`. ``'kdtree'`` uses the
+            KD-tree based functions
+            :py:func:`~jwst.tweakreg.matchutils.xy_zeropoint_matrix` and
+            :py:func:`~jwst.tweakreg.matchutils.match_xy`, whose cost does
+            not grow as the product of the catalog lengths.
+
         """
 
         colnames = self._catalog.colnames
@@ -715,7 +725,8 @@ class WCSGroupCatalog(object):
             zpxoff, zpyoff, flux, zpqual = matchutils.build_xy_zeropoint(
                 im_xyref,
                 refxy,
-                searchrad=searchrad
+                searchrad=searchrad,
+                match_engine=match_engine
             )
 
             if zpqual is not None:
@@ -725,13 +736,22 @@ class WCSGroupCatalog(object):
                 # still pick up the identified matches
                 tolerance = 1.5
 
-        matches = xyxymatch(
-            im_xyref,
-            refxy,
-            origin=xyoff,
-            tolerance=tolerance,
-            separation=separation
-        )
+        if match_engine == 'kdtree':
+            matches = matchutils.match_xy(
+                im_xyref,
+                refxy,
+                origin=xyoff,
+                tolerance=tolerance,
+                separation=separation
+            )
+        else:
+            matches = xyxymatch(
+                im_xyref,
+                refxy,
+                origin=xyoff,
+                tolerance=tolerance,
+                separation=separation
+            )
 
         nmatches = len(matches)
         self._catalog.meta['nmatches'] = nmatches
@@ -874,7 +894,8 @@ class WCSGroupCatalog(object):
     def align_to_ref(self, refcat, minobj=15, searchrad=1.0,
                      searchunits='arcseconds', separation=0.5,
                      use2dhist=True, xoffset=0.0, yoffset=0.0, tolerance=1.0,
-                     fitgeom='rscale', nclip=3, sigma=3.0):
+                     fitgeom='rscale', nclip=3, sigma=3.0,
+                     match_engine='xyxymatch'):
         """
         Matches sources from the image catalog to the sources in the
         reference catalog, finds the affine transformation between matched
@@ -941,12 +962,15 @@ class WCSGroupCatalog(object):
         sigma : float, optional
             Clipping limit in sigma units.
 
+        match_engine : {'xyxymatch', 'kdtree'}, optional
+            Source matching engine. See :py:meth:`match2ref` for details.
+
         """
         self.calc_xyref(refcat=refcat)
         self.match2ref(refcat=refcat, minobj=minobj, searchrad=searchrad,
                        searchunits=searchunits, separation=separation,
                        use2dhist=use2dhist, xoffset=xoffset, yoffset=yoffset,
-                       tolerance=tolerance)
+                       tolerance=tolerance, match_engine=match_engine)
         fit = self.fit2ref(refcat=refcat, fitgeom=fitgeom,
                            nclip=nclip, sigma=sigma)
         self.apply_affine_to_wcs(refcat=refcat, matrix=fit['fit_matrix'],
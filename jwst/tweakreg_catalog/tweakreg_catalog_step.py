@@ -2,7 +2,6 @@
 
 from jwst.stpipe import Step, cmdline
 from jwst.datamodels import ModelContainer
-from .tweakreg_catalog import make_tweakreg_catalog
 
 
 class TweakregCatalogStep(Step):
@@ -23,6 +22,7 @@ class TweakregCatalogStep(Step):
     """
 
     def process(self, input):
+        from .tweakreg_catalog import make_tweakreg_catalog
 
         catalog_format = self.catalog_format
         kernel_fwhm = self.kernel_fwhm